@@ -174,4 +174,41 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-}
\ No newline at end of file
+}
+
+# Claim evaluation rule snapshot (claims.rule_snapshot): seconds before a worker
+# reloads the rule masters even without a local write.
+RULE_SNAPSHOT_TTL_SECONDS = int(os.getenv("RULE_SNAPSHOT_TTL_SECONDS", "60"))
+
+# damage_detection keyword matching: require whole-word matches (e.g. "door" not in "doorframe")
+DAMAGE_KEYWORD_WORD_BOUNDARY = os.getenv("DAMAGE_KEYWORD_WORD_BOUNDARY", "0") == "1"
+
+# claims.evaluation_cache: most recent claim evaluations kept per worker (0 disables the cache)
+EVALUATION_CACHE_MAX_ENTRIES = int(os.getenv("EVALUATION_CACHE_MAX_ENTRIES", "1024"))
+
+# POST /api/masters/simulate-change: most claims one simulation evaluates (400 beyond, narrow the dates)
+SIMULATION_MAX_CLAIMS = int(os.getenv("SIMULATION_MAX_CLAIMS", "200000"))
+
+# claims.master_cache: versioned cache of master-table GET responses and claim_status lookups.
+# MASTER_CACHE_BACKEND=locmem keeps it per worker; file or db share it (and its version
+# counters) between workers, so a write in one invalidates all. db needs `createcachetable`.
+MASTER_CACHE_BACKEND = os.getenv("MASTER_CACHE_BACKEND", "locmem")
+MASTER_CACHE_TTL_SECONDS = int(os.getenv("MASTER_CACHE_TTL_SECONDS", "300"))
+_MASTER_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "vca-masters",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("MASTER_CACHE_LOCATION", str(BASE_DIR / "cache" / "masters")),
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": os.getenv("MASTER_CACHE_LOCATION", "master_cache"),
+    },
+}
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "masters": _MASTER_CACHE_BACKENDS[MASTER_CACHE_BACKEND],
+}
@@ -1,7 +1,24 @@
 from django.contrib import admin
+from .master_cache import bump_master_version
 from .models import PricingConfig
 
 
 @admin.register(PricingConfig)
 class PricingConfigAdmin(admin.ModelAdmin):
     list_display = ["config_key", "config_name", "config_type", "config_value", "is_active"]
+
+    # Admin writes invalidate the same cache as the /api/masters/pricing-config views
+    def _pricing_config_changed(self):
+        bump_master_version("pricing_config")
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        self._pricing_config_changed()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self._pricing_config_changed()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        self._pricing_config_changed()
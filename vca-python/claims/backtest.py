@@ -0,0 +1,499 @@
+"""
+Columnar (NumPy) evaluation of the claim rules over the whole fnol_claims book.
+
+evaluate_book() mirrors _run_process_claim_logic in claims.views rule for rule,
+but applies each Fraud Check rule, the photo check, evaluate_score and the
+claim type threshold as masks over every claim at once. Pass a modified
+RuleSnapshot (see RuleSnapshot.with_rows) to answer what-if questions such as
+"what if the Early Claim window goes from 30 to 45 days" without a per-claim loop.
+Rules whose rule_expression compiles (see claims.rule_expressions) run their
+closure once per claim over the same columns.
+"""
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from datetime import date
+from typing import Dict, Optional
+
+import numpy as np
+
+from .models import ClaimEvaluationResponse, FnolClaim, FnolDamagePhoto, PricingConfig
+from .rule_expressions import RuleContext, compiled_rule_predicate
+from .rule_snapshot import RuleSnapshot, get_rule_snapshot
+from .views import (
+    FRAUD_CHECK_ORDER,
+    _custom_fraud_rules,
+    _get_claim_type_threshold,
+    _get_early_claim_window_days,
+    _get_fraud_rule_description,
+    evaluate_score,
+)
+
+# Risk-when-TRUE Fraud Check rules and the FnolClaim flag they read
+RISK_FLAG_RULES = (
+    ("Liability Admission", "liability_admission"),
+    ("Dashcam CCTV Evidence", "dashcam_cctv_evidence"),
+    ("Injury Indicator", "injury_indicator"),
+    ("Commercial Vehicle", "commercial_vehicle"),
+)
+
+DECISIONS = ("Auto Approve", "Manual Review", "Reject")
+
+# PricingConfig keys read by estimate_claim_amount_from_config, with its defaults
+PRICING_DEFAULTS = {
+    "claim_base_amount": 10000.0,
+    "claim_rate_per_damage": 2000.0,
+    "severity_multiplier_minor": 1.0,
+    "severity_multiplier_moderate": 1.2,
+    "severity_multiplier_severe": 1.5,
+}
+
+_BOOK_FIELDS = (
+    "complaint_id",
+    "policy_status",
+    "policy_start_date",
+    "incident_date_time",
+    "vehicle_year",
+    "incident_description",
+    "coverage_type",
+    "policy_end_date",
+    "incident_type",
+) + tuple(flag for _, flag in RISK_FLAG_RULES)
+
+
+@dataclass
+class ClaimBook:
+    """fnol_claims loaded as parallel column arrays (one row per claim)."""
+
+    complaint_id: np.ndarray
+    policy_active: np.ndarray
+    policy_start: np.ndarray  # datetime64[D], NaT when missing
+    loss_date: np.ndarray  # datetime64[D], NaT when missing
+    vehicle_year: np.ndarray
+    description: np.ndarray  # incident_description, "" when missing (object)
+    has_description: np.ndarray
+    flags: Dict[str, np.ndarray]
+    has_photos: np.ndarray
+    amount: np.ndarray  # latest evaluation claim_amount / estimated_amount, 0 when none
+    policy_status: np.ndarray  # object, "" when missing
+    coverage_type: np.ndarray  # object, "" when missing
+    policy_end: np.ndarray  # datetime64[D], NaT when missing
+    claim_type: np.ndarray  # incident_type (object), "" when missing
+    llm_assessed: np.ndarray  # latest evaluation has an LLM damage assessment (claim_amount is priced)
+    llm_damage_count: np.ndarray  # damages counted by estimate_claim_amount_from_config (>= 1)
+    llm_severity: np.ndarray  # lowercased llm_severity (object)
+    base_estimated: np.ndarray  # latest evaluation estimated_amount, the pricing floor
+
+    def __len__(self) -> int:
+        return len(self.complaint_id)
+
+
+def load_claim_book(queryset=None, chunk_size: int = 2000) -> ClaimBook:
+    """
+    Load fnol_claims (or the given FnolClaim queryset) into a ClaimBook using three
+    queries: claim columns, claims with photos, and latest evaluation amounts.
+    """
+    qs = queryset if queryset is not None else FnolClaim.objects.all()
+    ids, statuses, starts, losses, years, descriptions = [], [], [], [], [], []
+    coverages, ends, claim_types = [], [], []
+    flags = {flag: [] for _, flag in RISK_FLAG_RULES}
+    for row in qs.order_by("complaint_id").values_list(*_BOOK_FIELDS).iterator(chunk_size=chunk_size):
+        complaint_id, policy_status, start, incident_dt, year, description, coverage, end, incident_type = row[:9]
+        ids.append(complaint_id)
+        statuses.append(policy_status or "")
+        starts.append(start)
+        losses.append(incident_dt.date() if incident_dt else None)
+        years.append(year or 0)
+        descriptions.append(description or "")
+        coverages.append(coverage or "")
+        ends.append(end)
+        claim_types.append(incident_type or "")
+        for (_, flag), value in zip(RISK_FLAG_RULES, row[9:]):
+            flags[flag].append(bool(value))
+
+    claim_filter = {} if queryset is None else {"complaint_id__in": qs.values("complaint_id")}
+    with_photos = set(
+        FnolDamagePhoto.objects.filter(**claim_filter)
+        .exclude(photo_path__isnull=True)
+        .exclude(photo_path="")
+        .values_list("complaint_id", flat=True)
+        .distinct()
+    )
+    amounts: Dict[str, float] = {}
+    assessments: Dict[str, tuple] = {}
+    for complaint_id, claim_amount, estimated_amount, llm_damages, llm_severity in (
+        ClaimEvaluationResponse.objects.filter(is_latest=True, **claim_filter)
+        .order_by("id")
+        .values_list("complaint_id", "claim_amount", "estimated_amount", "llm_damages", "llm_severity")
+        .iterator(chunk_size=chunk_size)
+    ):
+        if complaint_id in amounts:
+            continue
+        amounts[complaint_id] = float(claim_amount or estimated_amount or 0)
+        if llm_damages is not None or llm_severity is not None:
+            assessments[complaint_id] = (
+                _damage_count(llm_damages),
+                (llm_severity or "").strip().lower(),
+                float(estimated_amount or 0),
+            )
+    no_assessment = (1, "", 0.0)
+
+    return ClaimBook(
+        complaint_id=np.array(ids, dtype=object),
+        policy_active=np.array([s == "Active" for s in statuses], dtype=bool),
+        policy_start=np.array(starts, dtype="datetime64[D]"),
+        loss_date=np.array(losses, dtype="datetime64[D]"),
+        vehicle_year=np.array(years, dtype=np.int64),
+        description=np.array(descriptions, dtype=object),
+        has_description=np.array([bool(d.strip()) for d in descriptions], dtype=bool),
+        flags={flag: np.array(values, dtype=bool) for flag, values in flags.items()},
+        has_photos=np.array([c in with_photos for c in ids], dtype=bool),
+        amount=np.array([max(amounts.get(c, 0.0), 0.0) for c in ids], dtype=np.float64),
+        policy_status=np.array(statuses, dtype=object),
+        coverage_type=np.array(coverages, dtype=object),
+        policy_end=np.array(ends, dtype="datetime64[D]"),
+        claim_type=np.array(claim_types, dtype=object),
+        llm_assessed=np.array([c in assessments for c in ids], dtype=bool),
+        llm_damage_count=np.array([assessments.get(c, no_assessment)[0] for c in ids], dtype=np.int64),
+        llm_severity=np.array([assessments.get(c, no_assessment)[1] for c in ids], dtype=object),
+        base_estimated=np.array([assessments.get(c, no_assessment)[2] for c in ids], dtype=np.float64),
+    )
+
+
+def _damage_count(llm_damages: Optional[str]) -> int:
+    """Damage count as estimate_claim_amount_from_config counts it (stored JSON list, at least 1)."""
+    try:
+        damages = json.loads(llm_damages) if llm_damages else []
+    except ValueError:
+        damages = []
+    if not isinstance(damages, list):
+        damages = []
+    return len([d for d in damages if d and str(d).lower() != "none"]) or 1
+
+
+def load_pricing() -> Dict[str, str]:
+    """Active PricingConfig values by config_key (one query)."""
+    return dict(PricingConfig.objects.filter(is_active=True).values_list("config_key", "config_value"))
+
+
+def pricing_value(pricing: Dict[str, str], key: str) -> float:
+    """Same fallback rules as views._get_pricing_config_value."""
+    try:
+        value = pricing.get(key)
+        if value:
+            return float(value)
+    except (ValueError, TypeError):
+        pass
+    return PRICING_DEFAULTS[key]
+
+
+def reprice_book(book: ClaimBook, pricing: Dict[str, str]) -> ClaimBook:
+    """
+    Copy of book whose LLM-assessed claims have claim_amount recomputed with pricing,
+    vectorizing estimate_claim_amount_from_config. Other claims keep their amount.
+    """
+    multipliers = {
+        "minor": pricing_value(pricing, "severity_multiplier_minor"),
+        "moderate": pricing_value(pricing, "severity_multiplier_moderate"),
+        "severe": pricing_value(pricing, "severity_multiplier_severe"),
+    }
+    mult = np.array(
+        [multipliers.get(s, multipliers["moderate"]) for s in book.llm_severity], dtype=np.float64
+    )
+    priced = (
+        pricing_value(pricing, "claim_base_amount")
+        + book.llm_damage_count * pricing_value(pricing, "claim_rate_per_damage")
+    ) * mult
+    priced = np.where(book.base_estimated > 0, np.maximum(priced, book.base_estimated), priced)
+    priced = np.array([round(float(a), 2) for a in priced], dtype=np.float64)
+    return replace(book, amount=np.where(book.llm_assessed, np.maximum(priced, 0.0), book.amount))
+
+
+@dataclass
+class BookEvaluation:
+    """Per-claim outcome arrays produced by evaluate_book()."""
+
+    book: ClaimBook
+    snapshot: RuleSnapshot
+    rule_passed: Dict[int, np.ndarray]  # rule_id -> pass mask, for every active Fraud Check rule
+    decision: np.ndarray
+    claim_status: np.ndarray
+    reason: np.ndarray
+    fraud_score: np.ndarray
+    damage_confidence: np.ndarray
+    evaluation_score: np.ndarray
+    threshold: np.ndarray
+    claim_type: np.ndarray
+    short_circuit: np.ndarray  # "product", "fraud", "photos" or "" for a full evaluation
+    fraud_rule_type: np.ndarray  # rule_type that set the High band, None otherwise
+    _rule_descriptions: Dict[int, str] = field(default_factory=dict)
+
+    def decision_counts(self) -> Dict[str, int]:
+        return {d: int(np.count_nonzero(self.decision == d)) for d in DECISIONS}
+
+    def result(self, i: int) -> dict:
+        """The dict _run_process_claim_logic would return for claim i."""
+        amount = float(self.book.amount[i])
+        rule_results = [
+            {
+                "rule_type": (rule.rule_type or "").strip(),
+                "rule_description": self._rule_descriptions[rule.rule_id],
+                "passed": bool(self.rule_passed[rule.rule_id][i]),
+            }
+            for rule in self.snapshot.fraud_rules()
+            if (rule.rule_type or "").strip()
+        ]
+        short_circuit = self.short_circuit[i]
+        result = {
+            "claim_id": self.book.complaint_id[i],
+            "decision": self.decision[i],
+            "claim_status": self.claim_status[i],
+            "fraud_rule_results": rule_results,
+            "damage_confidence": int(self.damage_confidence[i]),
+            "fraud_score": self.fraud_score[i],
+            "evaluation_score": float(self.evaluation_score[i]) if not short_circuit else 0,
+            "threshold": float(self.threshold[i]),
+            "claim_type": self.claim_type[i],
+            "estimated_amount": amount if amount > 0 else 0,
+        }
+        if short_circuit:
+            result["reason"] = self.reason[i]
+            rule_type = {"fraud": self.fraud_rule_type[i], "photos": "Missing Damage Photos"}.get(short_circuit)
+            result["short_circuit"] = {"stage": short_circuit, "rule_type": rule_type}
+        else:
+            result["short_circuit"] = None
+        return result
+
+
+def _damage_confidence(description: np.ndarray, snapshot: RuleSnapshot) -> np.ndarray:
+    """Vectorized damage_detection(): 50 + severity of every keyword found, clamped to 0..100."""
+    matcher = snapshot.damage_matcher()
+    severities = [d.severity_percentage for d in snapshot.damage_codes]
+
+    def raw_confidence(text: str) -> float:
+        total = 50.0
+        for index in matcher.find(text):
+            total += severities[index]
+        return total
+
+    confidence = np.fromiter((raw_confidence(d) for d in description), dtype=np.float64, count=len(description))
+    return np.clip(np.rint(confidence), 0, 100).astype(np.int64)
+
+
+def _rule_fail_masks(book: ClaimBook, snapshot: RuleSnapshot, today: date) -> Dict[str, np.ndarray]:
+    """Fail mask per known Fraud Check rule_type (independent of whether the rule is active)."""
+    window = _get_early_claim_window_days(snapshot)
+    dated = ~np.isnat(book.policy_start) & ~np.isnat(book.loss_date)
+    days_diff = np.where(dated, (book.loss_date - book.policy_start).astype("timedelta64[D]").astype(np.int64), 0)
+    fails = {
+        "Early Claim": dated & ((days_diff < 0) | (days_diff < window)),
+        "Data missing": ~book.has_description,
+        "Vehicle Year Invalid": book.vehicle_year > today.year,
+        "Missing Damage Photos": ~book.has_photos,
+    }
+    for name, flag in RISK_FLAG_RULES:
+        fails[name] = book.flags[flag]
+    return fails
+
+
+def _rule_contexts(book: ClaimBook, today: date) -> list:
+    """One RuleContext per claim, with the values build_rule_context gives the per-claim path."""
+    columns = zip(
+        book.policy_status,
+        book.coverage_type,
+        book.policy_start.astype(object),
+        book.policy_end.astype(object),
+        book.loss_date.astype(object),
+        book.description,
+        book.claim_type,
+        book.amount.tolist(),
+        book.vehicle_year.tolist(),
+        book.has_photos.tolist(),
+        *(book.flags[flag].tolist() for _, flag in RISK_FLAG_RULES),
+    )
+    contexts = []
+    for status, coverage, start, end, loss, description, claim_type, amount, year, photos, *flags in columns:
+        values = {
+            "policy_status": status,
+            "coverage_type": coverage,
+            "policy_start_date": start,
+            "policy_end_date": end,
+            "loss_date": loss,
+            "loss_description": description,
+            "claim_type": claim_type,
+            "estimated_amount": amount if amount > 0 else 0,
+            "vehicle_year": year,
+            "has_photos": photos,
+            "today": today,
+            "current_year": today.year,
+        }
+        values.update((flag, value) for (_, flag), value in zip(RISK_FLAG_RULES, flags))
+        contexts.append(RuleContext(values))
+    return contexts
+
+
+def evaluate_book(
+    book: ClaimBook, snapshot: Optional[RuleSnapshot] = None, today: Optional[date] = None
+) -> BookEvaluation:
+    """
+    Evaluate every claim in the book against snapshot (the live rules by default).
+    Results match _run_process_claim_logic for the same claim and rules.
+    """
+    snapshot = snapshot or get_rule_snapshot()
+    today = today or date.today()
+    n = len(book)
+    fails = _rule_fail_masks(book, snapshot, today)
+    no_fail = np.zeros(n, dtype=bool)
+    contexts = None
+
+    def rule_fail(rule, rule_type: str) -> np.ndarray:
+        # Same dispatch as views._fraud_rule_triggered: compiled expression, else built-in mask
+        nonlocal contexts
+        predicate = compiled_rule_predicate(rule.rule_id, rule.rule_expression)
+        if predicate is None:
+            return fails.get(rule_type, no_fail)
+        if contexts is None:
+            contexts = _rule_contexts(book, today)
+        return np.fromiter((predicate(ctx) for ctx in contexts), dtype=bool, count=n)
+
+    # Per-rule pass/fail list (UI): dispatch on exact rule_type like _evaluate_single_fraud_rule
+    rule_passed = {}
+    rule_descriptions = {}
+    for rule in snapshot.fraud_rules():
+        rule_type = (rule.rule_type or "").strip()
+        if not rule_type:
+            continue
+        rule_passed[rule.rule_id] = ~rule_fail(rule, rule_type)
+        rule_descriptions[rule.rule_id] = rule.rule_description or _get_fraud_rule_description(rule_type, snapshot)
+
+    # Band and reason: first triggered rule in fraud_check order, then the custom expression rules
+    fraud_high = np.zeros(n, dtype=bool)
+    fraud_reason = np.full(n, "", dtype=object)
+    fraud_rule_type = np.full(n, None, dtype=object)
+    ordered = [(snapshot.fraud_rule(name), name, _get_fraud_rule_description(name, snapshot))
+               for name in FRAUD_CHECK_ORDER]
+    ordered += [(rule, rule.rule_type, (rule.rule_description or rule.rule_type).strip())
+                for rule in _custom_fraud_rules(snapshot)]
+    for rule, rule_type, description in ordered:
+        if rule is None:
+            continue
+        newly = rule_fail(rule, rule_type) & ~fraud_high
+        fraud_reason[newly] = description or "High fraud risk"
+        fraud_rule_type[newly] = rule_type
+        fraud_high |= newly
+
+    product_fail = ~book.policy_active
+    fraud_reject = ~product_fail & fraud_high
+    photo_review = np.zeros(n, dtype=bool)
+    photo_reason = ""
+    photo_rule = snapshot.fraud_rule("Missing Damage Photos")
+    if photo_rule is not None:
+        photo_review = ~product_fail & ~fraud_high & rule_fail(photo_rule, "Missing Damage Photos")
+        photo_reason = _get_fraud_rule_description("Missing Damage Photos", snapshot)
+    full = ~(product_fail | fraud_reject | photo_review)
+
+    confidence = _damage_confidence(book.description, snapshot)
+
+    # evaluate_score over (confidence, amount > 50000) as a lookup table: identical rounding
+    score_table = np.array(
+        [[evaluate_score(c, 0), evaluate_score(c, 50001)] for c in range(101)], dtype=np.float64
+    )
+    score = score_table[confidence, (book.amount > 50000).astype(np.int64)]
+
+    # Claim type bucket -> (threshold, name), resolved once per bucket
+    bucket = np.select([book.amount <= 25000, book.amount <= 50000], [0, 1], default=2)
+    bucket_rules = [_get_claim_type_threshold({"estimated_amount": a}, snapshot) for a in (0, 25001, 50001)]
+    bucket_threshold = np.array([t for t, _ in bucket_rules], dtype=np.float64)
+    bucket_name = np.array([name for _, name in bucket_rules], dtype=object)
+
+    approve = full & (score >= bucket_threshold[bucket])
+    decision = np.select(
+        [product_fail | fraud_reject, photo_review, approve],
+        ["Reject", "Manual Review", "Auto Approve"],
+        default="Manual Review",
+    ).astype(object)
+    claim_status = np.select(
+        [product_fail | fraud_reject, approve], ["Rejected", "Closed"], default="Open"
+    ).astype(object)
+    reason = np.full(n, "", dtype=object)
+    reason[product_fail] = "Policy inactive"
+    reason[fraud_reject] = fraud_reason[fraud_reject]
+    reason[photo_review] = photo_reason
+    short_circuit = np.select(
+        [product_fail, fraud_reject, photo_review], ["product", "fraud", "photos"], default=""
+    ).astype(object)
+
+    return BookEvaluation(
+        book=book,
+        snapshot=snapshot,
+        rule_passed=rule_passed,
+        decision=decision,
+        claim_status=claim_status,
+        reason=reason,
+        fraud_score=np.where(fraud_reject, "High", "Low").astype(object),
+        damage_confidence=np.where(full | photo_review, confidence, 0),
+        evaluation_score=np.where(full, score, 0.0),
+        threshold=np.where(full, bucket_threshold[bucket], 0.75),
+        claim_type=np.where(full, bucket_name[bucket], None),
+        short_circuit=short_circuit,
+        fraud_rule_type=fraud_rule_type,
+        _rule_descriptions=rule_descriptions,
+    )
+
+
+def decision_flips(before: BookEvaluation, after: BookEvaluation) -> Dict[str, int]:
+    """Count claims whose decision changed, keyed "<before> -> <after>"."""
+    changed = before.decision != after.decision
+    pairs = Counter(zip(before.decision[changed], after.decision[changed]))
+    return {f"{a} -> {b}": count for (a, b), count in sorted(pairs.items())}
+
+
+def with_early_claim_window(snapshot: RuleSnapshot, days: int) -> RuleSnapshot:
+    """Copy of snapshot whose Early Claim rule_expression uses a different day window."""
+    early = snapshot.find_rule("Early Claim")
+    rules = []
+    for rule in snapshot.rules:
+        if early is not None and rule.rule_id == early.rule_id:
+            expression = rule.rule_expression or ""
+            if re.search(r"\d+", expression):
+                expression = re.sub(r"\d+", str(days), expression, count=1)
+            else:
+                expression = f"Claim < {days} days"
+            rule = replace(rule, rule_expression=expression)
+        rules.append(rule)
+    return snapshot.with_rows(rules=rules)
+
+
+def impact_summary(before: BookEvaluation, after: BookEvaluation, sample_size: int = 50) -> dict:
+    """Decision flips and claim_amount totals between two evaluations of the same claims."""
+    changed = before.decision != after.decision
+
+    def amounts_by_decision(evaluation: BookEvaluation) -> Dict[str, float]:
+        return {
+            d: round(float(evaluation.book.amount[evaluation.decision == d].sum()), 2) for d in DECISIONS
+        }
+
+    before_total = round(float(before.book.amount.sum()), 2)
+    after_total = round(float(after.book.amount.sum()), 2)
+    return {
+        "claims": len(before.book),
+        "decisions": {"current": before.decision_counts(), "proposed": after.decision_counts()},
+        "flipped": int(np.count_nonzero(changed)),
+        "flips": decision_flips(before, after),
+        "claim_amount": {
+            "current": {"total": before_total, "by_decision": amounts_by_decision(before)},
+            "proposed": {"total": after_total, "by_decision": amounts_by_decision(after)},
+            "delta": round(after_total - before_total, 2),
+        },
+        "sample": [
+            {
+                "claim_id": before.book.complaint_id[i],
+                "current": before.decision[i],
+                "proposed": after.decision[i],
+                "current_amount": float(before.book.amount[i]),
+                "proposed_amount": float(after.book.amount[i]),
+            }
+            for i in np.flatnonzero(changed)[:sample_size]
+        ],
+    }
@@ -0,0 +1,157 @@
+"""
+Streaming export of FNOL claims with their full evaluation history and photos.
+
+Claims are read in keyset chunks ordered by complaint_id (one query for the
+claims, one for their photos and one for their evaluation versions per chunk),
+and formatted row by row, so memory stays flat however many claims match.
+Keyset chunks rather than QuerySet.iterator(): MySQL drivers buffer a whole
+result set client-side, so only bounded queries keep memory constant there.
+
+CSV has one row per (claim, evaluation version), or a single row with empty
+evaluation columns for a never-evaluated claim. NDJSON has one object per
+claim with "photos" and "evaluations" lists.
+"""
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator
+
+from .models import ClaimEvaluationResponse, FnolDamagePhoto
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_CHUNK_SIZE = 500
+
+_CLAIM_COLUMNS = (
+    "complaint_id",
+    "policy_number",
+    "policy_status",
+    "coverage_type",
+    "policy_start_date",
+    "policy_end_date",
+    "policy_holder_name",
+    "vehicle_make",
+    "vehicle_model",
+    "vehicle_year",
+    "vehicle_registration_number",
+    "incident_type",
+    "incident_date_time",
+    "accident_location",
+    "incident_description",
+    "excess_amount",
+    "re_open",
+    "created_date",
+    "updated_date",
+)
+_EVALUATION_COLUMNS = (
+    "version",
+    "is_latest",
+    "decision",
+    "claim_status",
+    "claim_type",
+    "damage_confidence",
+    "estimated_amount",
+    "claim_amount",
+    "threshold_value",
+    "reason",
+    "llm_damages",
+    "llm_severity",
+    "created_date",
+)
+CSV_HEADER = (
+    _CLAIM_COLUMNS
+    + ("claim_status", "photos")
+    + tuple(f"evaluation_{column}" for column in _EVALUATION_COLUMNS)
+)
+
+
+def _plain(value):
+    """JSON-friendly value: dates as ISO strings, decimals as floats."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _parse_damages(raw):
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def iter_export_records(qs, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[dict]:
+    """One dict per claim of qs (complaint_id order) with "photos" and "evaluations" lists."""
+    last_id = ""
+    while True:
+        claims = list(
+            qs.filter(complaint_id__gt=last_id)
+            .order_by("complaint_id")
+            .values(*_CLAIM_COLUMNS, "claim_status__status_name")[:chunk_size]
+        )
+        if not claims:
+            return
+        ids = [claim["complaint_id"] for claim in claims]
+        photos_by_id: dict = {}
+        for complaint_id, path in (
+            FnolDamagePhoto.objects.filter(complaint_id__in=ids).order_by("id").values_list("complaint_id", "photo_path")
+        ):
+            photos_by_id.setdefault(complaint_id, []).append(path)
+        evaluations_by_id: dict = {}
+        for row in (
+            ClaimEvaluationResponse.objects.filter(complaint_id__in=ids)
+            .order_by("complaint_id", "version", "id")
+            .values("complaint_id", *_EVALUATION_COLUMNS)
+        ):
+            complaint_id = row.pop("complaint_id")
+            row["llm_damages"] = _parse_damages(row["llm_damages"])
+            evaluations_by_id.setdefault(complaint_id, []).append({k: _plain(v) for k, v in row.items()})
+
+        for claim in claims:
+            complaint_id = claim["complaint_id"]
+            record = {column: _plain(claim[column]) for column in _CLAIM_COLUMNS}
+            record["claim_status"] = claim["claim_status__status_name"]
+            record["photos"] = photos_by_id.get(complaint_id, [])
+            record["evaluations"] = evaluations_by_id.get(complaint_id, [])
+            yield record
+        last_id = ids[-1]
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer in a generator."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    if isinstance(value, list):
+        return "|".join(str(v) for v in value)
+    return "" if value is None else value
+
+
+def iter_csv(records: Iterable[dict]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for record in records:
+        claim_cells = [_csv_cell(record[column]) for column in _CLAIM_COLUMNS]
+        claim_cells += [_csv_cell(record["claim_status"]), _csv_cell(record["photos"])]
+        for evaluation in record["evaluations"] or [None]:
+            evaluation_cells = [
+                _csv_cell(evaluation[column]) if evaluation else "" for column in _EVALUATION_COLUMNS
+            ]
+            yield writer.writerow(claim_cells + evaluation_cells)
+
+
+def iter_ndjson(records: Iterable[dict]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, default=str) + "\n"
+
+
+def iter_export(qs, export_format: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """Lines of the export of qs in export_format ("csv" or "ndjson")."""
+    records = iter_export_records(qs, chunk_size)
+    return iter_csv(records) if export_format == "csv" else iter_ndjson(records)
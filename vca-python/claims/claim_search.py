@@ -0,0 +1,161 @@
+"""
+Full-text search over FNOL claims.
+
+The searchable columns (complaint_id, policy_number, policy_holder_name,
+vehicle_registration_number, accident_location, incident_description) are kept in
+an inverted index: an FTS5 table (fnol_claims_fts) on SQLite, a FULLTEXT index
+on fnol_claims itself on MySQL. MySQL maintains its index; on SQLite save_fnol
+calls index_claims() and rebuild_search_index re-creates the table's contents.
+
+Every word of the query must match, as a word prefix ("bump" finds "bumper").
+Results are ranked by relevance (bm25 on SQLite, MATCH score on MySQL). MySQL
+leaves words shorter than innodb_ft_min_token_size out of its index, and BOOLEAN
+MODE silently drops them from the query, so those words ("12" of a registration
+number) are matched there with a REGEXP word-prefix scan over the columns instead.
+"""
+import re
+from typing import Iterable
+
+from django.db import connection
+
+SEARCH_COLUMNS = (
+    "complaint_id",
+    "policy_number",
+    "policy_holder_name",
+    "vehicle_registration_number",
+    "accident_location",
+    "incident_description",
+)
+SEARCH_FTS_TABLE = "fnol_claims_fts"
+SEARCH_FULLTEXT_INDEX = "fnol_claims_fulltext"
+# Query words beyond this are ignored
+SEARCH_MAX_TERMS = 10
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_COLUMNS_SQL = ", ".join(SEARCH_COLUMNS)
+# innodb_ft_min_token_size, read once per process (the server only changes it on restart)
+_min_token_size = None
+
+
+def search_terms(query: str) -> list:
+    """Words of a free-text query (punctuation and FTS operators dropped)."""
+    return _WORD.findall(query or "")[:SEARCH_MAX_TERMS]
+
+
+def ensure_search_index() -> None:
+    """Create the FTS5 table (SQLite) or FULLTEXT index (MySQL) if it does not exist."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_FTS_TABLE} USING fts5("
+                f"{_COLUMNS_SQL}, prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+            )
+        elif connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = 'fnol_claims' AND index_name = %s",
+                [SEARCH_FULLTEXT_INDEX],
+            )
+            if not cursor.fetchone()[0]:
+                cursor.execute(f"ALTER TABLE fnol_claims ADD FULLTEXT INDEX {SEARCH_FULLTEXT_INDEX} ({_COLUMNS_SQL})")
+
+
+def _fts_phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def index_claims(complaint_ids: Iterable[str]) -> None:
+    """Re-index the given claims after a write (SQLite; MySQL's FULLTEXT index needs nothing)."""
+    if connection.vendor != "sqlite":
+        return
+    complaint_ids = list(complaint_ids)
+    if not complaint_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(complaint_ids))
+    matchable = [complaint_id for complaint_id in complaint_ids if _WORD.search(complaint_id)]
+    with connection.cursor() as cursor:
+        if matchable:
+            # MATCH finds the rows through the index; the IN check keeps it exact
+            match = " OR ".join(_fts_phrase(complaint_id) for complaint_id in matchable)
+            cursor.execute(
+                f"DELETE FROM {SEARCH_FTS_TABLE} WHERE {SEARCH_FTS_TABLE} MATCH %s AND complaint_id IN ({placeholders})",
+                [f"complaint_id : ({match})", *complaint_ids],
+            )
+        for complaint_id in complaint_ids:
+            if not _WORD.search(complaint_id):
+                cursor.execute(f"DELETE FROM {SEARCH_FTS_TABLE} WHERE complaint_id = %s", [complaint_id])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_FTS_TABLE} ({_COLUMNS_SQL}) "
+            f"SELECT {_COLUMNS_SQL} FROM fnol_claims WHERE complaint_id IN ({placeholders})",
+            complaint_ids,
+        )
+
+
+def rebuild_search_index() -> int:
+    """Create the index if needed and (SQLite) reload it from fnol_claims. Returns claims indexed."""
+    ensure_search_index()
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"DELETE FROM {SEARCH_FTS_TABLE}")
+            cursor.execute(f"INSERT INTO {SEARCH_FTS_TABLE} ({_COLUMNS_SQL}) SELECT {_COLUMNS_SQL} FROM fnol_claims")
+            cursor.execute(f"INSERT INTO {SEARCH_FTS_TABLE} ({SEARCH_FTS_TABLE}) VALUES ('optimize')")
+        elif connection.vendor == "mysql":
+            cursor.execute("OPTIMIZE TABLE fnol_claims")
+        cursor.execute("SELECT COUNT(*) FROM fnol_claims")
+        return cursor.fetchone()[0]
+
+
+def _mysql_min_token_size() -> int:
+    global _min_token_size
+    if _min_token_size is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT @@innodb_ft_min_token_size")
+            _min_token_size = int(cursor.fetchone()[0])
+    return _min_token_size
+
+
+def _mysql_search_sql(terms: list, min_token_size: int) -> tuple:
+    """
+    (score SQL, WHERE SQL, params for score then WHERE) for MySQL: terms of at least
+    min_token_size characters go to the FULLTEXT MATCH, shorter ones to a REGEXP word-prefix
+    test each. With no indexed term every match scores 0.
+    """
+    indexed = [term for term in terms if len(term) >= min_token_size]
+    conditions: list = []
+    params: list = []
+    score_sql, score_params = "0", []
+    if indexed:
+        score_sql = f"MATCH ({_COLUMNS_SQL}) AGAINST (%s IN BOOLEAN MODE)"
+        score_params = [" ".join(f"+{term}*" for term in indexed)]
+        conditions.append(score_sql)
+        params.extend(score_params)
+    for term in terms:
+        if len(term) < min_token_size:
+            # Terms are \w+ runs, so they hold no regex metacharacters
+            conditions.append(f"CONCAT_WS(' ', {_COLUMNS_SQL}) REGEXP %s")
+            params.append(rf"\b{term}")
+    return score_sql, " AND ".join(conditions), score_params + params
+
+
+def search_claim_ids(query: str, limit: int, offset: int = 0) -> list:
+    """(complaint_id, score) pairs for the best matches, best first; higher score = better match."""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            match = " ".join(f"{_fts_phrase(term)}*" for term in terms)
+            # bm25() is lower for better matches
+            cursor.execute(
+                f"SELECT complaint_id, -bm25({SEARCH_FTS_TABLE}) AS score FROM {SEARCH_FTS_TABLE} "
+                f"WHERE {SEARCH_FTS_TABLE} MATCH %s ORDER BY score DESC, complaint_id LIMIT %s OFFSET %s",
+                [match, limit, offset],
+            )
+        else:
+            score_sql, where_sql, params = _mysql_search_sql(terms, _mysql_min_token_size())
+            cursor.execute(
+                f"SELECT complaint_id, {score_sql} AS score FROM fnol_claims WHERE {where_sql} "
+                f"ORDER BY score DESC, complaint_id LIMIT %s OFFSET %s",
+                [*params, limit, offset],
+            )
+        return [(complaint_id, float(score)) for complaint_id, score in cursor.fetchall()]
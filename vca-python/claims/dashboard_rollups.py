@@ -0,0 +1,196 @@
+"""
+Incrementally maintained dashboard aggregates (dashboard_rollup table).
+
+Each claim contributes to one bucket per dimension: overall total, claim status,
+latest decision, claim type, severity and creation day. A bucket holds claim
+count, auto-approved count, and the sum / count of positive claim amounts, so
+rates and averages come straight out of it.
+
+Writers wrap their claim / evaluation writes in track_dashboard_rollups(ids):
+the tracked claims' contributions are read before and after the block and only
+the difference is applied, in the writer's transaction. dashboard_stats() then
+reads a bounded number of rollup rows however many claims exist.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DashboardRollup, FnolClaim
+
+# Dimensions listed by dashboard_stats (besides "total" and "day")
+ROLLUP_DIMENSIONS = ("status", "decision", "claim_type", "severity")
+DASHBOARD_DEFAULT_DAYS = 30
+
+# Columns one claim's contribution is computed from
+_CONTRIBUTION_COLUMNS = (
+    "complaint_id",
+    "claim_status__status_name",
+    "eval_decision",
+    "eval_claim_type",
+    "eval_llm_severity",
+    "eval_claim_amount",
+    "eval_estimated_amount",
+    "created_date",
+    "incident_date_time",
+)
+
+
+def _contribution(row: dict) -> dict:
+    """(dimension, bucket) -> (claims, auto approved, amount, amounts counted) for one claim row."""
+    auto_approved = 1 if (row["eval_decision"] or "").strip() == "Auto Approve" else 0
+    amount = row["eval_claim_amount"] or row["eval_estimated_amount"] or Decimal("0")
+    counted = 1 if amount > 0 else 0
+    if not counted:
+        amount = Decimal("0")
+    created = row["created_date"] or row["incident_date_time"]
+    day = timezone.localtime(created).date().isoformat() if created else "unknown"
+    buckets = (
+        ("total", "all"),
+        ("status", row["claim_status__status_name"] or "Open"),
+        ("decision", row["eval_decision"] or "Not evaluated"),
+        ("claim_type", row["eval_claim_type"] or "Unknown"),
+        ("severity", row["eval_llm_severity"] or "Unknown"),
+        ("day", day),
+    )
+    return {(dimension, bucket[:100]): (1, auto_approved, amount, counted) for dimension, bucket in buckets}
+
+
+def _totals(rows: Iterable[dict]) -> dict:
+    totals: dict = defaultdict(lambda: [0, 0, Decimal("0"), 0])
+    for row in rows:
+        for key, values in _contribution(row).items():
+            entry = totals[key]
+            for i, value in enumerate(values):
+                entry[i] += value
+    return totals
+
+
+def _claim_rows(complaint_ids: list, lock: bool = False) -> list:
+    qs = FnolClaim.objects.filter(complaint_id__in=complaint_ids).order_by("complaint_id")
+    if lock:
+        # Locking read of the current rows (not a snapshot): a concurrent writer of the same
+        # claims waits until this transaction commits, then reads our result as its "before".
+        # OF self leaves the joined claim_status rows unlocked where the database allows it.
+        of = ("self",) if connection.features.has_select_for_update_of else ()
+        qs = qs.select_for_update(of=of)
+    return list(qs.values(*_CONTRIBUTION_COLUMNS))
+
+
+def apply_rollup_delta(delta: dict) -> None:
+    """Add delta ((dimension, bucket) -> [claims, auto approved, amount, amounts counted]) to the rollups."""
+    delta = {key: values for key, values in delta.items() if any(values)}
+    if not delta:
+        return
+    # Missing buckets first (a concurrent writer may create the same one), then atomic increments
+    DashboardRollup.objects.bulk_create(
+        [DashboardRollup(dimension=dimension, bucket=bucket) for dimension, bucket in delta],
+        ignore_conflicts=True,
+    )
+    for (dimension, bucket), (claims, auto_approved, amount, counted) in delta.items():
+        DashboardRollup.objects.filter(dimension=dimension, bucket=bucket).update(
+            claim_count=F("claim_count") + claims,
+            auto_approved_count=F("auto_approved_count") + auto_approved,
+            amount_total=F("amount_total") + amount,
+            amount_count=F("amount_count") + counted,
+        )
+
+
+@contextmanager
+def track_dashboard_rollups(complaint_ids: Iterable[str]):
+    """
+    Around writes to the given claims (or their evaluations): applies the change in
+    their rollup contributions when the block exits, atomically with the writes.
+    The claim rows are locked for the block, so concurrent writers of one claim
+    apply their deltas one after the other instead of both from the same "before".
+    """
+    complaint_ids = list(complaint_ids)
+    with transaction.atomic():
+        before = _totals(_claim_rows(complaint_ids, lock=True))
+        yield
+        after = _totals(_claim_rows(complaint_ids))
+        delta = {}
+        for key in set(before) | set(after):
+            old = before.get(key, (0, 0, Decimal("0"), 0))
+            new = after.get(key, (0, 0, Decimal("0"), 0))
+            delta[key] = [n - o for n, o in zip(new, old)]
+        apply_rollup_delta(delta)
+
+
+def rebuild_dashboard_rollups(chunk_size: int = 2000) -> int:
+    """
+    Recompute every rollup row from fnol_claims and replace the table. Returns claims counted.
+    The rollup rows are locked before fnol_claims is read, so a concurrent writer's delta
+    lands either in what is read here or on top of the rebuilt rows, never in between.
+    """
+    with transaction.atomic():
+        list(DashboardRollup.objects.select_for_update().values_list("pk", flat=True))
+        rows = FnolClaim.objects.order_by().values(*_CONTRIBUTION_COLUMNS).iterator(chunk_size=chunk_size)
+        totals = _totals(rows)
+        DashboardRollup.objects.all().delete()
+        DashboardRollup.objects.bulk_create([
+            DashboardRollup(
+                dimension=dimension,
+                bucket=bucket,
+                claim_count=claims,
+                auto_approved_count=auto_approved,
+                amount_total=amount,
+                amount_count=amounts_counted,
+            )
+            for (dimension, bucket), (claims, auto_approved, amount, amounts_counted) in totals.items()
+        ], batch_size=chunk_size)
+    return totals[("total", "all")][0] if ("total", "all") in totals else 0
+
+
+def _bucket_stats(row: Optional[DashboardRollup]) -> dict:
+    claims = row.claim_count if row else 0
+    auto_approved = row.auto_approved_count if row else 0
+    amount_total = float(row.amount_total) if row else 0.0
+    amount_count = row.amount_count if row else 0
+    return {
+        "count": claims,
+        "auto_approved": auto_approved,
+        "auto_approval_rate": round(auto_approved / claims * 100, 2) if claims else 0.0,
+        "total_claim_amount": round(amount_total, 2),
+        "average_claim_amount": round(amount_total / amount_count, 2) if amount_count else 0.0,
+    }
+
+
+def dashboard_stats(days: int = DASHBOARD_DEFAULT_DAYS) -> dict:
+    """
+    Dashboard figures from the rollup table: overall totals, a breakdown per dimension
+    and the daily trend for the last `days` days (today included, empty days as zeros).
+    """
+    today = timezone.localdate()
+    day_keys = [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+    rows = DashboardRollup.objects.filter(dimension__in=("total",) + ROLLUP_DIMENSIONS, claim_count__gt=0)
+    by_dimension: dict = defaultdict(list)
+    total = None
+    for row in rows:
+        if row.dimension == "total":
+            total = row
+        else:
+            by_dimension[row.dimension].append(row)
+    daily = {row.bucket: row for row in DashboardRollup.objects.filter(dimension="day", bucket__in=day_keys)}
+
+    overall = _bucket_stats(total)
+    stats = {"total_claims": overall.pop("count"), **overall}
+    for dimension in ROLLUP_DIMENSIONS:
+        stats[f"by_{dimension}"] = [
+            {dimension: row.bucket, **_bucket_stats(row)}
+            for row in sorted(by_dimension[dimension], key=lambda r: (-r.claim_count, r.bucket))
+        ]
+    stats["daily"] = []
+    for day in day_keys:
+        row = daily.get(day)
+        stats["daily"].append({
+            "date": day,
+            "claims": row.claim_count if row else 0,
+            "approved": row.auto_approved_count if row else 0,
+        })
+    return stats
@@ -0,0 +1,80 @@
+"""
+Process-local LRU cache of _run_process_claim_logic results.
+
+Keys are content addresses: a hash of the canonicalized claim payload plus
+everything else the evaluation reads (the rule snapshot fingerprint, the
+keyword matching mode, today's date and a caller-supplied photo flag). An
+unchanged claim evaluated against unchanged rules therefore returns the stored
+result without recomputation or queries, and any change to the payload or the
+rules produces a different key. The fingerprint hashes the master rows
+themselves, so a rule edit made through any worker changes the key here as
+soon as this worker's snapshot reloads; no shared version counter is needed.
+PricingConfig is not part of the key because the evaluation never reads it.
+Size is bounded by EVALUATION_CACHE_MAX_ENTRIES (0 disables the cache).
+"""
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Optional
+
+from django.conf import settings
+
+from .rule_snapshot import RuleSnapshot
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, dict]" = OrderedDict()
+_hits = 0
+_misses = 0
+
+
+def _max_entries() -> int:
+    return int(getattr(settings, "EVALUATION_CACHE_MAX_ENTRIES", 1024))
+
+
+def evaluation_cache_key(data: dict, snapshot: RuleSnapshot, has_photos: Optional[bool] = None) -> str:
+    """sha256 over the canonical JSON payload and the configuration the evaluation depends on."""
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    config = "|".join((
+        snapshot.fingerprint,
+        str(bool(getattr(settings, "DAMAGE_KEYWORD_WORD_BOUNDARY", False))),
+        date.today().isoformat(),
+        str(has_photos),
+    ))
+    return hashlib.sha256(f"{config}\n{payload}".encode()).hexdigest()
+
+
+def cached_evaluation(key: str, compute: Callable[[], dict]) -> dict:
+    """Return a copy of the stored result for key, computing and storing it on a miss."""
+    global _hits, _misses
+    max_entries = _max_entries()
+    if max_entries <= 0:
+        return compute()
+    with _lock:
+        result = _entries.get(key)
+        if result is not None:
+            _entries.move_to_end(key)
+            _hits += 1
+            return copy.deepcopy(result)
+        _misses += 1
+
+    result = compute()
+    with _lock:
+        _entries[key] = copy.deepcopy(result)
+        _entries.move_to_end(key)
+        while len(_entries) > max_entries:
+            _entries.popitem(last=False)
+    return result
+
+
+def invalidate_evaluation_cache() -> None:
+    """Drop every cached result. Entries never go stale, so this only frees memory."""
+    with _lock:
+        _entries.clear()
+
+
+def evaluation_cache_info() -> dict:
+    with _lock:
+        return {"entries": len(_entries), "max_entries": _max_entries(), "hits": _hits, "misses": _misses}
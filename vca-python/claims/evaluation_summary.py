@@ -0,0 +1,60 @@
+"""
+Latest-evaluation summary denormalized onto fnol_claims (the eval_* columns).
+
+Readers take amount, decision, severity and evaluation status from the claim row
+instead of joining claim_evaluation_response on is_latest. Every writer of
+evaluation rows (run_fraud_detection, damage assessment, rescore_claims) calls
+refresh_evaluation_summary() for the claims it touched inside the same
+transaction. Migration 0006 fills the columns for existing rows;
+backfill_evaluation_summary re-runs that fill at any time.
+"""
+from typing import Iterable, Optional
+
+from django.db.models import OuterRef, Subquery
+
+from .models import ClaimEvaluationResponse, FnolClaim
+
+# fnol_claims summary column -> claim_evaluation_response column
+EVALUATION_SUMMARY_FIELDS = {
+    "eval_id": "id",
+    "eval_version": "version",
+    "eval_decision": "decision",
+    "eval_claim_status": "claim_status",
+    "eval_claim_type": "claim_type",
+    "eval_reason": "reason",
+    "eval_estimated_amount": "estimated_amount",
+    "eval_claim_amount": "claim_amount",
+    "eval_llm_damages": "llm_damages",
+    "eval_llm_severity": "llm_severity",
+    "eval_created_date": "created_date",
+    "eval_updated_date": "updated_date",
+}
+
+
+def refresh_evaluation_summary(complaint_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Copy each claim's latest evaluation (lowest id among is_latest rows, as
+    .filter(is_latest=True).first() picks) onto its eval_* columns in one UPDATE;
+    claims without one get NULLs. None refreshes every claim. Returns rows updated.
+    """
+    latest = ClaimEvaluationResponse.objects.filter(
+        complaint_id=OuterRef("complaint_id"), is_latest=True
+    ).order_by("id")
+    qs = FnolClaim.objects.all()
+    if complaint_ids is not None:
+        qs = qs.filter(complaint_id__in=list(complaint_ids))
+    return qs.update(**{
+        column: Subquery(latest.values(field)[:1])
+        for column, field in EVALUATION_SUMMARY_FIELDS.items()
+    })
+
+
+def latest_evaluation(claim: FnolClaim) -> Optional[ClaimEvaluationResponse]:
+    """Unsaved ClaimEvaluationResponse holding claim's summary columns, or None if never evaluated."""
+    if claim.eval_id is None:
+        return None
+    return ClaimEvaluationResponse(
+        complaint_id=claim.complaint_id,
+        is_latest=True,
+        **{field: getattr(claim, column) for column, field in EVALUATION_SUMMARY_FIELDS.items()},
+    )
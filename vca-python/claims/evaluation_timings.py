@@ -0,0 +1,137 @@
+"""
+Opt-in timing diagnostics for claim evaluation.
+
+An EvaluationTimer measures wall time, DB query count and DB time for each
+named stage of one evaluation (product rule, every Fraud Check rule, photo
+check, damage confidence, threshold lookup, persistence). Stage figures are
+inclusive: a query made by the photo check also counts towards the fraud rule
+that triggered it. Finished timers are folded into a process-wide histogram
+per stage, read with timing_histogram().
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+from django.db import connection
+
+# Upper bounds (milliseconds) of the histogram buckets; the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_lock = threading.Lock()
+_histogram: dict = {}
+
+
+class EvaluationTimer:
+    """Use as a context manager around one evaluation; open stages with stage(name)."""
+
+    def __init__(self):
+        self.stages: list = []
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.wall_seconds = 0.0
+        self._open: list = []
+        self._started = 0.0
+        self._wrapper = None
+
+    def __enter__(self) -> "EvaluationTimer":
+        self._wrapper = connection.execute_wrapper(self._execute)
+        self._wrapper.__enter__()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.wall_seconds = time.perf_counter() - self._started
+        self._wrapper.__exit__(*exc)
+        _record(self.stages)
+
+    def _execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_seconds += elapsed
+            for entry in self._open:
+                entry["queries"] += 1
+                entry["db_seconds"] += elapsed
+
+    @contextmanager
+    def stage(self, name: str):
+        entry = {"stage": name, "queries": 0, "db_seconds": 0.0, "start": time.perf_counter()}
+        self._open.append(entry)
+        try:
+            yield
+        finally:
+            entry["wall_seconds"] = time.perf_counter() - entry["start"]
+            self._open.remove(entry)
+            self.stages.append(entry)
+
+    def as_dict(self) -> dict:
+        """The _timings block: stages in start order, times in milliseconds."""
+        return {
+            "wall_ms": _ms(self.wall_seconds),
+            "queries": self.queries,
+            "db_ms": _ms(self.db_seconds),
+            "stages": [
+                {
+                    "stage": entry["stage"],
+                    "wall_ms": _ms(entry["wall_seconds"]),
+                    "queries": entry["queries"],
+                    "db_ms": _ms(entry["db_seconds"]),
+                }
+                for entry in sorted(self.stages, key=lambda e: e["start"])
+            ],
+        }
+
+
+def timed(timer: Optional[EvaluationTimer], name: str):
+    """timer.stage(name), or a no-op context when diagnostics are off."""
+    return timer.stage(name) if timer is not None else nullcontext()
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _record(stages: list) -> None:
+    with _lock:
+        for entry in stages:
+            ms = entry["wall_seconds"] * 1000
+            stats = _histogram.get(entry["stage"])
+            if stats is None:
+                stats = _histogram[entry["stage"]] = {
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "queries": 0,
+                    "buckets": [0] * (len(HISTOGRAM_BUCKETS_MS) + 1),
+                }
+            stats["count"] += 1
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["queries"] += entry["queries"]
+            stats["buckets"][bisect_left(HISTOGRAM_BUCKETS_MS, ms)] += 1
+
+
+def timing_histogram() -> dict:
+    """Per-stage count, mean / max wall time, queries and bucket counts since process start."""
+    labels = [f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+    with _lock:
+        return {
+            stage: {
+                "count": stats["count"],
+                "mean_ms": round(stats["total_ms"] / stats["count"], 3),
+                "max_ms": round(stats["max_ms"], 3),
+                "queries": stats["queries"],
+                "buckets": dict(zip(labels, stats["buckets"])),
+            }
+            for stage, stats in sorted(_histogram.items())
+        }
+
+
+def reset_timing_histogram() -> None:
+    with _lock:
+        _histogram.clear()
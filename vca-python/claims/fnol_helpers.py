@@ -0,0 +1,120 @@
+"""
+FNOL payload helpers shared by save_fnol (views) and the bulk / file ingestion
+path (fnol_ingest): mapping an FnolPayload onto fnol_claims columns, its photo
+list, the fingerprint that lets an identical resend skip every write, and the
+fnol_damage_photos sync.
+"""
+import hashlib
+import json
+from typing import Optional
+
+from django.core.exceptions import ValidationError
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import FnolClaim, FnolDamagePhoto
+
+
+def fnol_payload_to_claim_data(data: dict) -> dict:
+    """Map FnolPayload (raw_response format) to FnolClaim fields."""
+    policy = data.get("policy") or {}
+    vehicle = data.get("vehicle") or {}
+    incident = data.get("incident") or {}
+    history = data.get("history") or {}
+    claimant = data.get("claimant") or {}
+    documents = data.get("documents") or {}
+    complaint_id = data.get("claim_id") or ""
+    incident_dt = incident.get("date_time_of_loss")
+    if incident_dt:
+        try:
+            incident_dt = parse_datetime(str(incident_dt))
+        except (TypeError, ValueError):
+            incident_dt = None
+    policy_start = parse_date(policy.get("policy_start_date")) if policy.get("policy_start_date") else None
+    policy_end = parse_date(policy.get("policy_end_date")) if policy.get("policy_end_date") else None
+    return {
+        "complaint_id": complaint_id,
+        "coverage_type": policy.get("coverage_type"),
+        "policy_number": policy.get("policy_number"),
+        "policy_status": policy.get("policy_status"),
+        "policy_start_date": policy_start,
+        "policy_end_date": policy_end,
+        "policy_holder_name": claimant.get("driver_name"),
+        "vehicle_make": vehicle.get("make"),
+        "vehicle_year": vehicle.get("year"),
+        "vehicle_model": vehicle.get("model"),
+        "vehicle_registration_number": vehicle.get("registration_number"),
+        "incident_type": incident.get("claim_type"),
+        "incident_description": incident.get("loss_description"),
+        "incident_date_time": incident_dt,
+        "fir_document_copy": documents.get("fir_path") if isinstance(documents.get("fir_path"), str) else None,
+        "insurance_document_copy": documents.get("insurance_path") if isinstance(documents.get("insurance_path"), str) else None,
+        "re_open": 0,  # New/fetched claim: set to 0 when saving via Fetch FNOL Data
+    }
+
+
+def fnol_payload_photos(data: dict) -> Optional[list]:
+    """Stripped documents.photos paths, or None when the payload does not carry a photo list."""
+    photo_paths = (data.get("documents") or {}).get("photos")
+    if not isinstance(photo_paths, list):
+        return None
+    return [path.strip() for path in photo_paths if isinstance(path, str) and path.strip()]
+
+
+def fnol_payload_fingerprint(claim_data: dict, photos: Optional[list]) -> str:
+    """
+    sha256 of a payload's claim columns (values normalized by their model field, so "2019"
+    and 2019 agree) and its photo list (order-insensitive; None when photos are left alone).
+    """
+    canonical = {}
+    for field, value in claim_data.items():
+        if field in ("complaint_id", "payload_fingerprint"):
+            continue
+        try:
+            value = FnolClaim._meta.get_field(field).to_python(value)
+        except ValidationError:
+            pass
+        canonical[field] = value
+    payload = json.dumps(
+        {"claim": canonical, "photos": sorted(photos) if photos is not None else None},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def fnol_payload_unchanged(stored_fingerprint: Optional[str], stored_re_open, fingerprint: str) -> bool:
+    """True when a claim already holds the payload with this fingerprint and has not been re-opened since."""
+    # A re-opened claim is reset to re_open=0 by a re-save, as before fingerprints
+    return stored_fingerprint == fingerprint and not stored_re_open
+
+
+def sync_damage_photos(photos_by_claim: dict) -> None:
+    """
+    Make each claim's fnol_damage_photos rows match its list of paths (complaint_id -> paths).
+    Rows whose path is no longer listed are deleted and new paths bulk-inserted; rows that
+    stay keep their ids, so an unchanged list writes nothing. Repeated paths count per copy.
+    """
+    if not photos_by_claim:
+        return
+    existing: dict = {}
+    for photo_id, complaint_id, path in (
+        FnolDamagePhoto.objects.filter(complaint_id__in=list(photos_by_claim))
+        .order_by("id")
+        .values_list("id", "complaint_id", "photo_path")
+    ):
+        existing.setdefault((complaint_id, path), []).append(photo_id)
+
+    new_photos = []
+    kept: dict = {}
+    for complaint_id, paths in photos_by_claim.items():
+        for path in paths:
+            key = (complaint_id, path)
+            kept[key] = kept.get(key, 0) + 1
+            if kept[key] > len(existing.get(key, ())):
+                new_photos.append(FnolDamagePhoto(complaint_id=complaint_id, photo_path=path))
+    stale_ids = [photo_id for key, ids in existing.items() for photo_id in ids[kept.get(key, 0):]]
+
+    if stale_ids:
+        FnolDamagePhoto.objects.filter(id__in=stale_ids).delete()
+    if new_photos:
+        FnolDamagePhoto.objects.bulk_create(new_photos)
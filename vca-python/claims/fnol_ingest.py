@@ -0,0 +1,274 @@
+"""
+Bulk FNOL ingestion: validate a batch of FnolPayloads and upsert them into
+fnol_claims / fnol_damage_photos the way save_fnol does, but set-based.
+
+Payloads are validated up front (claim_id present, dates parseable, values fit
+their columns); invalid items are reported and left out. The rest are written
+in chunks, each in its own transaction: one bulk_create(update_conflicts=True)
+upserts the chunk's claims, the photos of claims whose payload carries
+documents.photos are synced (removed paths deleted, new ones bulk-inserted),
+and the dashboard rollups and search index are updated for the chunk. Payloads
+whose fingerprint matches the one stored on their claim are skipped with no
+writes at all (reported "unchanged"). A chunk that fails in the database is
+rolled back and its items reported as errors; other chunks are unaffected.
+
+import_fnol_records() feeds a stream of records (NDJSON lines or CSV rows, see
+iter_ndjson_records / iter_csv_records) through the same path one batch at a
+time, so memory stays constant however large the file. Records are numbered
+from 1 (NDJSON: line number; CSV: row after the header); every batch is
+committed before the next is read, so an interrupted import resumes with
+skip = the last record reported. Resuming re-reads the skipped records rather
+than seeking to a byte offset, on purpose: the same path serves stdin and
+uploaded files, which cannot seek, and a CSV row may span several lines, so a
+record number is the only position every source shares. The iterators take
+skip themselves and do not decode the records they pass over, so a resume
+costs one read of the skipped prefix, not a re-parse of it.
+"""
+import csv
+import json
+import time
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection, reset_queries
+from django.utils import timezone
+
+from .claim_search import index_claims
+from .dashboard_rollups import track_dashboard_rollups
+from .fnol_helpers import (
+    fnol_payload_fingerprint,
+    fnol_payload_photos,
+    fnol_payload_to_claim_data,
+    fnol_payload_unchanged,
+    sync_damage_photos,
+)
+from .models import FnolClaim, FnolDamagePhoto
+
+FNOL_BULK_CHUNK_SIZE = 500
+FNOL_BULK_MAX_ITEMS = 10000
+FNOL_IMPORT_FORMATS = ("ndjson", "csv")
+# Records not saved that the upload endpoint lists in its response
+FNOL_IMPORT_MAX_REPORTED_ERRORS = 100
+
+_PHOTO_PATH_MAX_LENGTH = FnolDamagePhoto._meta.get_field("photo_path").max_length
+
+
+def _validate_payload(payload) -> tuple:
+    """(complaint_id, claim_data, photo paths or None, errors) for one FnolPayload."""
+    if not isinstance(payload, dict):
+        return "", None, None, {"fnol": ["Each item must be an FnolPayload object."]}
+    complaint_id = str(payload.get("claim_id") or "").strip()
+    if not complaint_id:
+        return "", None, None, {"claim_id": ["claim_id is required."]}
+    try:
+        claim_data = fnol_payload_to_claim_data(payload)
+    except (TypeError, ValueError) as exc:
+        return complaint_id, None, None, {"fnol": [str(exc) or "Invalid date value."]}
+    claim_data["complaint_id"] = complaint_id
+    claim = FnolClaim(**claim_data)
+    try:
+        claim.clean_fields()
+    except ValidationError as exc:
+        return complaint_id, None, None, exc.message_dict
+    # Cleaned values: e.g. a CSV feed's "2019" becomes the integer vehicle_year
+    claim_data = {field: getattr(claim, field) for field in claim_data}
+
+    photos = fnol_payload_photos(payload)
+    if photos and any(len(path) > _PHOTO_PATH_MAX_LENGTH for path in photos):
+        return complaint_id, None, None, {
+            "photos": [f"Photo paths must be at most {_PHOTO_PATH_MAX_LENGTH} characters."]
+        }
+    claim_data["payload_fingerprint"] = fnol_payload_fingerprint(claim_data, photos)
+    return complaint_id, claim_data, photos, None
+
+
+def _unchanged_ids(chunk: list) -> set:
+    """complaint_ids of the chunk whose claim already holds the same payload (one query)."""
+    fingerprints = {claim_data["complaint_id"]: claim_data["payload_fingerprint"] for _, claim_data, _ in chunk}
+    return {
+        complaint_id
+        for complaint_id, stored_fingerprint, stored_re_open in FnolClaim.objects.filter(
+            complaint_id__in=list(fingerprints)
+        ).values_list("complaint_id", "payload_fingerprint", "re_open")
+        if fnol_payload_unchanged(stored_fingerprint, stored_re_open, fingerprints[complaint_id])
+    }
+
+
+def _save_chunk(chunk: list) -> None:
+    """Upsert one chunk of (index, claim_data, photos) in a single transaction."""
+    now = timezone.now()
+    complaint_ids = [claim_data["complaint_id"] for _, claim_data, _ in chunk]
+    claims = [
+        FnolClaim(**claim_data, created_date=now, updated_date=now)
+        for _, claim_data, _ in chunk
+    ]
+    # created_date is only written on insert, as in save_fnol
+    update_fields = [field for field in chunk[0][1] if field != "complaint_id"] + ["updated_date"]
+    # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+    unique_fields = ["complaint_id"] if connection.features.supports_update_conflicts_with_target else None
+    replaced = [(claim_data["complaint_id"], photos) for _, claim_data, photos in chunk if photos is not None]
+
+    with track_dashboard_rollups(complaint_ids):
+        FnolClaim.objects.bulk_create(
+            claims, update_conflicts=True, update_fields=update_fields, unique_fields=unique_fields
+        )
+        sync_damage_photos(dict(replaced))
+        index_claims(complaint_ids)
+
+
+def ingest_fnol_payloads(payloads: Sequence, chunk_size: int = FNOL_BULK_CHUNK_SIZE) -> list:
+    """
+    Validate and upsert payloads. Returns one result per payload, in order:
+    {"index", "claim_id", "status": "saved" | "unchanged" | "error" | "skipped", and "errors" or "detail"}.
+    A payload whose fingerprint matches the claim's stored one is "unchanged" and not written.
+    When a claim_id repeats, the last occurrence is saved and earlier ones are skipped.
+    """
+    results: list = [None] * len(payloads)
+    valid: dict = {}
+    for index, payload in enumerate(payloads):
+        complaint_id, claim_data, photos, errors = _validate_payload(payload)
+        if errors:
+            results[index] = {"index": index, "claim_id": complaint_id or None, "status": "error", "errors": errors}
+            continue
+        previous = valid.pop(complaint_id, None)
+        if previous is not None:
+            results[previous[0]] = {
+                "index": previous[0],
+                "claim_id": complaint_id,
+                "status": "skipped",
+                "detail": f"Superseded by item {index} with the same claim_id.",
+            }
+        valid[complaint_id] = (index, claim_data, photos)
+
+    items = sorted(valid.values(), key=lambda item: item[0])
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        detail: Optional[str] = None
+        unchanged: set = set()
+        try:
+            unchanged = _unchanged_ids(chunk)
+            changed = [item for item in chunk if item[1]["complaint_id"] not in unchanged]
+            if changed:
+                _save_chunk(changed)
+        except DatabaseError as exc:
+            detail = f"Database error: {exc}"
+        for index, claim_data, _ in chunk:
+            complaint_id = claim_data["complaint_id"]
+            if complaint_id in unchanged:
+                results[index] = {"index": index, "claim_id": complaint_id, "status": "unchanged"}
+                continue
+            result = {"index": index, "claim_id": complaint_id, "status": "error" if detail else "saved"}
+            if detail:
+                result["detail"] = detail
+            results[index] = result
+    return results
+
+
+def fnol_import_format(filename: str, requested: Optional[str] = None) -> str:
+    """requested if given, else "csv" for a .csv file name and "ndjson" otherwise."""
+    if requested:
+        return requested
+    return "csv" if (filename or "").lower().endswith(".csv") else "ndjson"
+
+
+def iter_ndjson_records(lines: Iterable[str], skip: int = 0) -> Iterator[tuple]:
+    """
+    (record number, payload, error) per non-blank line after line skip; payload is None
+    when the line is not JSON.
+    """
+    for number, line in enumerate(lines, 1):
+        if number <= skip:
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield number, json.loads(line), None
+        except json.JSONDecodeError as exc:
+            yield number, None, f"Invalid JSON: {exc}"
+
+
+def _csv_payload(row: dict) -> dict:
+    """
+    FnolPayload from a CSV row whose headers are payload paths: claim_id,
+    policy.policy_number, vehicle.year, ... documents.photos is "|"-separated.
+    """
+    payload: dict = {}
+    for column, value in row.items():
+        if not column or value is None or value == "":
+            continue
+        path = column.strip().split(".")
+        if path == ["documents", "photos"]:
+            value = [photo for photo in value.split("|") if photo.strip()]
+        target = payload
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        if isinstance(target, dict):
+            target[path[-1]] = value
+    return payload
+
+
+def iter_csv_records(lines: Iterable[str], skip: int = 0) -> Iterator[tuple]:
+    """(record number, payload, None) per CSV row after the header row and the first skip rows."""
+    for number, row in enumerate(csv.DictReader(lines), 1):
+        if number > skip:
+            yield number, _csv_payload(row), None
+
+
+def import_fnol_records(
+    records: Iterable[tuple],
+    batch_size: int = FNOL_BULK_CHUNK_SIZE,
+    skip: int = 0,
+    on_error: Optional[Callable[[int, Optional[str], object], None]] = None,
+    on_batch: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Save (record number, payload, error) records in batches of batch_size, ignoring
+    record numbers <= skip. on_error(record, claim_id, errors) is called for every
+    record that failed or was skipped, on_batch(totals) after every committed batch.
+    Returns the totals: records, saved, unchanged, failed, skipped, last_record,
+    elapsed_seconds, records_per_second.
+    """
+    totals = {"records": 0, "saved": 0, "unchanged": 0, "failed": 0, "skipped": 0, "last_record": skip}
+    started = time.perf_counter()
+    batch: list = []
+
+    def timing():
+        elapsed = time.perf_counter() - started
+        totals["elapsed_seconds"] = round(elapsed, 2)
+        totals["records_per_second"] = round(totals["records"] / elapsed, 1) if elapsed else 0.0
+
+    def flush():
+        results = ingest_fnol_payloads([payload for _, payload in batch], chunk_size=batch_size)
+        for (number, _), result in zip(batch, results):
+            totals["failed" if result["status"] == "error" else result["status"]] += 1
+            if result["status"] in ("error", "skipped") and on_error:
+                on_error(number, result["claim_id"], result.get("errors") or result.get("detail"))
+        totals["records"] += len(batch)
+        totals["last_record"] = batch[-1][0]
+        batch.clear()
+        # With DEBUG on, connection.queries would otherwise grow with the file
+        reset_queries()
+        timing()
+        if on_batch:
+            on_batch(totals)
+
+    for number, payload, error in records:
+        if number <= skip:
+            continue
+        if error:
+            totals["records"] += 1
+            totals["failed"] += 1
+            # last_record may only pass records that are committed
+            if not batch:
+                totals["last_record"] = number
+            if on_error:
+                on_error(number, None, error)
+            continue
+        batch.append((number, payload))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    timing()
+    return totals
@@ -0,0 +1,88 @@
+"""
+Aho-Corasick multi-keyword matcher used for damage_code_master keyword scoring.
+
+The automaton is built once from the keyword list and finds every keyword in a
+text with a single left-to-right pass, so the cost of matching no longer grows
+with the number of damage codes.
+"""
+from collections import deque
+from typing import Iterable, List
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive matcher over a fixed list of keywords.
+    find() returns the indexes (into the original list) of the keywords present in a text.
+    With word_boundary=True a keyword only counts when it is not part of a longer word
+    (e.g. "door" matches "rear door dent" but not "doorframe").
+    Empty keywords never match.
+    """
+
+    def __init__(self, keywords: Iterable[str], word_boundary: bool = False):
+        self.keywords = tuple((k or "").lower() for k in keywords)
+        self.word_boundary = word_boundary
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[tuple] = [()]
+
+        for index, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state] += (index,)
+
+        # Breadth-first: failure links point at the longest proper suffix that is also a prefix;
+        # each state's output also includes everything reachable through its failure link.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def _bounded(self, text: str, start: int, end: int) -> bool:
+        if start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if end < len(text) and _is_word_char(text[end]):
+            return False
+        return True
+
+    def find(self, text: str) -> List[int]:
+        """Sorted indexes of the keywords that occur in text."""
+        text = (text or "").lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                if index in found:
+                    continue
+                if self.word_boundary and not self._bounded(
+                    text, i + 1 - len(self.keywords[index]), i + 1
+                ):
+                    continue
+                found.add(index)
+        return sorted(found)
@@ -0,0 +1,47 @@
+"""
+Populate the latest-evaluation summary columns on fnol_claims (eval_*) from
+claim_evaluation_response.
+
+Claims are refreshed in keyset chunks ordered by complaint_id, one UPDATE per
+chunk, so the table is never locked as a whole. Safe to re-run at any time.
+
+Usage:
+    python manage.py backfill_evaluation_summary
+    python manage.py backfill_evaluation_summary --chunk-size 5000
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from claims.evaluation_summary import refresh_evaluation_summary
+from claims.models import FnolClaim
+
+
+class Command(BaseCommand):
+    help = "Copy each claim's latest evaluation onto the fnol_claims eval_* summary columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Claims refreshed per UPDATE.")
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options["chunk_size"])
+        started = time.perf_counter()
+        last_id = ""
+        done = 0
+        while True:
+            ids = list(
+                FnolClaim.objects.filter(complaint_id__gt=last_id)
+                .order_by("complaint_id")
+                .values_list("complaint_id", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                refresh_evaluation_summary(ids)
+            last_id = ids[-1]
+            done += len(ids)
+            self.stdout.write(f"{done} claims, last {last_id}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed the evaluation summary of {done} claims in {time.perf_counter() - started:.1f}s."
+        ))
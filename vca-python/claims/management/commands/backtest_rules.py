@@ -0,0 +1,50 @@
+"""
+Backtest the claim rules over every fnol_claims row with the vectorized evaluator.
+
+Usage:
+    python manage.py backtest_rules
+    python manage.py backtest_rules --early-claim-days 45
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from claims.backtest import decision_flips, evaluate_book, load_claim_book, with_early_claim_window
+from claims.rule_snapshot import get_rule_snapshot
+
+
+class Command(BaseCommand):
+    help = "Evaluate the fraud / threshold rules over the whole claim book, optionally with a what-if change."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--early-claim-days",
+            type=int,
+            default=None,
+            help="Compare the current rules with an Early Claim window of this many days.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        book = load_claim_book()
+        loaded = time.perf_counter()
+        snapshot = get_rule_snapshot()
+        current = evaluate_book(book, snapshot)
+        evaluated = time.perf_counter()
+
+        self.stdout.write(
+            f"Loaded {len(book)} claims in {loaded - started:.2f}s, evaluated in {evaluated - loaded:.2f}s."
+        )
+        self.stdout.write(f"Current rules: {current.decision_counts()}")
+
+        days = options["early_claim_days"]
+        if days is None:
+            return
+        proposed = evaluate_book(book, with_early_claim_window(snapshot, days))
+        self.stdout.write(f"Early Claim window {days} days: {proposed.decision_counts()}")
+        flips = decision_flips(current, proposed)
+        if not flips:
+            self.stdout.write(self.style.SUCCESS("No decisions change."))
+            return
+        for change, count in flips.items():
+            self.stdout.write(f"  {change}: {count}")
@@ -0,0 +1,60 @@
+"""
+Export FNOL claims with every evaluation version (llm_damages parsed) and their
+photos as CSV or NDJSON, streamed in chunks so memory stays flat.
+
+Filters are the list_fnol ones. CSV has one row per claim and evaluation version;
+NDJSON one object per claim with "photos" and "evaluations".
+
+Usage:
+    python manage.py export_claims --output claims.csv
+    python manage.py export_claims --format ndjson --output claims.ndjson
+    python manage.py export_claims --claim-status "Business Rule Validation-fail" --from 2024-01-01 --to 2024-06-30
+"""
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from claims.claim_export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_export
+from claims.models import FnolClaim
+from claims.views import _filter_fnol_claims
+
+
+class Command(BaseCommand):
+    help = "Stream claims with their evaluation history and photos to a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", dest="export_format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--output", default="-", help="File to write ('-' for stdout, the default).")
+        parser.add_argument("--claim-status", help="claim_status ids or names, comma-separated.")
+        parser.add_argument("--re-open", dest="re_open", help="Only claims with this re_open value.")
+        parser.add_argument("--coverage-type", help="Coverage type (case-insensitive).")
+        parser.add_argument("--policy-number", help="Exact policy number.")
+        parser.add_argument("--from", dest="incident_from", help="Incident date from (YYYY-MM-DD, inclusive).")
+        parser.add_argument("--to", dest="incident_to", help="Incident date to (YYYY-MM-DD, inclusive).")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Claims read per query.")
+
+    def handle(self, *args, **options):
+        params = {
+            key: options[key]
+            for key in ("claim_status", "re_open", "coverage_type", "policy_number", "incident_from", "incident_to")
+            if options[key]
+        }
+        try:
+            qs = _filter_fnol_claims(FnolClaim.objects.all(), params)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+        lines = 0
+        out = sys.stdout if options["output"] == "-" else open(options["output"], "w", newline="", encoding="utf-8")
+        try:
+            for line in iter_export(qs, options["export_format"], max(1, options["chunk_size"])):
+                out.write(line)
+                lines += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        self.stderr.write(self.style.SUCCESS(
+            f"Wrote {lines} lines in {time.perf_counter() - started:.1f}s."
+        ))
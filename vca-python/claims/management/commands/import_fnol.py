@@ -0,0 +1,94 @@
+"""
+Import an NDJSON or CSV feed of FnolPayloads into fnol_claims / fnol_damage_photos.
+
+The file is read record by record and saved in fixed-size batches (one
+transaction each, as POST /api/save-fnol/bulk), so memory stays constant
+however large it is. NDJSON has one FnolPayload per line; CSV has a header of
+payload paths (claim_id, policy.policy_number, vehicle.year, ...;
+documents.photos "|"-separated). The format follows the file extension
+unless --format is given.
+
+Progress lines report the last committed record; after an interruption, rerun
+with --skip set to it to resume. The skipped records are read again but not
+decoded; record numbers (not byte offsets) are used so that stdin and CSV rows
+spanning several lines resume the same way.
+
+Usage:
+    python manage.py import_fnol claims.ndjson
+    python manage.py import_fnol legacy_claims.csv --batch-size 1000
+    python manage.py import_fnol claims.ndjson --skip 250000
+    cat claims.ndjson | python manage.py import_fnol - --format ndjson
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from claims.fnol_ingest import (
+    FNOL_BULK_CHUNK_SIZE,
+    FNOL_IMPORT_FORMATS,
+    fnol_import_format,
+    import_fnol_records,
+    iter_csv_records,
+    iter_ndjson_records,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream an NDJSON or CSV file of FNOL payloads into fnol_claims in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="File to import ('-' for stdin).")
+        parser.add_argument("--format", dest="import_format", choices=FNOL_IMPORT_FORMATS)
+        parser.add_argument("--batch-size", type=int, default=FNOL_BULK_CHUNK_SIZE, help="Records per transaction.")
+        parser.add_argument("--skip", type=int, default=0, help="Skip records up to this number (resume).")
+        parser.add_argument(
+            "--progress-every", type=int, default=10000, help="Report progress about every N records."
+        )
+
+    def handle(self, *args, **options):
+        path = options["file"]
+        import_format = fnol_import_format(path, options["import_format"])
+        if path == "-" and not options["import_format"]:
+            raise CommandError("--format is required when reading stdin.")
+        try:
+            source = sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+        except OSError as e:
+            raise CommandError(str(e))
+
+        progress_every = max(1, options["progress_every"])
+        next_report = [progress_every]
+
+        def on_error(record, claim_id, errors):
+            self.stderr.write(f"record {record} ({claim_id or 'no claim_id'}): {errors}")
+
+        def on_batch(totals):
+            if totals["records"] >= next_report[0]:
+                next_report[0] = totals["records"] + progress_every
+                self.stdout.write(
+                    f"through record {totals['last_record']}: {totals['saved']} saved, "
+                    f"{totals['unchanged']} unchanged, {totals['failed']} failed "
+                    f"({totals['records_per_second']:.0f} records/s)"
+                )
+
+        skip = max(0, options["skip"])
+        if import_format == "csv":
+            records = iter_csv_records(source, skip=skip)
+        else:
+            records = iter_ndjson_records(source, skip=skip)
+        try:
+            totals = import_fnol_records(
+                records,
+                batch_size=max(1, options["batch_size"]),
+                skip=skip,
+                on_error=on_error,
+                on_batch=on_batch,
+            )
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {totals['records']} records through record {totals['last_record']}: "
+            f"{totals['saved']} saved, {totals['unchanged']} unchanged, {totals['failed']} failed, "
+            f"{totals['skipped']} skipped "
+            f"in {totals['elapsed_seconds']:.1f}s ({totals['records_per_second']:.0f} records/s)."
+        ))
@@ -0,0 +1,29 @@
+"""
+Recompute the dashboard_rollup table (behind /api/dashboard/stats) from fnol_claims.
+
+Writes keep the rollups current incrementally; run this after deploying them, after
+backfill_evaluation_summary, or whenever claims were changed outside the API.
+
+Usage:
+    python manage.py rebuild_dashboard_rollups
+    python manage.py rebuild_dashboard_rollups --chunk-size 5000
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from claims.dashboard_rollups import rebuild_dashboard_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard rollups from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Claims read per batch.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counted = rebuild_dashboard_rollups(chunk_size=max(1, options["chunk_size"]))
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt dashboard rollups from {counted} claims in {time.perf_counter() - started:.1f}s."
+        ))
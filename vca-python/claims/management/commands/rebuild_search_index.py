@@ -0,0 +1,25 @@
+"""
+Create (if missing) and rebuild the claim search index behind /api/fnol/search.
+
+On SQLite the fnol_claims_fts table is emptied, reloaded from fnol_claims and
+optimized; on MySQL the FULLTEXT index is created if needed and the table optimized.
+
+Usage:
+    python manage.py rebuild_search_index
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from claims.claim_search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over fnol_claims."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        indexed = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} claims in {time.perf_counter() - started:.1f}s."
+        ))
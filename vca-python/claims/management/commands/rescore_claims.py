@@ -0,0 +1,249 @@
+"""
+Re-run fraud evaluation for every fnol_claims row matching a filter and store the
+results as new claim_evaluation_response versions (like the Fraud Detection button).
+
+Claims are read in keyset chunks ordered by complaint_id. Each chunk is evaluated
+over a process pool against one rule snapshot, then written with bulk_create and
+bulk is_latest / claim_status / evaluation summary / dashboard rollup updates in a
+single transaction. After each chunk the last complaint_id, and the ids of the
+claims whose evaluation failed, are written to the checkpoint file: --resume
+retries the failed claims first and then continues where the run stopped.
+
+Usage:
+    python manage.py rescore_claims
+    python manage.py rescore_claims --status 1 --status "Business Rule Validation-pass"
+    python manage.py rescore_claims --from 2024-01-01 --to 2024-06-30 --re-open 1
+    python manage.py rescore_claims --workers 8 --checkpoint rescore.json --resume
+"""
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time as dt_time
+from typing import Optional
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from claims.dashboard_rollups import track_dashboard_rollups
+from claims.evaluation_summary import latest_evaluation, refresh_evaluation_summary
+from claims.models import ClaimEvaluationResponse, FnolClaim
+from claims.rescore_worker import init_worker, score_payloads, snapshot_initargs
+from claims.rule_snapshot import get_rule_snapshot
+from claims.views import (
+    _apply_latest_evaluation_amount,
+    _evaluation_response_from_result,
+    _fnol_claim_to_raw_response,
+    _get_claim_status_for_result,
+)
+
+
+def _pool_context():
+    """fork where the platform has it (workers start without re-importing Django), else the default."""
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _parse_day(value: str, option: str):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"{option} must be YYYY-MM-DD, got {value!r}")
+
+
+class Command(BaseCommand):
+    help = "Re-score claims matching a filter in parallel and store new evaluation versions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--status",
+            action="append",
+            default=[],
+            help="claim_status id or status name (repeatable).",
+        )
+        parser.add_argument("--from", dest="date_from", help="Incident date from (YYYY-MM-DD, inclusive).")
+        parser.add_argument("--to", dest="date_to", help="Incident date to (YYYY-MM-DD, inclusive).")
+        parser.add_argument("--re-open", dest="re_open", type=int, default=None, help="Only claims with this re_open value.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Claims loaded and written per chunk.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Evaluation processes (1 evaluates in this process).",
+        )
+        parser.add_argument(
+            "--checkpoint", default=None, help="JSON file recording the last committed complaint_id and failed claims."
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Retry the failed claims in --checkpoint, then continue after its complaint_id.",
+        )
+
+    def _queryset(self, options):
+        qs = FnolClaim.objects.all()
+        if options["status"]:
+            ids = [int(s) for s in options["status"] if s.isdigit()]
+            names = [s for s in options["status"] if not s.isdigit()]
+            status_q = Q(claim_status_id__in=ids)
+            for name in names:
+                status_q |= Q(claim_status__status_name__iexact=name)
+            qs = qs.filter(status_q)
+        tz = timezone.get_current_timezone()
+        if options["date_from"]:
+            day = _parse_day(options["date_from"], "--from")
+            qs = qs.filter(incident_date_time__gte=timezone.make_aware(datetime.combine(day, dt_time.min), tz))
+        if options["date_to"]:
+            day = _parse_day(options["date_to"], "--to")
+            qs = qs.filter(incident_date_time__lte=timezone.make_aware(datetime.combine(day, dt_time.max), tz))
+        if options["re_open"] is not None:
+            qs = qs.filter(re_open=options["re_open"])
+        return qs
+
+    def _read_checkpoint(self, path: Optional[str]) -> tuple:
+        if not path or not os.path.exists(path):
+            return "", 0, set()
+        with open(path) as f:
+            data = json.load(f)
+        return (
+            data.get("last_complaint_id") or "",
+            int(data.get("processed") or 0),
+            set(data.get("failed") or ()),
+        )
+
+    def _write_checkpoint(self, path: Optional[str], last_id: str, processed: int, failed: set) -> None:
+        if not path:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"last_complaint_id": last_id, "processed": processed, "failed": sorted(failed)}, f)
+        os.replace(tmp, path)
+
+    def _chunks(self, qs, last_id: str, retry: list, chunk_size: int):
+        """(claims, is_retry) chunks: the claims to retry first, then keyset chunks after last_id."""
+        claims_qs = qs.order_by("complaint_id").prefetch_related("damage_photos")
+        for start in range(0, len(retry), chunk_size):
+            claims = list(claims_qs.filter(complaint_id__in=retry[start:start + chunk_size]))
+            if claims:
+                yield claims, True
+        while True:
+            claims = list(claims_qs.filter(complaint_id__gt=last_id)[:chunk_size])
+            if not claims:
+                return
+            last_id = claims[-1].complaint_id
+            yield claims, False
+
+    def _payloads(self, claims: list) -> list:
+        payloads = []
+        for claim in claims:
+            raw_response = _fnol_claim_to_raw_response(claim)
+            _apply_latest_evaluation_amount(raw_response, latest_evaluation(claim))
+            payloads.append((claim.complaint_id, raw_response))
+        return payloads
+
+    def _persist(self, scored: list, fail_status, pass_status) -> None:
+        results = {complaint_id: result for complaint_id, result, error in scored if error is None}
+        if not results:
+            return
+        ids = list(results)
+        with track_dashboard_rollups(ids):
+            versions = dict(
+                ClaimEvaluationResponse.objects.filter(complaint_id__in=ids)
+                .values("complaint_id")
+                .annotate(v=Max("version"))
+                .values_list("complaint_id", "v")
+            )
+            ClaimEvaluationResponse.objects.filter(complaint_id__in=ids, is_latest=True).update(is_latest=False)
+            ClaimEvaluationResponse.objects.bulk_create([
+                _evaluation_response_from_result(complaint_id, (versions.get(complaint_id) or 0) + 1, result)
+                for complaint_id, result in results.items()
+            ])
+            rejected = {c for c, r in results.items() if (r.get("decision") or "").strip() == "Reject"}
+            passed = [c for c in ids if c not in rejected]
+            if fail_status and rejected:
+                FnolClaim.objects.filter(complaint_id__in=rejected).update(claim_status=fail_status)
+            if pass_status and passed:
+                FnolClaim.objects.filter(complaint_id__in=passed).update(claim_status=pass_status)
+            refresh_evaluation_summary(ids)
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options["chunk_size"])
+        workers = max(1, options["workers"])
+        checkpoint = options["checkpoint"]
+        if options["resume"] and not checkpoint:
+            raise CommandError("--resume requires --checkpoint.")
+        last_id, processed, failed = self._read_checkpoint(checkpoint) if options["resume"] else ("", 0, set())
+
+        qs = self._queryset(options)
+        remaining = qs.filter(complaint_id__gt=last_id).count() if last_id else qs.count()
+        total = processed + remaining
+        snapshot = get_rule_snapshot()
+        # Same ClaimStatus rows run_fraud_detection assigns (fail = 2, pass = 3)
+        fail_status = _get_claim_status_for_result({"decision": "Reject"})
+        pass_status = _get_claim_status_for_result({"decision": ""})
+        if last_id:
+            self.stdout.write(f"Resuming after {last_id} ({processed} already done).")
+        if failed:
+            self.stdout.write(f"Retrying {len(failed)} claim(s) that failed before.")
+        self.stdout.write(f"Re-scoring {remaining} claims with {workers} worker(s).")
+
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=_pool_context(),
+                initializer=init_worker,
+                initargs=snapshot_initargs(snapshot),
+            )
+            # Start the workers now, with every DB connection closed, so a forked child
+            # never inherits a live connection (the chunk queries below reopen one)
+            connections.close_all()
+            executor.submit(int).result()
+        else:
+            init_worker(*snapshot_initargs(snapshot))
+
+        started = time.perf_counter()
+        done = rescored = errors = 0
+        try:
+            for claims, is_retry in self._chunks(qs, last_id, sorted(failed), chunk_size):
+                payloads = self._payloads(claims)
+                if executor is None:
+                    scored = score_payloads(payloads)
+                else:
+                    step = -(-len(payloads) // workers)
+                    parts = [payloads[i:i + step] for i in range(0, len(payloads), step)]
+                    scored = [item for part in executor.map(score_payloads, parts) for item in part]
+
+                self._persist(scored, fail_status, pass_status)
+                chunk_errors = {complaint_id for complaint_id, _, error in scored if error is not None}
+                for complaint_id, _, error in scored:
+                    if error is not None:
+                        self.stderr.write(f"{complaint_id}: {error}")
+                errors += len(chunk_errors)
+                rescored += len(scored) - len(chunk_errors)
+                # Failed claims stay in the checkpoint until a --resume scores them
+                failed = (failed - {claim.complaint_id for claim in claims}) | chunk_errors
+
+                if not is_retry:
+                    last_id = claims[-1].complaint_id
+                    done += len(claims)
+                self._write_checkpoint(checkpoint, last_id, processed + done, failed)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{processed + done}/{total} claims ({done / elapsed:.0f} claims/s), last {last_id}"
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-scored {rescored} claims in {elapsed:.1f}s ({rate:.0f} claims/s), {errors} error(s)."
+        ))
+        if failed and checkpoint:
+            self.stdout.write(f"{len(failed)} claim(s) failed; --resume retries them.")
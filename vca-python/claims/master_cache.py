@@ -0,0 +1,115 @@
+"""
+Versioned cache of master-table reads: the masters collection GET responses
+(claim types, claim rules, damage codes, pricing config) and claim_status lookups.
+
+Each table has a version counter stored in the "masters" cache alias. Entries
+are keyed on (table, variant, current version), so a write handler only has to
+call bump_master_version(table): every entry of the old version stops being
+read and ages out. With a shared backend (MASTER_CACHE_BACKEND=file or db) the
+counters are shared too, so every worker invalidates together; with locmem each
+worker has its own, and MASTER_CACHE_TTL_SECONDS bounds how stale the others get.
+claim_status is a legacy table edited outside the API, so its entries rely on the TTL.
+
+Hit / miss counts are kept per worker and reported by master_cache_info().
+"""
+import threading
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import ClaimStatus
+
+MASTER_CACHE_ALIAS = "masters"
+MASTER_TABLES = ("claim_type_master", "claim_rule_master", "damage_code_master", "pricing_config", "claim_status")
+
+_lock = threading.Lock()
+_hits: Counter = Counter()
+_misses: Counter = Counter()
+
+
+def _cache():
+    return caches[MASTER_CACHE_ALIAS]
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "MASTER_CACHE_TTL_SECONDS", 300))
+
+
+def _version_key(table: str) -> str:
+    return f"master_version:{table}"
+
+
+def master_version(table: str) -> int:
+    """Current version of table's cache entries."""
+    cache = _cache()
+    version = cache.get(_version_key(table))
+    if version is None:
+        # Seeded from the clock, so entries stored under a lost (evicted) counter are never read again
+        cache.add(_version_key(table), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(table))
+    return version
+
+
+def bump_master_version(table: str) -> None:
+    """Invalidate every cached read of table. Call after each write to it."""
+    cache = _cache()
+    try:
+        cache.incr(_version_key(table))
+    except ValueError:
+        cache.add(_version_key(table), time.time_ns(), timeout=None)
+
+
+def cached_master_read(table: str, variant: str, compute: Callable[[], object]):
+    """Return the cached value of (table, variant), computing and storing it on a miss."""
+    cache = _cache()
+    # Version read before compute: a write racing the read can only leave data under a dead version
+    key = f"master:{table}:{variant}:{master_version(table)}"
+    value = cache.get(key)
+    if value is not None:
+        with _lock:
+            _hits[table] += 1
+        return value
+    with _lock:
+        _misses[table] += 1
+    value = compute()
+    cache.set(key, value, _ttl())
+    return value
+
+
+def _claim_status_rows() -> tuple:
+    return cached_master_read(
+        "claim_status",
+        "rows",
+        lambda: tuple(ClaimStatus.objects.order_by("id").values_list("id", "status_name")),
+    )
+
+
+def cached_claim_status(pk: Optional[int] = None, name: Optional[str] = None) -> Optional[ClaimStatus]:
+    """
+    ClaimStatus with the given id, or else the lowest-id one named name (case-insensitive),
+    from the cached claim_status table. None when neither matches.
+    """
+    rows = _claim_status_rows()
+    for status_id, status_name in rows:
+        if pk is not None and status_id == pk:
+            return ClaimStatus(id=status_id, status_name=status_name)
+    if name is not None:
+        for status_id, status_name in rows:
+            if (status_name or "").lower() == name.lower():
+                return ClaimStatus(id=status_id, status_name=status_name)
+    return None
+
+
+def master_cache_info() -> dict:
+    backend = _cache().__class__.__name__
+    with _lock:
+        tables = {
+            table: {"hits": _hits[table], "misses": _misses[table]}
+            for table in MASTER_TABLES
+        }
+    for table in MASTER_TABLES:
+        tables[table]["version"] = master_version(table)
+    return {"backend": backend, "ttl_seconds": _ttl(), "tables": tables}
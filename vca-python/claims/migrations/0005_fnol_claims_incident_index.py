@@ -0,0 +1,50 @@
+# Composite indexes on fnol_claims (sort column, complaint_id) for keyset pagination of list_fnol:
+# one per FNOL_LIST_SORT_FIELDS column (complaint_id, the primary key, needs none)
+
+from django.db import migrations
+
+SORT_INDEXES = (
+    ("fnol_incident_dt_id", "incident_date_time"),
+    ("fnol_created_id", "created_date"),
+    ("fnol_updated_id", "updated_date"),
+    ("fnol_policy_start_id", "policy_start_date"),
+    ("fnol_policy_number_id", "policy_number"),
+    ("fnol_holder_name_id", "policy_holder_name"),
+    ("fnol_vehicle_year_id", "vehicle_year"),
+)
+
+
+def add_index(apps, schema_editor):
+    """Create the sort indexes that do not exist yet (fnol_claims is a legacy table)."""
+    from django.db import connection
+    with connection.cursor() as cursor:
+        for name, column in SORT_INDEXES:
+            try:
+                cursor.execute(f"CREATE INDEX {name} ON fnol_claims ({column}, complaint_id)")
+            except Exception:
+                # Index may already exist
+                pass
+
+
+def remove_index(apps, schema_editor):
+    from django.db import connection
+    with connection.cursor() as cursor:
+        for name, _ in SORT_INDEXES:
+            try:
+                if connection.vendor == "mysql":
+                    cursor.execute(f"DROP INDEX {name} ON fnol_claims")
+                else:
+                    cursor.execute(f"DROP INDEX {name}")
+            except Exception:
+                pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0004_add_llm_response_to_claim_evaluation'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
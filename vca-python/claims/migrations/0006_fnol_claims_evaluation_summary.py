@@ -0,0 +1,104 @@
+# Latest-evaluation summary columns on fnol_claims (eval_*), filled from claim_evaluation_response here
+# (backfill_evaluation_summary re-runs the fill at any time)
+
+from django.db import migrations
+
+SUMMARY_COLUMNS = (
+    ("eval_id", "INTEGER NULL"),
+    ("eval_version", "INTEGER NULL"),
+    ("eval_decision", "VARCHAR(20) NULL"),
+    ("eval_claim_status", "VARCHAR(50) NULL"),
+    ("eval_claim_type", "VARCHAR(20) NULL"),
+    ("eval_reason", "TEXT NULL"),
+    ("eval_estimated_amount", "DECIMAL(10,2) NULL"),
+    ("eval_claim_amount", "DECIMAL(10,2) NULL"),
+    ("eval_llm_damages", "TEXT NULL"),
+    ("eval_llm_severity", "VARCHAR(20) NULL"),
+    ("eval_created_date", "DATETIME(6) NULL"),
+    ("eval_updated_date", "DATETIME(6) NULL"),
+)
+
+
+def add_columns(apps, schema_editor):
+    """Add the eval_* columns if they don't exist (fnol_claims is a legacy table)."""
+    from django.db import connection
+    with connection.cursor() as cursor:
+        for column, definition in SUMMARY_COLUMNS:
+            try:
+                cursor.execute(f"ALTER TABLE fnol_claims ADD COLUMN {column} {definition}")
+            except Exception:
+                # Column may already exist
+                pass
+
+
+# summary column -> claim_evaluation_response column (as claims.evaluation_summary.EVALUATION_SUMMARY_FIELDS)
+SUMMARY_SOURCES = (
+    ("eval_id", "id"),
+    ("eval_version", "version"),
+    ("eval_decision", "decision"),
+    ("eval_claim_status", "claim_status"),
+    ("eval_claim_type", "claim_type"),
+    ("eval_reason", "reason"),
+    ("eval_estimated_amount", "estimated_amount"),
+    ("eval_claim_amount", "claim_amount"),
+    ("eval_llm_damages", "llm_damages"),
+    ("eval_llm_severity", "llm_severity"),
+    ("eval_created_date", "created_date"),
+    ("eval_updated_date", "updated_date"),
+)
+FILL_CHUNK_SIZE = 1000
+
+
+def fill_columns(apps, schema_editor):
+    """
+    Copy each claim's latest evaluation (lowest id among is_latest rows) onto its eval_*
+    columns, one UPDATE per chunk of claims, so readers of the summary see existing data.
+    """
+    from django.db import connection
+    assignments = ", ".join(
+        f"{column} = (SELECT r.{source} FROM claim_evaluation_response r "
+        f"WHERE r.complaint_id = fnol_claims.complaint_id AND r.is_latest = %s ORDER BY r.id LIMIT 1)"
+        for column, source in SUMMARY_SOURCES
+    )
+    with connection.cursor() as cursor:
+        last_id = ""
+        while True:
+            try:
+                cursor.execute(
+                    "SELECT complaint_id FROM fnol_claims WHERE complaint_id > %s ORDER BY complaint_id LIMIT %s",
+                    [last_id, FILL_CHUNK_SIZE],
+                )
+            except Exception:
+                # Legacy tables not present (e.g. a fresh test database)
+                return
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                return
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(
+                f"UPDATE fnol_claims SET {assignments} WHERE complaint_id IN ({placeholders})",
+                [True] * len(SUMMARY_SOURCES) + ids,
+            )
+            last_id = ids[-1]
+
+
+def remove_columns(apps, schema_editor):
+    from django.db import connection
+    with connection.cursor() as cursor:
+        for column, _ in SUMMARY_COLUMNS:
+            try:
+                cursor.execute(f"ALTER TABLE fnol_claims DROP COLUMN {column}")
+            except Exception:
+                pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0005_fnol_claims_incident_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_columns, remove_columns),
+        migrations.RunPython(fill_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,111 @@
+# Generated manually for DashboardRollup
+
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+SEED_CHUNK_SIZE = 2000
+
+
+def _seed_contribution(
+    status_name, decision, claim_type, severity, claim_amount, estimated_amount, created_date, incident_date_time
+):
+    """
+    One claim's (dimension, bucket) -> (claims, auto approved, amount, amounts counted), as
+    claims.dashboard_rollups._contribution computed it when this migration was written.
+    """
+    auto_approved = 1 if (decision or "").strip() == "Auto Approve" else 0
+    amount = Decimal(str(claim_amount or estimated_amount or 0))
+    counted = 1 if amount > 0 else 0
+    if not counted:
+        amount = Decimal("0")
+    created = created_date or incident_date_time
+    if created is not None and timezone.is_naive(created) and settings.USE_TZ:
+        # Raw reads return UTC datetimes without tzinfo
+        created = created.replace(tzinfo=dt_timezone.utc)
+    day = timezone.localtime(created).date().isoformat() if created else "unknown"
+    buckets = (
+        ("total", "all"),
+        ("status", status_name or "Open"),
+        ("decision", decision or "Not evaluated"),
+        ("claim_type", claim_type or "Unknown"),
+        ("severity", severity or "Unknown"),
+        ("day", day),
+    )
+    return {(dimension, bucket[:100]): (1, auto_approved, amount, counted) for dimension, bucket in buckets}
+
+
+def seed_rollups(apps, schema_editor):
+    """
+    Compute the rollups of the claims already in fnol_claims, so incremental deltas
+    (track_dashboard_rollups) start from the real totals rather than from zero.
+    fnol_claims and claim_status are legacy tables outside the migration state, so
+    they are read with SQL (as in 0006) rather than through a model.
+    """
+    DashboardRollup = apps.get_model("claims", "DashboardRollup")
+    connection = schema_editor.connection
+    tables = set(connection.introspection.table_names())
+    if not {"fnol_claims", "claim_status"} <= tables:
+        # Legacy tables not present (e.g. a fresh test database)
+        return
+
+    totals = defaultdict(lambda: [0, 0, Decimal("0"), 0])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT s.status_name, f.eval_decision, f.eval_claim_type, f.eval_llm_severity, "
+            "f.eval_claim_amount, f.eval_estimated_amount, f.created_date, f.incident_date_time "
+            "FROM fnol_claims f LEFT JOIN claim_status s ON s.id = f.claim_status"
+        )
+        while True:
+            rows = cursor.fetchmany(SEED_CHUNK_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                for key, values in _seed_contribution(*row).items():
+                    entry = totals[key]
+                    for i, value in enumerate(values):
+                        entry[i] += value
+
+    DashboardRollup.objects.bulk_create([
+        DashboardRollup(
+            dimension=dimension,
+            bucket=bucket,
+            claim_count=claims,
+            auto_approved_count=auto_approved,
+            amount_total=amount,
+            amount_count=amounts_counted,
+        )
+        for (dimension, bucket), (claims, auto_approved, amount, amounts_counted) in totals.items()
+    ], batch_size=SEED_CHUNK_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0006_fnol_claims_evaluation_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardRollup',
+            fields=[
+                ('rollup_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('dimension', models.CharField(max_length=20)),
+                ('bucket', models.CharField(max_length=100)),
+                ('claim_count', models.IntegerField(default=0)),
+                ('auto_approved_count', models.IntegerField(default=0)),
+                ('amount_total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('amount_count', models.IntegerField(default=0, help_text='Claims with a positive claim amount.')),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'dashboard_rollup',
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'bucket'), name='dashboard_rollup_dim_bucket')],
+            },
+        ),
+        migrations.RunPython(seed_rollups, migrations.RunPython.noop),
+    ]
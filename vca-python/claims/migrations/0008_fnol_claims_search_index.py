@@ -0,0 +1,51 @@
+# Full-text index over fnol_claims for claim search: FTS5 table on SQLite, FULLTEXT index on MySQL
+
+from django.db import migrations
+
+SEARCH_COLUMNS = (
+    "complaint_id, policy_number, policy_holder_name, vehicle_registration_number, "
+    "accident_location, incident_description"
+)
+
+
+def add_index(apps, schema_editor):
+    """Create and fill the search index if it does not exist (fnol_claims is a legacy table)."""
+    from django.db import connection
+    with connection.cursor() as cursor:
+        try:
+            if connection.vendor == "sqlite":
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE fnol_claims_fts USING fts5({SEARCH_COLUMNS}, "
+                    "prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+                )
+                cursor.execute(
+                    f"INSERT INTO fnol_claims_fts ({SEARCH_COLUMNS}) SELECT {SEARCH_COLUMNS} FROM fnol_claims"
+                )
+            else:
+                cursor.execute(f"ALTER TABLE fnol_claims ADD FULLTEXT INDEX fnol_claims_fulltext ({SEARCH_COLUMNS})")
+        except Exception:
+            # Index may already exist
+            pass
+
+
+def remove_index(apps, schema_editor):
+    from django.db import connection
+    with connection.cursor() as cursor:
+        try:
+            if connection.vendor == "sqlite":
+                cursor.execute("DROP TABLE fnol_claims_fts")
+            else:
+                cursor.execute("DROP INDEX fnol_claims_fulltext ON fnol_claims")
+        except Exception:
+            pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0007_dashboardrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
@@ -0,0 +1,34 @@
+# Fingerprint of the last FNOL payload saved to each fnol_claims row, for idempotent upserts
+
+from django.db import migrations
+
+
+def add_column(apps, schema_editor):
+    """Add payload_fingerprint if it doesn't exist (fnol_claims is a legacy table)."""
+    from django.db import connection
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("ALTER TABLE fnol_claims ADD COLUMN payload_fingerprint VARCHAR(64) NULL")
+        except Exception:
+            # Column may already exist
+            pass
+
+
+def remove_column(apps, schema_editor):
+    from django.db import connection
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("ALTER TABLE fnol_claims DROP COLUMN payload_fingerprint")
+        except Exception:
+            pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0008_fnol_claims_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_column, remove_column),
+    ]
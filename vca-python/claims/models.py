@@ -52,8 +52,35 @@ class FnolClaim(models.Model):
     updated_date = models.DateTimeField(null=True, blank=True, db_column="updated_date")
     updated_by = models.CharField(max_length=150, null=True, blank=True, db_column="updated_by")
 
+    # Latest claim_evaluation_response row, denormalized (see claims.evaluation_summary)
+    eval_id = models.IntegerField(null=True, blank=True)
+    eval_version = models.PositiveIntegerField(null=True, blank=True)
+    eval_decision = models.CharField(max_length=20, null=True, blank=True)
+    eval_claim_status = models.CharField(max_length=50, null=True, blank=True)
+    eval_claim_type = models.CharField(max_length=20, null=True, blank=True)
+    eval_reason = models.TextField(null=True, blank=True)
+    eval_estimated_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    eval_claim_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    eval_llm_damages = models.TextField(null=True, blank=True)
+    eval_llm_severity = models.CharField(max_length=20, null=True, blank=True)
+    eval_created_date = models.DateTimeField(null=True, blank=True)
+    eval_updated_date = models.DateTimeField(null=True, blank=True)
+
+    # sha256 of the last FNOL payload saved (see fnol_helpers.fnol_payload_fingerprint); equal payloads are not rewritten
+    payload_fingerprint = models.CharField(max_length=64, null=True, blank=True)
+
     class Meta:
         db_table = "fnol_claims"
+        indexes = [
+            # Keyset pagination of list_fnol, one per sortable column (see FNOL_LIST_SORT_FIELDS)
+            models.Index(fields=["incident_date_time", "complaint_id"], name="fnol_incident_dt_id"),
+            models.Index(fields=["created_date", "complaint_id"], name="fnol_created_id"),
+            models.Index(fields=["updated_date", "complaint_id"], name="fnol_updated_id"),
+            models.Index(fields=["policy_start_date", "complaint_id"], name="fnol_policy_start_id"),
+            models.Index(fields=["policy_number", "complaint_id"], name="fnol_policy_number_id"),
+            models.Index(fields=["policy_holder_name", "complaint_id"], name="fnol_holder_name_id"),
+            models.Index(fields=["vehicle_year", "complaint_id"], name="fnol_vehicle_year_id"),
+        ]
 
     def __str__(self) -> str:
         return f"FnolClaim(complaint_id={self.complaint_id})"
@@ -380,4 +407,30 @@ class PricingConfig(models.Model):
         ordering = ["config_key"]
 
     def __str__(self) -> str:
-        return f"{self.config_key}: {self.config_value}"
\ No newline at end of file
+        return f"{self.config_key}: {self.config_value}"
+
+
+class DashboardRollup(models.Model):
+    """
+    Running claim totals behind /api/dashboard/stats (dashboard_rollup table), one row
+    per (dimension, bucket): e.g. ("status", "Open"), ("decision", "Auto Approve"),
+    ("day", "2024-03-01"). Kept current by claims.dashboard_rollups on every claim or
+    evaluation write; rebuilt from scratch by the rebuild_dashboard_rollups command.
+    """
+    rollup_id = models.BigAutoField(primary_key=True)
+    dimension = models.CharField(max_length=20)
+    bucket = models.CharField(max_length=100)
+    claim_count = models.IntegerField(default=0)
+    auto_approved_count = models.IntegerField(default=0)
+    amount_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    amount_count = models.IntegerField(default=0, help_text="Claims with a positive claim amount.")
+    updated_date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "dashboard_rollup"
+        constraints = [
+            models.UniqueConstraint(fields=["dimension", "bucket"], name="dashboard_rollup_dim_bucket"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.dimension}={self.bucket}: {self.claim_count}"
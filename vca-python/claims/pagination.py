@@ -0,0 +1,150 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are read with a WHERE clause on (sort column, primary key) instead of
+OFFSET, so every page costs the same however deep it is, as long as an index
+covers (sort column, primary key). Cursors are opaque, URL-safe strings that
+record the sort and the key of the row the next (or previous) page starts after.
+
+NULL sort values follow MySQL / SQLite ordering: first when ascending, last when
+descending.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded or does not match the requested sort."""
+
+
+@dataclass
+class KeysetPage:
+    results: list
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(field: models.Field, value):
+    if value is None:
+        return None
+    # A tampered cursor can hold anything: out-of-range dates, non-numeric ids, lists
+    try:
+        if isinstance(field, models.DateTimeField):
+            parsed = parse_datetime(value)
+        elif isinstance(field, models.DateField):
+            parsed = parse_date(value)
+        elif isinstance(field, (models.IntegerField, models.AutoField)):
+            parsed = int(value)
+        elif isinstance(value, str):
+            parsed = value
+        else:
+            parsed = None
+    except (TypeError, ValueError):
+        parsed = None
+    if parsed is None:
+        raise InvalidCursor("Invalid cursor value.")
+    return parsed
+
+
+def _decode_pk(field: models.Field, value):
+    try:
+        parsed = field.to_python(value)
+    except (TypeError, ValueError, ValidationError):
+        parsed = None
+    if parsed is None or isinstance(value, (dict, list, bool)):
+        raise InvalidCursor("Invalid cursor value.")
+    return parsed
+
+
+def encode_cursor(sort: str, value, pk, direction: str) -> str:
+    raw = json.dumps({"s": sort, "v": _encode_value(value), "k": pk, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Invalid cursor.")
+    if not isinstance(data, dict) or data.get("d") not in ("next", "prev") or "k" not in data:
+        raise InvalidCursor("Invalid cursor.")
+    if data.get("s") != sort:
+        raise InvalidCursor("Cursor was issued for a different sort order.")
+    return data
+
+
+def _after(field: str, value, pk_field: str, pk, descending: bool) -> Q:
+    """Rows strictly after (value, pk) in (field, pk) order, NULLs first ascending / last descending."""
+    if field == pk_field:
+        return Q(**{f"{pk_field}__lt" if descending else f"{pk_field}__gt": pk})
+    pk_after = Q(**{f"{pk_field}__lt" if descending else f"{pk_field}__gt": pk})
+    if value is None:
+        if descending:
+            return Q(**{f"{field}__isnull": True}) & pk_after
+        return (Q(**{f"{field}__isnull": True}) & pk_after) | Q(**{f"{field}__isnull": False})
+    beyond = Q(**{f"{field}__lt" if descending else f"{field}__gt": value})
+    tie = Q(**{field: value}) & pk_after
+    if descending:
+        return beyond | tie | Q(**{f"{field}__isnull": True})
+    return beyond | tie
+
+
+def keyset_paginate(qs, sort: str, page_size: int, cursor: Optional[str] = None) -> KeysetPage:
+    """
+    One page of qs ordered by sort ("field" or "-field") with the primary key as tie-breaker.
+    Runs a single query (page_size + 1 rows). Raises InvalidCursor for a bad cursor.
+    """
+    model = qs.model
+    pk_field = model._meta.pk.name
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    model_field = model._meta.get_field(field)
+
+    direction = "next"
+    if cursor:
+        data = decode_cursor(cursor, sort)
+        direction = data["d"]
+        value = _decode_value(model_field, data["v"])
+        pk = _decode_pk(model._meta.pk, data["k"])
+        # A previous page is the next page of the reversed ordering, read back to front
+        read_descending = descending if direction == "next" else not descending
+        qs = qs.filter(_after(field, value, pk_field, pk, read_descending))
+    else:
+        read_descending = descending
+
+    prefix = "-" if read_descending else ""
+    ordering = [f"{prefix}{field}"] if field == pk_field else [f"{prefix}{field}", f"{prefix}{pk_field}"]
+    rows = list(qs.order_by(*ordering)[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == "prev":
+        rows.reverse()
+
+    def key_cursor(row, to: str) -> str:
+        return encode_cursor(sort, getattr(row, field), getattr(row, pk_field), to)
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if direction == "next":
+            next_cursor = key_cursor(rows[-1], "next") if has_more else None
+            previous_cursor = key_cursor(rows[0], "prev") if cursor else None
+        else:
+            next_cursor = key_cursor(rows[-1], "next")
+            previous_cursor = key_cursor(rows[0], "prev") if has_more else None
+    return KeysetPage(results=rows, next_cursor=next_cursor, previous_cursor=previous_cursor)
@@ -0,0 +1,62 @@
+"""
+Pool worker side of the rescore_claims command.
+
+Workers never touch the database: the parent passes the rule snapshot rows as
+plain tuples through the pool initializer and each worker rebuilds the
+RuleSnapshot from them. Nothing here imports the models at module level, so a
+worker started with "spawn" (the only start method on Windows) can load this
+module and set Django up in init_worker before anything reads the app registry.
+"""
+from dataclasses import astuple
+from typing import Optional
+
+# Rule snapshot rebuilt in each pool worker from the parent's rows
+_worker_snapshot = None
+
+
+def snapshot_initargs(snapshot) -> tuple:
+    """init_worker arguments for snapshot: its version and rows as plain tuples."""
+    return (
+        snapshot.version,
+        tuple(astuple(row) for row in snapshot.rules),
+        tuple(astuple(row) for row in snapshot.claim_types),
+        tuple(astuple(row) for row in snapshot.damage_codes),
+    )
+
+
+def init_worker(version: int, rules: tuple, claim_types: tuple, damage_codes: tuple) -> None:
+    global _worker_snapshot
+    from django.apps import apps
+
+    if not apps.ready:
+        import django
+
+        django.setup()
+    from .rule_snapshot import ClaimTypeRow, DamageCodeRow, RuleRow, RuleSnapshot
+
+    _worker_snapshot = RuleSnapshot.build(
+        version,
+        [RuleRow(*row) for row in rules],
+        [ClaimTypeRow(*row) for row in claim_types],
+        [DamageCodeRow(*row) for row in damage_codes],
+    )
+
+
+def score_payloads(payloads: list) -> list:
+    """Evaluate (complaint_id, raw_response) pairs; returns (complaint_id, result, error) tuples."""
+    from .views import _run_process_claim_logic
+
+    scored = []
+    for complaint_id, raw_response in payloads:
+        error: Optional[str] = None
+        result = None
+        try:
+            result = _run_process_claim_logic(
+                raw_response,
+                snapshot=_worker_snapshot,
+                has_photos=bool(raw_response["documents"]["photos"]),
+            )
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+        scored.append((complaint_id, result, error))
+    return scored
@@ -0,0 +1,434 @@
+"""
+Small expression language for claim_rule_master.rule_expression.
+
+An expression describes when a rule is *triggered* (the risk condition), e.g.
+
+    days(loss_date - policy_start_date) < 30
+    loss_date - policy_start_date < 30 days
+    injury_indicator and estimated_amount > 50000
+    policy_status != 'Active' or blank(loss_description)
+
+Supported: numbers, 'strings', true/false/null, "N days" literals, + and -
+(including date - date and date +/- days), comparisons (= == != < <= > >=),
+and/or/not, parentheses and the functions below. Ordering comparisons with a
+null operand are false. Identifiers are the FNOL fields in RULE_FIELDS.
+
+Expressions are compiled once into Python closures and cached per
+(rule_id, rule_expression). Text that does not compile, or that references no
+field at all (e.g. "Claim < 30 days", "TRUE"), is treated as a plain
+description and the rule keeps its built-in behaviour. Writes through the
+masters API are checked with check_rule_expression(), so a mistyped expression
+is rejected instead of silently becoming a description.
+"""
+import operator
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Optional
+
+from django.utils.dateparse import parse_date, parse_datetime
+
+# Fields an expression may reference (see build_rule_context)
+RULE_FIELDS = frozenset({
+    "policy_status",
+    "coverage_type",
+    "policy_start_date",
+    "policy_end_date",
+    "loss_date",
+    "loss_description",
+    "claim_type",
+    "estimated_amount",
+    "vehicle_year",
+    "liability_admission",
+    "dashcam_cctv_evidence",
+    "injury_indicator",
+    "commercial_vehicle",
+    "has_photos",
+    "today",
+    "current_year",
+})
+
+
+# Fraud Check rule types with a built-in check (claims.views._BUILTIN_FRAUD_CHECKS); any
+# other rule type only runs through its compiled rule_expression
+BUILTIN_RULE_TYPES = (
+    "Early Claim",
+    "Data missing",
+    "Vehicle Year Invalid",
+    "Missing Damage Photos",
+    "Liability Admission",
+    "Dashcam CCTV Evidence",
+    "Injury Indicator",
+    "Commercial Vehicle",
+)
+
+# Legacy Early Claim text whose day window the built-in check reads (e.g. "Claim < 30 days")
+_EARLY_CLAIM_WINDOW_RE = re.compile(r"^\s*claim\s*<\s*\d+\s*days?\s*$", re.IGNORECASE)
+
+
+class RuleExpressionError(ValueError):
+    """Raised when a rule_expression cannot be compiled."""
+
+
+def _days(value):
+    if value is None:
+        return None
+    if isinstance(value, timedelta):
+        return value.days
+    raise TypeError("days() expects a date difference")
+
+
+def _year(value):
+    return value.year if isinstance(value, (date, datetime)) else None
+
+
+def _lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _contains(value, part):
+    if value is None or part is None:
+        return False
+    return str(part).lower() in str(value).lower()
+
+
+_FUNCTIONS = {
+    "days": (_days, 1),
+    "year": (_year, 1),
+    "lower": (_lower, 1),
+    "blank": (_blank, 1),
+    "contains": (_contains, 2),
+}
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<number>\d+(?:\.\d+)?)"
+    r"|(?P<string>'[^']*'|\"[^\"]*\")"
+    r"|(?P<op><=|>=|==|!=|<>|&&|\|\||[<>=!+\-(),])"
+    r"|(?P<name>[A-Za-z_][A-Za-z0-9_]*)"
+    r")"
+)
+
+_KEYWORDS = {"and", "or", "not", "true", "false", "null", "day", "days"}
+
+
+def _tokenize(text: str) -> list:
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise RuleExpressionError(f"Unexpected character at position {pos}: {text[pos]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "name":
+            lowered = value.lower()
+            kind, value = ("kw", lowered) if lowered in _KEYWORDS else ("name", lowered)
+        elif kind == "op":
+            value = {"&&": "and", "||": "or", "!": "not", "<>": "!=", "=": "=="}.get(value, value)
+            if value in ("and", "or", "not"):
+                kind = "kw"
+        tokens.append((kind, value))
+    return tokens
+
+
+def _in_days(fn):
+    """Compare a date difference with a number as whole days (loss_date - today == 0)."""
+    def compare(a, b):
+        if isinstance(a, timedelta) and isinstance(b, (int, float)):
+            a = a.days
+        elif isinstance(b, timedelta) and isinstance(a, (int, float)):
+            b = b.days
+        return fn(a, b)
+    return compare
+
+
+def _both_present(fn):
+    compare = _in_days(fn)
+
+    def ordered(a, b):
+        if a is None or b is None:
+            return False
+        return compare(a, b)
+    return ordered
+
+
+# == and != keep None semantics (null == null is true, null != 5 is true); ordering needs both operands
+_COMPARISONS = {
+    "==": _in_days(operator.eq),
+    "!=": _in_days(operator.ne),
+    "<": _both_present(operator.lt),
+    "<=": _both_present(operator.le),
+    ">": _both_present(operator.gt),
+    ">=": _both_present(operator.ge),
+}
+
+
+def _arith(fn):
+    def apply(a, b):
+        if a is None or b is None:
+            return None
+        if isinstance(a, date) and isinstance(b, (int, float)) and not isinstance(b, bool):
+            b = timedelta(days=b)
+        return fn(a, b)
+    return apply
+
+
+_ARITHMETIC = {"+": _arith(operator.add), "-": _arith(operator.sub)}
+
+
+class _Parser:
+    """Recursive-descent parser that builds closures of the form fn(ctx) -> value."""
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.pos = 0
+        self.fields = set()
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, kind=None, value=None):
+        tok = self.peek()
+        if tok[0] is None or (kind and tok[0] != kind) or (value and tok[1] != value):
+            expected = value or kind or "token"
+            raise RuleExpressionError(f"Expected {expected}, got {tok[1]!r}")
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        node = self.or_expr()
+        if self.pos != len(self.tokens):
+            raise RuleExpressionError(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def or_expr(self):
+        node = self.and_expr()
+        while self.peek() == ("kw", "or"):
+            self.take()
+            left, right = node, self.and_expr()
+            node = lambda ctx, l=left, r=right: l(ctx) or r(ctx)
+        return node
+
+    def and_expr(self):
+        node = self.not_expr()
+        while self.peek() == ("kw", "and"):
+            self.take()
+            left, right = node, self.not_expr()
+            node = lambda ctx, l=left, r=right: l(ctx) and r(ctx)
+        return node
+
+    def not_expr(self):
+        if self.peek() == ("kw", "not"):
+            self.take()
+            inner = self.not_expr()
+            return lambda ctx: not inner(ctx)
+        return self.comparison()
+
+    def comparison(self):
+        node = self.sum()
+        kind, value = self.peek()
+        if kind == "op" and value in _COMPARISONS:
+            self.take()
+            fn, left, right = _COMPARISONS[value], node, self.sum()
+            node = lambda ctx: fn(left(ctx), right(ctx))
+        return node
+
+    def sum(self):
+        node = self.unary()
+        while self.peek()[0] == "op" and self.peek()[1] in _ARITHMETIC:
+            fn = _ARITHMETIC[self.take()[1]]
+            left, right = node, self.unary()
+            node = lambda ctx, f=fn, l=left, r=right: f(l(ctx), r(ctx))
+        return node
+
+    def unary(self):
+        if self.peek() == ("op", "-"):
+            self.take()
+            inner = self.unary()
+
+            def negate(ctx):
+                value = inner(ctx)
+                return None if value is None else -value
+            return negate
+        return self.atom()
+
+    def atom(self):
+        kind, value = self.take()
+        if kind == "number":
+            number = float(value) if "." in value else int(value)
+            if self.peek()[0] == "kw" and self.peek()[1] in ("day", "days"):
+                self.take()
+                delta = timedelta(days=number)
+                return lambda ctx: delta
+            return lambda ctx: number
+        if kind == "string":
+            text = value[1:-1]
+            return lambda ctx: text
+        if kind == "kw" and value in ("true", "false", "null"):
+            constant = {"true": True, "false": False, "null": None}[value]
+            return lambda ctx: constant
+        if kind == "kw" and value == "days" and self.peek() == ("op", "("):
+            # days(...) the function, not the "N days" unit
+            return self.call(value)
+        if kind == "op" and value == "(":
+            node = self.or_expr()
+            self.take("op", ")")
+            return node
+        if kind == "name":
+            if self.peek() == ("op", "("):
+                return self.call(value)
+            if value not in RULE_FIELDS:
+                raise RuleExpressionError(f"Unknown field {value!r}")
+            self.fields.add(value)
+            return lambda ctx: ctx[value]
+        raise RuleExpressionError(f"Unexpected {value!r}")
+
+    def call(self, name: str):
+        if name not in _FUNCTIONS:
+            raise RuleExpressionError(f"Unknown function {name!r}")
+        fn, arity = _FUNCTIONS[name]
+        self.take("op", "(")
+        args = [self.or_expr()]
+        while self.peek() == ("op", ","):
+            self.take()
+            args.append(self.or_expr())
+        self.take("op", ")")
+        if len(args) != arity:
+            raise RuleExpressionError(f"{name}() takes {arity} argument(s)")
+        return lambda ctx: fn(*(a(ctx) for a in args))
+
+
+def compile_expression(text: str) -> Callable[[dict], bool]:
+    """
+    Compile an expression into fn(ctx) -> bool. Raises RuleExpressionError when the text
+    is not a valid expression or references no field.
+    """
+    if not (text or "").strip():
+        raise RuleExpressionError("Empty expression")
+    parser = _Parser(_tokenize(text))
+    node = parser.parse()
+    if not parser.fields:
+        raise RuleExpressionError("Expression does not reference any field")
+
+    def predicate(ctx) -> bool:
+        try:
+            return bool(node(ctx))
+        except (TypeError, ValueError, OverflowError, KeyError):
+            return False
+
+    return predicate
+
+
+@lru_cache(maxsize=1024)
+def compiled_rule_predicate(rule_id: int, rule_expression: str) -> Optional[Callable[[dict], bool]]:
+    """Compiled predicate for a rule row, or None when rule_expression is descriptive text."""
+    try:
+        return compile_expression(rule_expression)
+    except RuleExpressionError:
+        return None
+
+
+def check_rule_expression(rule_type: str, text: str) -> None:
+    """
+    Raise RuleExpressionError when text cannot be saved as rule_type's rule_expression:
+    on a rule type without a built-in check it must compile; on a built-in type it must
+    compile or be a plain description (no comparison operator, or the legacy Early Claim
+    "Claim < N days" window).
+    """
+    rule_type = (rule_type or "").strip().lower()
+    builtin = rule_type in {t.lower() for t in BUILTIN_RULE_TYPES}
+    try:
+        compile_expression(text)
+        return
+    except RuleExpressionError as exc:
+        error = exc
+    if not builtin:
+        raise error
+    if rule_type == "early claim" and _EARLY_CLAIM_WINDOW_RE.match(text or ""):
+        return
+    try:
+        tokens = _tokenize(text or "")
+    except RuleExpressionError:
+        # Not expression syntax at all (e.g. punctuation in prose)
+        return
+    if any(kind == "op" and value in _COMPARISONS for kind, value in tokens):
+        raise error
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(str(value))
+        if parsed:
+            return parsed.date()
+        return parse_date(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value):
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RuleContext(dict):
+    """Field values for one claim. has_photos is loaded on first use when not supplied."""
+
+    def __init__(self, values: dict, photo_loader: Optional[Callable[[], bool]] = None):
+        super().__init__(values)
+        self._photo_loader = photo_loader
+
+    def __missing__(self, key):
+        if key == "has_photos" and self._photo_loader is not None:
+            self["has_photos"] = bool(self._photo_loader())
+            return self["has_photos"]
+        raise KeyError(key)
+
+
+def build_rule_context(
+    data: dict,
+    has_photos: Optional[bool] = None,
+    photo_loader: Optional[Callable[[], bool]] = None,
+    today: Optional[date] = None,
+) -> RuleContext:
+    """Map an FnolPayload dict to the field values expressions (and built-in rules) read."""
+    policy = data.get("policy") or {}
+    incident = data.get("incident") or {}
+    vehicle = data.get("vehicle") or {}
+    today = today or date.today()
+    values = {
+        "policy_status": policy.get("policy_status"),
+        "coverage_type": policy.get("coverage_type"),
+        "policy_start_date": _to_date(policy.get("policy_start_date")),
+        "policy_end_date": _to_date(policy.get("policy_end_date")),
+        "loss_date": _to_date(incident.get("date_time_of_loss")),
+        "loss_description": incident.get("loss_description") or "",
+        "claim_type": incident.get("claim_type"),
+        "estimated_amount": incident.get("estimated_amount") or 0,
+        "vehicle_year": _to_int(vehicle.get("year")),
+        "liability_admission": bool(incident.get("liability_admission")),
+        "dashcam_cctv_evidence": bool(incident.get("dashcam_cctv_evidence")),
+        "injury_indicator": bool(incident.get("injury_indicator")),
+        "commercial_vehicle": bool(incident.get("commercial_vehicle")),
+        "today": today,
+        "current_year": today.year,
+    }
+    if has_photos is not None:
+        values["has_photos"] = bool(has_photos)
+    return RuleContext(values, photo_loader=photo_loader)
@@ -0,0 +1,214 @@
+"""
+Process-local, immutable snapshot of the rule masters used by claim evaluation.
+
+claim_rule_master, claim_type_master and damage_code_master are read on every
+evaluation but change rarely. The snapshot loads all active rows once, is
+passed through _run_process_claim_logic, and is rebuilt only after a master
+CRUD write calls invalidate_rule_snapshot() (or after RULE_SNAPSHOT_TTL_SECONDS,
+so other worker processes pick up changes made elsewhere).
+"""
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from django.conf import settings
+
+from .keyword_matcher import KeywordMatcher
+from .models import ClaimRuleMaster, ClaimTypeMaster, DamageCodeMaster
+
+FRAUD_CHECK_GROUP = "fraud check"
+
+
+@dataclass(frozen=True)
+class RuleRow:
+    rule_id: int
+    rule_type: str
+    rule_group: str
+    rule_description: str
+    rule_expression: str
+
+
+@dataclass(frozen=True)
+class ClaimTypeRow:
+    claim_type_id: int
+    claim_type_name: str
+    risk_percentage: Optional[float]
+
+
+@dataclass(frozen=True)
+class DamageCodeRow:
+    damage_id: int
+    damage_type: str
+    severity_percentage: float
+
+
+@dataclass(frozen=True)
+class RuleSnapshot:
+    """
+    Read-only view of the active master rows. Lookups mirror the iexact
+    filters the views used to run against the database, taking the row
+    with the lowest primary key when several match.
+    """
+
+    version: int
+    loaded_at: float
+    fingerprint: str  # hash of the row contents; equal snapshots in any process share it
+    rules: Tuple[RuleRow, ...]
+    claim_types: Tuple[ClaimTypeRow, ...]
+    damage_codes: Tuple[DamageCodeRow, ...]
+    _rules_by_type: Mapping[str, Tuple[RuleRow, ...]]
+    _claim_types_by_name: Mapping[str, ClaimTypeRow]
+
+    @classmethod
+    def build(cls, version: int, rules, claim_types, damage_codes) -> "RuleSnapshot":
+        rules = tuple(sorted(rules, key=lambda r: r.rule_id))
+        claim_types = tuple(sorted(claim_types, key=lambda c: c.claim_type_id))
+        damage_codes = tuple(sorted(damage_codes, key=lambda d: d.damage_id))
+
+        rules_by_type: dict = {}
+        for rule in rules:
+            rules_by_type.setdefault(rule.rule_type.lower(), []).append(rule)
+        claim_types_by_name: dict = {}
+        for row in claim_types:
+            claim_types_by_name.setdefault(row.claim_type_name.lower(), row)
+
+        fingerprint = hashlib.sha256(repr((rules, claim_types, damage_codes)).encode()).hexdigest()
+
+        return cls(
+            version=version,
+            loaded_at=time.monotonic(),
+            fingerprint=fingerprint,
+            rules=rules,
+            claim_types=claim_types,
+            damage_codes=damage_codes,
+            _rules_by_type=MappingProxyType({k: tuple(v) for k, v in rules_by_type.items()}),
+            _claim_types_by_name=MappingProxyType(claim_types_by_name),
+        )
+
+    def with_rows(self, rules=None, claim_types=None, damage_codes=None) -> "RuleSnapshot":
+        """Copy of this snapshot with some row sets replaced, for what-if evaluation."""
+        return RuleSnapshot.build(
+            self.version,
+            self.rules if rules is None else rules,
+            self.claim_types if claim_types is None else claim_types,
+            self.damage_codes if damage_codes is None else damage_codes,
+        )
+
+    def find_rule(self, rule_type: str, rule_group: Optional[str] = None) -> Optional[RuleRow]:
+        """First active rule with rule_type (and rule_group when given), case-insensitive."""
+        group = rule_group.lower() if rule_group is not None else None
+        for rule in self._rules_by_type.get((rule_type or "").lower(), ()):
+            if group is None or rule.rule_group.lower() == group:
+                return rule
+        return None
+
+    def fraud_rule(self, rule_type: str) -> Optional[RuleRow]:
+        """Active Fraud Check rule for rule_type, or None when inactive / missing."""
+        return self.find_rule(rule_type, FRAUD_CHECK_GROUP)
+
+    def fraud_rules(self) -> Tuple[RuleRow, ...]:
+        """All active Fraud Check rules ordered by rule_id."""
+        return tuple(r for r in self.rules if r.rule_group.lower() == FRAUD_CHECK_GROUP)
+
+    def claim_type(self, claim_type_name: str) -> Optional[ClaimTypeRow]:
+        return self._claim_types_by_name.get((claim_type_name or "").lower())
+
+    def damage_matcher(self) -> KeywordMatcher:
+        """Keyword matcher over damage_codes (indexes line up with self.damage_codes)."""
+        return _damage_matcher(self.damage_codes)
+
+
+_lock = threading.Lock()
+_version = 0
+_snapshot: Optional[RuleSnapshot] = None
+
+
+# (keywords, word_boundary) -> KeywordMatcher; only rebuilt when the damage keywords change
+_matcher_entry: Optional[tuple] = None
+
+
+def _damage_matcher(damage_codes: Tuple[DamageCodeRow, ...]) -> KeywordMatcher:
+    global _matcher_entry
+    key = (
+        tuple(d.damage_type for d in damage_codes),
+        bool(getattr(settings, "DAMAGE_KEYWORD_WORD_BOUNDARY", False)),
+    )
+    entry = _matcher_entry
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    matcher = KeywordMatcher(key[0], word_boundary=key[1])
+    _matcher_entry = (key, matcher)
+    return matcher
+
+
+def _snapshot_ttl() -> float:
+    return float(getattr(settings, "RULE_SNAPSHOT_TTL_SECONDS", 60))
+
+
+def load_rule_snapshot(version: int = 0) -> RuleSnapshot:
+    """Read all active master rows (three queries) into a new RuleSnapshot."""
+    rules = [
+        RuleRow(
+            rule_id=r["rule_id"],
+            rule_type=r["rule_type"] or "",
+            rule_group=r["rule_group"] or "",
+            rule_description=r["rule_description"] or "",
+            rule_expression=r["rule_expression"] or "",
+        )
+        for r in ClaimRuleMaster.objects.filter(is_active=True).values(
+            "rule_id", "rule_type", "rule_group", "rule_description", "rule_expression"
+        )
+    ]
+    claim_types = [
+        ClaimTypeRow(
+            claim_type_id=c["claim_type_id"],
+            claim_type_name=c["claim_type_name"] or "",
+            risk_percentage=float(c["risk_percentage"]) if c["risk_percentage"] is not None else None,
+        )
+        for c in ClaimTypeMaster.objects.filter(is_active=True).values(
+            "claim_type_id", "claim_type_name", "risk_percentage"
+        )
+    ]
+    damage_codes = [
+        DamageCodeRow(
+            damage_id=d["damage_id"],
+            damage_type=d["damage_type"] or "",
+            severity_percentage=float(d["severity_percentage"] or 0),
+        )
+        for d in DamageCodeMaster.objects.filter(is_active=True).values(
+            "damage_id", "damage_type", "severity_percentage"
+        )
+    ]
+    return RuleSnapshot.build(version, rules, claim_types, damage_codes)
+
+
+def get_rule_snapshot() -> RuleSnapshot:
+    """
+    Return the current process-wide snapshot, loading it on first use,
+    after invalidation, or once the TTL has expired.
+    """
+    global _snapshot
+    snap = _snapshot
+    if snap is not None and snap.version == _version and (
+        time.monotonic() - snap.loaded_at < _snapshot_ttl()
+    ):
+        return snap
+    with _lock:
+        snap = _snapshot
+        if snap is None or snap.version != _version or (
+            time.monotonic() - snap.loaded_at >= _snapshot_ttl()
+        ):
+            snap = load_rule_snapshot(_version)
+            _snapshot = snap
+        return snap
+
+
+def invalidate_rule_snapshot() -> None:
+    """Drop the cached snapshot. Call after any write to the rule master tables."""
+    global _version, _snapshot
+    with _lock:
+        _version += 1
+        _snapshot = None
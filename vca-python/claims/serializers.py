@@ -2,6 +2,7 @@ from django.contrib.auth.models import User
 from rest_framework import serializers
 
 from .models import ClaimRuleMaster, ClaimTypeMaster, DamageCodeMaster, PricingConfig
+from .rule_expressions import RuleExpressionError, check_rule_expression, compiled_rule_predicate
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -85,6 +86,9 @@ class ClaimTypeMasterSerializer(serializers.ModelSerializer):
 
 
 class ClaimRuleMasterSerializer(serializers.ModelSerializer):
+    # True when rule_expression compiles to an evaluated expression (else it is descriptive text)
+    expression_compiled = serializers.SerializerMethodField()
+
     class Meta:
         model = ClaimRuleMaster
         fields = [
@@ -93,12 +97,37 @@ class ClaimRuleMasterSerializer(serializers.ModelSerializer):
             "rule_group",
             "rule_description",
             "rule_expression",
+            "expression_compiled",
             "is_active",
             "created_date",
             "created_by",
         ]
         read_only_fields = ["rule_id", "created_date"]
 
+    def get_expression_compiled(self, obj) -> bool:
+        return compiled_rule_predicate(obj.rule_id, obj.rule_expression or "") is not None
+
+    def _check_expression(self, rule_type, rule_expression) -> None:
+        try:
+            check_rule_expression(rule_type, rule_expression)
+        except RuleExpressionError as exc:
+            raise serializers.ValidationError(str(exc))
+
+    def validate_rule_expression(self, value):
+        # rule_type comes from the request, or the instance on a partial update
+        rule_type = self.initial_data.get("rule_type", getattr(self.instance, "rule_type", ""))
+        self._check_expression(rule_type, value)
+        return value
+
+    def validate(self, attrs):
+        # A rule_type change alone can turn the stored description into a custom rule
+        if "rule_type" in attrs and "rule_expression" not in attrs and self.instance is not None:
+            try:
+                self._check_expression(attrs["rule_type"], self.instance.rule_expression)
+            except serializers.ValidationError as exc:
+                raise serializers.ValidationError({"rule_expression": exc.detail})
+        return attrs
+
 
 class DamageCodeMasterSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,3 +1,1284 @@
-from django.test import TestCase
+import importlib
+import json
+import os
+import random
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from . import evaluation_cache, views
+from .backtest import evaluate_book, load_claim_book
+from .claim_search import _mysql_search_sql, ensure_search_index
+from .dashboard_rollups import rebuild_dashboard_rollups, track_dashboard_rollups
+from .evaluation_summary import EVALUATION_SUMMARY_FIELDS, latest_evaluation, refresh_evaluation_summary
+from .keyword_matcher import KeywordMatcher
+from .master_cache import bump_master_version, master_version
+from .pagination import InvalidCursor, encode_cursor, keyset_paginate
+from .rule_expressions import (
+    BUILTIN_RULE_TYPES,
+    RuleExpressionError,
+    _tokenize,
+    build_rule_context,
+    check_rule_expression,
+    compile_expression,
+)
+from .rule_snapshot import DamageCodeRow, RuleSnapshot, get_rule_snapshot, invalidate_rule_snapshot
+from .views import (
+    _BUILTIN_FRAUD_CHECKS,
+    FNOL_LIST_SORT_FIELDS,
+    _apply_latest_evaluation_amount,
+    _fnol_claim_to_raw_response,
+    _run_process_claim_logic,
+    damage_detection,
+)
+from .models import (
+    Claim,
+    ClaimEvaluationResponse,
+    ClaimRuleMaster,
+    ClaimStatus,
+    ClaimTypeMaster,
+    DamageCodeMaster,
+    DashboardRollup,
+    FnolClaim,
+    FnolDamagePhoto,
+    PricingConfig,
+)
+
+
+def create_legacy_tables():
+    """
+    Create the legacy tables (fnol_claims, claim_status, ...) that no migration creates,
+    and rebuild the migrated ones whose columns no longer match the model (e.g.
+    damage_code_master's primary key is damage_id, not the migration's damage_code).
+    """
+    existing = set(connection.introspection.table_names())
+    with connection.schema_editor() as editor:
+        for model in apps.get_app_config("claims").get_models():
+            table = model._meta.db_table
+            if table in existing:
+                with connection.cursor() as cursor:
+                    columns = {c.name for c in connection.introspection.get_table_description(cursor, table)}
+                if {f.column for f in model._meta.concrete_fields} <= columns:
+                    continue
+                editor.delete_model(model)
+            editor.create_model(model)
+            existing.add(table)
+
+
+class LegacyTablesTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        create_legacy_tables()
+        super().setUpClass()
+
+
+class ListFnolQueryCountTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="adjuster", password="x")
+        ClaimStatus.objects.create(id=1, status_name="Open")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _create_claims(self, start: int, count: int) -> None:
+        for i in range(start, start + count):
+            claim = FnolClaim.objects.create(
+                complaint_id=f"CLM-{i:03d}",
+                policy_status="Active",
+                policy_start_date=date(2024, 1, 1),
+                incident_date_time=datetime(2024, 3, 1 + i % 28, tzinfo=timezone.utc),
+                incident_description="rear bumper dent",
+                claim_status_id=1,
+            )
+            FnolDamagePhoto.objects.create(complaint=claim, photo_path=f"{i}_a.jpg")
+            FnolDamagePhoto.objects.create(complaint=claim, photo_path=f"{i}_b.jpg")
+            ClaimEvaluationResponse.objects.create(
+                complaint_id=claim.complaint_id, version=1, is_latest=False, claim_amount=100
+            )
+            ClaimEvaluationResponse.objects.create(
+                complaint_id=claim.complaint_id, version=2, is_latest=True, claim_amount=1000 + i
+            )
+        refresh_evaluation_summary()
+
+    def test_list_fnol_query_count_does_not_grow_with_claims(self):
+        self._create_claims(0, 3)
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get("/api/fnol")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+
+        self._create_claims(3, 12)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get("/api/fnol")
+        self.assertEqual(len(response.json()), 15)
+        self.assertEqual(len(many), len(few))
+        self.assertLessEqual(len(many), 2)
+
+    def test_list_fnol_uses_latest_evaluation_and_photos(self):
+        self._create_claims(0, 2)
+        rows = {row["complaint_id"]: row for row in self.client.get("/api/fnol").json()}
+        row = rows["CLM-001"]
+        self.assertEqual(row["claim_amount"], 1001.0)
+        self.assertEqual(row["status"], "Open")
+        self.assertEqual(
+            sorted(row["damage_photos"]),
+            ["media/vehicle_damage/1_a.jpg", "media/vehicle_damage/1_b.jpg"],
+        )
+        self.assertEqual(sorted(row["raw_response"]["documents"]["photos"]), ["1_a.jpg", "1_b.jpg"])
+
+
+class KeysetPaginationTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="adjuster", password="x")
+        ClaimStatus.objects.create(id=1, status_name="Open")
+        for i in range(12):
+            # Repeated values exercise the complaint_id tie-breaker, None values the NULL ordering
+            FnolClaim.objects.create(
+                complaint_id=f"CLM-{i:03d}",
+                incident_date_time=datetime(2024, 3, 1 + i % 4, tzinfo=timezone.utc) if i % 5 else None,
+                created_date=datetime(2024, 4, 1 + i % 3, tzinfo=timezone.utc),
+                updated_date=datetime(2024, 5, 1 + i % 6, tzinfo=timezone.utc) if i % 4 else None,
+                policy_start_date=date(2023, 1 + i % 5, 1) if i % 3 else None,
+                policy_number=f"P{i % 4}",
+                policy_holder_name=f"Holder {i % 5}" if i % 6 else None,
+                vehicle_year=2015 + i % 3 if i % 7 else None,
+                claim_status_id=1,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _expected(self, sort: str) -> list:
+        field = sort.lstrip("-")
+        claims = FnolClaim.objects.all()
+        ordered = sorted(
+            claims,
+            key=lambda c: (getattr(c, field) is not None, getattr(c, field) or 0, c.complaint_id)
+            if field != "complaint_id" else (True, c.complaint_id, c.complaint_id),
+        )
+        if sort.startswith("-"):
+            ordered.reverse()
+        return [c.complaint_id for c in ordered]
+
+    def _page(self, sort: str, cursor: str = "") -> dict:
+        response = self.client.get("/api/fnol", {"sort": sort, "page_size": 5, "cursor": cursor, "view": "summary"})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_every_sort_pages_forward_and_back(self):
+        for column in FNOL_LIST_SORT_FIELDS:
+            for sort in (column, f"-{column}"):
+                with self.subTest(sort=sort):
+                    pages = [self._page(sort)]
+                    while pages[-1]["next_cursor"]:
+                        pages.append(self._page(sort, pages[-1]["next_cursor"]))
+                    ids = [row["complaint_id"] for page in pages for row in page["results"]]
+                    self.assertEqual(ids, self._expected(sort))
+                    self.assertIsNone(pages[0]["previous_cursor"])
+
+                    # previous_cursor from the last page walks back over the same pages
+                    page = pages[-1]
+                    for expected in reversed(pages[:-1]):
+                        page = self._page(sort, page["previous_cursor"])
+                        self.assertEqual(page["results"], expected["results"])
+                    self.assertIsNone(page["previous_cursor"])
+
+    def test_malformed_cursors_are_rejected_with_400(self):
+        cursors = [
+            "not-a-cursor!",
+            encode_cursor("-incident_date_time", "2024-13-45T00:00:00", "CLM-001", "next"),
+            encode_cursor("-incident_date_time", ["2024-01-01"], "CLM-001", "next"),
+            encode_cursor("-incident_date_time", "2024-03-01T00:00:00", ["CLM-001"], "next"),
+            encode_cursor("-incident_date_time", "2024-03-01T00:00:00", "CLM-001", "sideways"),
+            encode_cursor("vehicle_year", "2016", "CLM-001", "next"),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get("/api/fnol", {"cursor": cursor, "page_size": 5})
+                self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(
+            "/api/fnol", {"sort": "vehicle_year", "page_size": 5, "cursor": encode_cursor("vehicle_year", "x", "CLM-001", "next")}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_malformed_cursor_values_raise_invalid_cursor(self):
+        cases = (
+            ("id", "x", 1),
+            ("id", 1, "abc"),
+            ("-date_joined", "2024-13-45T00:00:00", 1),
+            ("-date_joined", "2024-01-01T00:00:00", "abc"),
+            ("-date_joined", "2024-01-01T00:00:00", None),
+        )
+        for sort, value, pk in cases:
+            with self.subTest(sort=sort, value=value, pk=pk):
+                with self.assertRaises(InvalidCursor):
+                    keyset_paginate(User.objects.all(), sort, 5, encode_cursor(sort, value, pk, "next"))
+
+
+class RuleExpressionTests(SimpleTestCase):
+    def _ctx(self, **values):
+        ctx = build_rule_context({}, has_photos=True, today=date(2024, 6, 1))
+        ctx.update(values)
+        return ctx
+
+    def _eval(self, text, **values):
+        return compile_expression(text)(self._ctx(**values))
+
+    def test_tokenizer_normalises_operators_and_keywords(self):
+        self.assertEqual(
+            _tokenize("Loss_Date <> 'x' && NOT has_photos || a = 1.5"),
+            [
+                ("name", "loss_date"), ("op", "!="), ("string", "'x'"), ("kw", "and"),
+                ("kw", "not"), ("name", "has_photos"), ("kw", "or"), ("name", "a"),
+                ("op", "=="), ("number", "1.5"),
+            ],
+        )
+        with self.assertRaises(RuleExpressionError):
+            _tokenize("loss_date ; 1")
+
+    def test_parser_rejects_invalid_expressions(self):
+        for text in (
+            "",
+            "TRUE",
+            "Claim < 30 days",
+            "loss_date <",
+            "(estimated_amount > 1",
+            "estimated_amount > 1)",
+            "days(loss_date, today) > 1",
+            "unknown_fn(loss_date)",
+        ):
+            with self.subTest(text=text):
+                with self.assertRaises(RuleExpressionError):
+                    compile_expression(text)
+
+    def test_precedence(self):
+        text = "injury_indicator or commercial_vehicle and estimated_amount > 100"
+        self.assertTrue(self._eval(text, injury_indicator=True, commercial_vehicle=False))
+        self.assertFalse(self._eval(text, injury_indicator=False, commercial_vehicle=True, estimated_amount=50))
+        self.assertTrue(self._eval("not injury_indicator and -estimated_amount < -10", estimated_amount=20))
+
+    def test_none_semantics(self):
+        self.assertFalse(self._eval("vehicle_year > 2000", vehicle_year=None))
+        self.assertFalse(self._eval("vehicle_year <= 2000", vehicle_year=None))
+        self.assertTrue(self._eval("vehicle_year == null", vehicle_year=None))
+        self.assertTrue(self._eval("vehicle_year != 2000", vehicle_year=None))
+        self.assertFalse(self._eval("vehicle_year != null", vehicle_year=None))
+        self.assertFalse(self._eval("-vehicle_year < 0", vehicle_year=None))
+        self.assertFalse(self._eval("days(loss_date - policy_start_date) < 30", loss_date=None))
+
+    def test_date_arithmetic(self):
+        ctx = {"policy_start_date": date(2024, 5, 20), "loss_date": date(2024, 6, 1)}
+        for text, expected in (
+            ("days(loss_date - policy_start_date) < 30", True),
+            ("loss_date - policy_start_date < 30 days", True),
+            ("loss_date - policy_start_date < 12", False),
+            ("loss_date - policy_start_date == 12", True),
+            ("loss_date - policy_start_date != 12", False),
+            ("12 == loss_date - policy_start_date", True),
+            ("loss_date - 12 == policy_start_date", True),
+            ("policy_start_date + 12 days == loss_date", True),
+            ("loss_date - today == 0", True),
+            ("year(loss_date) == current_year", True),
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(self._eval(text, **ctx), expected)
+
+    def test_negation_evaluates_operand_once(self):
+        calls = []
+        ctx = self._ctx()
+        ctx["estimated_amount"] = 5
+        predicate = compile_expression("-estimated_amount == -5")
+
+        class CountingContext(dict):
+            def __getitem__(self, key):
+                calls.append(key)
+                return super().__getitem__(key)
+
+        self.assertTrue(predicate(CountingContext(ctx)))
+        self.assertEqual(calls, ["estimated_amount"])
+
+    def test_check_rule_expression(self):
+        self.assertEqual(set(BUILTIN_RULE_TYPES), set(_BUILTIN_FRAUD_CHECKS))
+        check_rule_expression("Early Claim", "Claim < 30 days")
+        check_rule_expression("Data missing", "Loss description is blank")
+        check_rule_expression("Custom", "estimated_amount > 50000")
+        for rule_type, text in (
+            ("Early Claim", "loss_date - policy_start < 30 days"),
+            ("Vehicle Year Invalid", "Year > current year"),
+            ("Custom", "Large claims"),
+            ("Custom", "estimated_amount >"),
+        ):
+            with self.subTest(rule_type=rule_type, text=text):
+                with self.assertRaises(RuleExpressionError):
+                    check_rule_expression(rule_type, text)
+
+
+class ClaimRuleExpressionValidationTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="adjuster", password="x")
+        cls.rule = ClaimRuleMaster.objects.create(
+            rule_type="Early Claim", rule_group="Fraud Check", rule_description="Early",
+            rule_expression="Claim < 30 days", is_active=True,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _post(self, rule_type, rule_expression):
+        return self.client.post("/api/masters/claim-rules", {
+            "rule_type": rule_type, "rule_group": "Fraud Check", "rule_description": "d",
+            "rule_expression": rule_expression, "is_active": True,
+        }, format="json")
+
+    def test_invalid_expressions_are_rejected_with_the_error(self):
+        response = self._post("Large Claim", "estimated_amount > 50000 and")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Expected", response.data["rule_expression"][0])
+
+        response = self._post("Large Claim", "Claims over fifty thousand")
+        self.assertEqual(response.status_code, 400)
+
+        response = self._post("Early Claim", "loss_date - policy_start < 30 days")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("policy_start", response.data["rule_expression"][0])
+
+    def test_valid_expressions_and_descriptions_are_saved(self):
+        response = self._post("Large Claim", "estimated_amount > 50000")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data["expression_compiled"])
+
+        response = self.client.patch(
+            f"/api/masters/claim-rules/{self.rule.rule_id}", {"rule_expression": "Claim < 45 days"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["expression_compiled"])
+
+    def test_rule_type_change_checks_the_stored_expression(self):
+        response = self.client.patch(
+            f"/api/masters/claim-rules/{self.rule.rule_id}", {"rule_type": "Custom"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("rule_expression", response.data)
+
+
+class BacktestEquivalenceTests(LegacyTablesTestCase):
+    """evaluate_book() must give every claim the result _run_process_claim_logic gives it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        ClaimStatus.objects.create(id=1, status_name="Open")
+        rules = (
+            ("Early Claim", "Claim < 30 days"),
+            ("Data missing", "Loss description missing"),
+            ("Vehicle Year Invalid", "Year after current year"),
+            ("Missing Damage Photos", "No photos"),
+            ("Liability Admission", "Admitted"),
+            ("Dashcam CCTV Evidence", "Footage"),
+            ("Injury Indicator", "Injured"),
+            ("Commercial Vehicle", "commercial_vehicle and vehicle_year > 2020"),
+            ("Large Late Claim", "estimated_amount > 25000 and loss_date - policy_start_date >= 90 days"),
+        )
+        for rule_type, expression in rules:
+            ClaimRuleMaster.objects.create(
+                rule_type=rule_type, rule_group="Fraud Check", rule_description=f"{rule_type} rule",
+                rule_expression=expression,
+            )
+        for name, risk in (("SIMPLE", 40), ("MEDIUM", 60), ("COMPLEX", 80)):
+            ClaimTypeMaster.objects.create(claim_type_name=name, risk_percentage=risk)
+        for name, severity in (("bumper", 10), ("door", 5), ("glass", 15)):
+            DamageCodeMaster.objects.create(damage_type=name, severity_percentage=severity)
+
+        rng = random.Random(20240601)
+        loss_base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for i in range(400):
+            claim = FnolClaim.objects.create(
+                complaint_id=f"EQ-{i:04d}",
+                policy_status=rng.choice(["Active", "Active", "Active", "Lapsed", None]),
+                policy_start_date=rng.choice([None, date(2023, 12, 1), date(2024, 1, 1), date(2024, 3, 1)]),
+                incident_date_time=rng.choice(
+                    [None, loss_base + timedelta(days=rng.randint(-10, 200), hours=rng.randint(0, 23))]
+                ),
+                vehicle_year=rng.choice([None, 2015, 2021, date.today().year + 5]),
+                incident_description=rng.choice(["", "  ", "Bumper hit", "door and GLASS broken", "scratch"]),
+                liability_admission=rng.random() < 0.1,
+                dashcam_cctv_evidence=rng.random() < 0.1,
+                injury_indicator=rng.random() < 0.1,
+                commercial_vehicle=rng.random() < 0.2,
+                claim_status_id=1,
+            )
+            if rng.random() < 0.7:
+                FnolDamagePhoto.objects.create(complaint=claim, photo_path=rng.choice([f"{i}.jpg", ""]))
+            if rng.random() < 0.6:
+                ClaimEvaluationResponse.objects.create(
+                    complaint_id=claim.complaint_id, version=1, is_latest=True,
+                    claim_amount=rng.choice([0, 10000, 30000, 50000, 60000]),
+                    estimated_amount=rng.choice([0, 20000]),
+                )
+
+    def test_evaluate_book_matches_process_claim_logic(self):
+        invalidate_rule_snapshot()
+        snapshot = get_rule_snapshot()
+        book = load_claim_book()
+        evaluation = evaluate_book(book, snapshot)
+        self.assertEqual(len(book), 400)
+        latest = {
+            e.complaint_id: e for e in ClaimEvaluationResponse.objects.filter(is_latest=True)
+        }
+        claims = FnolClaim.objects.prefetch_related("damage_photos").in_bulk()
+        for i, complaint_id in enumerate(book.complaint_id):
+            raw = _fnol_claim_to_raw_response(claims[complaint_id])
+            _apply_latest_evaluation_amount(raw, latest.get(complaint_id))
+            with self.subTest(claim_id=complaint_id):
+                self.assertEqual(evaluation.result(i), _run_process_claim_logic(raw, snapshot=snapshot))
+
+
+class PricingConfigAdminTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(username="admin", password="x")
+        cls.config = PricingConfig.objects.create(
+            config_key="claim_base_amount", config_name="Base amount", config_value="10000", config_type="decimal"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def _api_values(self):
+        response = self.api.get("/api/masters/pricing-config")
+        self.assertEqual(response.status_code, 200)
+        return [row["config_value"] for row in response.data]
+
+    def test_admin_writes_invalidate_the_caches(self):
+        self.assertEqual(self._api_values(), ["10000"])
+
+        version = master_version("pricing_config")
+        response = self.client.post(f"/admin/claims/pricingconfig/{self.config.pk}/change/", {
+            "config_key": "claim_base_amount", "config_name": "Base amount", "config_value": "12000",
+            "config_type": "decimal", "description": "", "is_active": "on",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertGreater(master_version("pricing_config"), version)
+        self.assertEqual(self._api_values(), ["12000"])
+
+        version = master_version("pricing_config")
+        response = self.client.post("/admin/claims/pricingconfig/", {
+            "action": "delete_selected", "_selected_action": [self.config.pk], "post": "yes",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertGreater(master_version("pricing_config"), version)
+        self.assertEqual(self._api_values(), [])
+
+
+class KeywordMatcherTests(SimpleTestCase):
+    def test_overlapping_and_nested_keywords(self):
+        matcher = KeywordMatcher(["he", "she", "his", "hers"])
+        self.assertEqual(matcher.find("ushers"), [0, 1, 3])
+
+        matcher = KeywordMatcher(["glass", "windshield glass", "door", "rear door", "Door"])
+        self.assertEqual(matcher.find("REAR DOOR and windshield glass"), [0, 1, 2, 3, 4])
+        self.assertEqual(matcher.find("side glass"), [0])
+
+    def test_empty_keywords_and_text(self):
+        matcher = KeywordMatcher(["", None, "dent"])
+        self.assertEqual(len(matcher), 3)
+        self.assertEqual(matcher.find("dent"), [2])
+        self.assertEqual(matcher.find(""), [])
+        self.assertEqual(matcher.find(None), [])
+
+    def test_word_boundary(self):
+        keywords = ["door", "front bumper", "glass"]
+        loose = KeywordMatcher(keywords)
+        bounded = KeywordMatcher(keywords, word_boundary=True)
+        for text, loose_found, bounded_found in (
+            ("rear door, dent", [0], [0]),
+            ("doorframe bent", [0], []),
+            ("doorframe and door", [0], [0]),
+            ("front_door", [0], []),
+            ("front bumpers", [1], []),
+            ("front bumper.", [1], [1]),
+            ("fibreglass glass", [2], [2]),
+            ("fibreglass", [2], []),
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(loose.find(text), loose_found)
+                self.assertEqual(bounded.find(text), bounded_found)
+
+    def test_parity_with_substring_scoring(self):
+        keywords = ["bumper", "door", "rear door", "glass", "dent", "den", "", "BUMPER", "or"]
+        matcher = KeywordMatcher(keywords)
+        rng = random.Random(4)
+        pieces = ["bump", "er", "door", "rear", " ", "gla", "ss", "dent", "x", "OR", "de", "n"]
+        for _ in range(500):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            expected = [i for i, k in enumerate(keywords) if k and k.lower() in text.lower()]
+            self.assertEqual(matcher.find(text), expected, text)
+
+    def test_damage_detection_scores(self):
+        snapshot = RuleSnapshot.build(1, (), (), (
+            DamageCodeRow(1, "bumper", 10.0),
+            DamageCodeRow(2, "door", 5.0),
+            DamageCodeRow(3, "glass", 45.0),
+        ))
+        incident = {"loss_description": "Bumper and doorframe damage"}
+        self.assertEqual(damage_detection(incident, snapshot), 65)
+        with override_settings(DAMAGE_KEYWORD_WORD_BOUNDARY=True):
+            self.assertEqual(damage_detection(incident, snapshot), 60)
+        self.assertEqual(damage_detection({"loss_description": "bumper door glass"}, snapshot), 100)
+
+
+def fnol_payload(claim_id, description="rear bumper dent", photos=None, **incident):
+    payload = {
+        "claim_id": claim_id,
+        "policy": {"policy_number": f"P-{claim_id}", "policy_status": "Active", "policy_start_date": "2024-01-01"},
+        "vehicle": {"make": "Honda", "model": "City", "year": 2020},
+        "incident": {"date_time_of_loss": "2024-03-01T10:00:00Z", "loss_description": description, **incident},
+        "claimant": {"driver_name": "A Driver"},
+    }
+    if photos is not None:
+        payload["documents"] = {"photos": photos}
+    return payload
+
+
+class SaveFnolBulkTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ensure_search_index()
+        cls.user = User.objects.create_user(username="adjuster", password="x")
+        cls.existing = FnolClaim.objects.create(
+            complaint_id="CLM-OLD", incident_description="old text", vehicle_year=2010,
+            created_date=datetime(2023, 1, 1, tzinfo=timezone.utc),
+        )
+        FnolDamagePhoto.objects.create(complaint=cls.existing, photo_path="keep.jpg")
+        FnolDamagePhoto.objects.create(complaint=cls.existing, photo_path="drop.jpg")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _bulk(self, payloads):
+        response = self.client.post("/api/save-fnol/bulk", {"fnol": payloads}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_mixed_batch_reports_each_record(self):
+        bad_year = fnol_payload("CLM-BAD-YEAR")
+        bad_year["vehicle"]["year"] = "twenty"
+        bad_date = fnol_payload("CLM-BAD-DATE")
+        bad_date["policy"]["policy_start_date"] = "2024-02-30"
+        payloads = [
+            fnol_payload("CLM-NEW-1", photos=["a.jpg", "b.jpg"]),
+            fnol_payload("CLM-OLD", description="updated text", photos=["keep.jpg", "new.jpg"]),
+            {"policy": {}},
+            bad_year,
+            "not an object",
+            fnol_payload("CLM-NEW-2", description="first"),
+            bad_date,
+            fnol_payload("CLM-NEW-2", description="second"),
+            fnol_payload("CLM-LONG-PHOTO", photos=["x" * 600]),
+        ]
+
+        data = self._bulk(payloads)
+
+        self.assertEqual(
+            (data["received"], data["saved"], data["unchanged"], data["failed"], data["skipped"]), (9, 3, 0, 5, 1)
+        )
+        self.assertEqual([r["index"] for r in data["results"]], list(range(9)))
+        self.assertEqual(
+            [r["status"] for r in data["results"]],
+            ["saved", "saved", "error", "error", "error", "skipped", "error", "saved", "error"],
+        )
+        results = data["results"]
+        self.assertIn("claim_id", results[2]["errors"])
+        self.assertIsNone(results[2]["claim_id"])
+        self.assertIn("vehicle_year", results[3]["errors"])
+        self.assertEqual(results[3]["claim_id"], "CLM-BAD-YEAR")
+        self.assertIn("fnol", results[4]["errors"])
+        self.assertIn("Superseded by item 7", results[5]["detail"])
+        self.assertIn("fnol", results[6]["errors"])
+        self.assertIn("photos", results[8]["errors"])
+
+        self.assertFalse(
+            FnolClaim.objects.filter(complaint_id__in=["CLM-BAD-YEAR", "CLM-BAD-DATE", "CLM-LONG-PHOTO"]).exists()
+        )
+        old = FnolClaim.objects.get(pk="CLM-OLD")
+        self.assertEqual(old.incident_description, "updated text")
+        self.assertEqual(old.vehicle_year, 2020)
+        self.assertEqual(old.created_date, datetime(2023, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(FnolClaim.objects.get(pk="CLM-NEW-2").incident_description, "second")
+
+        photos = FnolDamagePhoto.objects.order_by("complaint_id", "photo_path").values_list("complaint_id", "photo_path")
+        self.assertEqual(list(photos), [
+            ("CLM-NEW-1", "a.jpg"), ("CLM-NEW-1", "b.jpg"), ("CLM-OLD", "keep.jpg"), ("CLM-OLD", "new.jpg"),
+        ])
+
+    def test_payload_list_is_required(self):
+        response = self.client.post("/api/save-fnol/bulk", {"fnol": {"claim_id": "x"}}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class SaveFnolUnchangedTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ensure_search_index()
+        cls.user = User.objects.create_user(username="adjuster", password="x")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _save(self, payload):
+        return self.client.post("/api/save-fnol", {"fnol": payload}, format="json")
+
+    def _writes(self, queries):
+        return [
+            q["sql"] for q in queries
+            if q["sql"].lstrip().split(" ", 1)[0].upper() in ("INSERT", "UPDATE", "DELETE", "REPLACE")
+        ]
+
+    def test_unchanged_resend_writes_nothing(self):
+        response = self._save(fnol_payload("CLM-1", photos=["a.jpg", "b.jpg"]))
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.data["unchanged"])
+        updated = FnolClaim.objects.get(pk="CLM-1").updated_date
+
+        # Same values: year as a string, photos reordered
+        resend = fnol_payload("CLM-1", photos=["b.jpg", "a.jpg"])
+        resend["vehicle"]["year"] = "2020"
+        with CaptureQueriesContext(connection) as queries:
+            response = self._save(resend)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"message": "FNOL unchanged", "id": "CLM-1", "unchanged": True})
+        self.assertEqual(self._writes(queries), [])
+        self.assertEqual(FnolClaim.objects.get(pk="CLM-1").updated_date, updated)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/api/save-fnol/bulk", {"fnol": [resend]}, format="json")
+        self.assertEqual((response.data["saved"], response.data["unchanged"]), (0, 1))
+        self.assertEqual(self._writes(queries), [])
+
+    def test_changed_photos_are_written(self):
+        self._save(fnol_payload("CLM-2", photos=["a.jpg", "b.jpg"]))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._save(fnol_payload("CLM-2", photos=["a.jpg", "c.jpg"]))
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.data["unchanged"])
+        self.assertNotEqual(self._writes(queries), [])
+        self.assertEqual(
+            sorted(FnolDamagePhoto.objects.filter(complaint_id="CLM-2").values_list("photo_path", flat=True)),
+            ["a.jpg", "c.jpg"],
+        )
+
+        # A payload without documents.photos leaves the photos alone but is still a different payload
+        response = self._save(fnol_payload("CLM-2"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(FnolDamagePhoto.objects.filter(complaint_id="CLM-2").count(), 2)
+
+    def test_reopened_claim_is_rewritten(self):
+        payload = fnol_payload("CLM-3")
+        self._save(payload)
+        FnolClaim.objects.filter(pk="CLM-3").update(re_open=1)
+
+        response = self._save(payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(FnolClaim.objects.get(pk="CLM-3").re_open, 0)
+        self.assertEqual(self._save(payload).status_code, 200)
+
+
+class RescoreClaimsCommandTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for pk, name in ((1, "Open"), (2, "Business Rule Validation-fail"), (3, "Business Rule Validation-pass")):
+            ClaimStatus.objects.create(id=pk, status_name=name)
+        for suffix in "ABCDE":
+            FnolClaim.objects.create(
+                complaint_id=f"RS-{suffix}",
+                policy_status="Lapsed" if suffix == "A" else "Active",
+                policy_start_date=date(2023, 1, 1),
+                incident_date_time=datetime(2024, 3, 1, tzinfo=timezone.utc),
+                incident_description="bumper dent",
+                claim_status_id=1,
+            )
+        ClaimEvaluationResponse.objects.create(complaint_id="RS-B", version=1, is_latest=True, claim_amount=100)
+
+    def setUp(self):
+        # claim_status rows are cached across tests; other classes create different ones
+        bump_master_version("claim_status")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, "rescore.json")
+
+    def _rescore(self, **options):
+        call_command(
+            "rescore_claims", workers=1, chunk_size=2, checkpoint=self.checkpoint,
+            stdout=StringIO(), stderr=StringIO(), **options,
+        )
+        with open(self.checkpoint) as f:
+            return json.load(f)
+
+    def _versions(self):
+        return dict(
+            ClaimEvaluationResponse.objects.filter(is_latest=True).values_list("complaint_id", "version")
+        )
+
+    def test_failed_claims_stay_in_the_checkpoint_until_resumed(self):
+        evaluate = views._run_process_claim_logic
+
+        def fail_c(data, **kwargs):
+            if data["claim_id"] == "RS-C":
+                raise ValueError("boom")
+            return evaluate(data, **kwargs)
+
+        with mock.patch("claims.views._run_process_claim_logic", side_effect=fail_c):
+            state = self._rescore()
+        self.assertEqual(state, {"last_complaint_id": "RS-E", "processed": 5, "failed": ["RS-C"]})
+        self.assertEqual(self._versions(), {"RS-A": 1, "RS-B": 2, "RS-D": 1, "RS-E": 1})
+        self.assertEqual(ClaimEvaluationResponse.objects.filter(complaint_id="RS-B").count(), 2)
+        self.assertEqual(
+            dict(FnolClaim.objects.values_list("complaint_id", "claim_status_id")),
+            {"RS-A": 2, "RS-B": 3, "RS-C": 1, "RS-D": 3, "RS-E": 3},
+        )
+        latest = ClaimEvaluationResponse.objects.get(complaint_id="RS-A", is_latest=True)
+        self.assertEqual(latest.decision, "Reject")
+
+        # --resume scores only the failed claim; the others keep their version
+        state = self._rescore(resume=True)
+        self.assertEqual(state, {"last_complaint_id": "RS-E", "processed": 5, "failed": []})
+        self.assertEqual(self._versions(), {"RS-A": 1, "RS-B": 2, "RS-C": 1, "RS-D": 1, "RS-E": 1})
+        self.assertEqual(FnolClaim.objects.get(pk="RS-C").claim_status_id, 3)
+
+        self._rescore(resume=True)
+        self.assertEqual(ClaimEvaluationResponse.objects.count(), 6)
+
+
+class DashboardRollupTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ClaimStatus.objects.create(id=1, status_name="Open")
+        ClaimStatus.objects.create(id=2, status_name="Business Rule Validation-fail")
+
+    def _rollups(self):
+        return {
+            (r.dimension, r.bucket): (r.claim_count, r.auto_approved_count, r.amount_total, r.amount_count)
+            for r in DashboardRollup.objects.all()
+            if r.claim_count or r.auto_approved_count or r.amount_total or r.amount_count
+        }
+
+    def _create(self, complaint_id, **fields):
+        fields.setdefault("claim_status_id", 1)
+        return FnolClaim.objects.create(
+            complaint_id=complaint_id, created_date=datetime(2024, 3, 1, 12, tzinfo=timezone.utc), **fields
+        )
+
+    def test_tracked_writes_apply_their_delta(self):
+        with track_dashboard_rollups(["D-1"]):
+            self._create("D-1", eval_decision="Auto Approve", eval_claim_type="SIMPLE", eval_claim_amount=1000)
+        self.assertEqual(self._rollups(), {
+            ("total", "all"): (1, 1, 1000, 1),
+            ("status", "Open"): (1, 1, 1000, 1),
+            ("decision", "Auto Approve"): (1, 1, 1000, 1),
+            ("claim_type", "SIMPLE"): (1, 1, 1000, 1),
+            ("severity", "Unknown"): (1, 1, 1000, 1),
+            ("day", "2024-03-01"): (1, 1, 1000, 1),
+        })
+
+        with track_dashboard_rollups(["D-2"]):
+            self._create("D-2")
+
+        # Bucket changes move the claim between buckets
+        with track_dashboard_rollups(["D-1"]):
+            FnolClaim.objects.filter(pk="D-1").update(
+                claim_status_id=2, eval_decision="Reject", eval_claim_amount=None, eval_estimated_amount=250
+            )
+        rollups = self._rollups()
+        self.assertEqual(rollups[("total", "all")], (2, 0, 250, 1))
+        self.assertEqual(rollups[("status", "Open")], (1, 0, 0, 0))
+        self.assertEqual(rollups[("status", "Business Rule Validation-fail")], (1, 0, 250, 1))
+        self.assertEqual(rollups[("decision", "Reject")], (1, 0, 250, 1))
+        self.assertEqual(rollups[("decision", "Not evaluated")], (1, 0, 0, 0))
+        self.assertNotIn(("decision", "Auto Approve"), rollups)
+
+        with track_dashboard_rollups(["D-2"]):
+            FnolClaim.objects.filter(pk="D-2").delete()
+        rollups = self._rollups()
+        self.assertEqual(rollups[("total", "all")], (1, 0, 250, 1))
+        self.assertNotIn(("status", "Open"), rollups)
+
+        # Incremental totals agree with a full rebuild
+        self.assertEqual(rebuild_dashboard_rollups(), 1)
+        self.assertEqual(self._rollups(), rollups)
+
+    def test_migration_seed_matches_rebuild(self):
+        self._create("S-1", eval_decision="Auto Approve", eval_claim_amount=100.5, eval_llm_severity="minor")
+        self._create("S-2", claim_status_id=2, eval_decision="Reject", eval_estimated_amount=70)
+        FnolClaim.objects.create(
+            complaint_id="S-3", incident_date_time=datetime(2024, 2, 29, 23, tzinfo=timezone.utc)
+        )
+        rebuild_dashboard_rollups()
+        rebuilt = self._rollups()
+
+        DashboardRollup.objects.all().delete()
+        migration = importlib.import_module("claims.migrations.0007_dashboardrollup")
+        # seed_rollups only uses the schema editor's connection
+        migration.seed_rollups(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(self._rollups(), rebuilt)
+        self.assertEqual(rebuilt[("total", "all")], (3, 1, Decimal("170.50"), 2))
+
+
+class SimulateMasterChangeTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="analyst", password="x")
+        cls.simple = ClaimTypeMaster.objects.create(claim_type_name="SIMPLE", risk_percentage=55)
+        DamageCodeMaster.objects.create(damage_type="bumper", severity_percentage=10)
+        DamageCodeMaster.objects.create(damage_type="glass", severity_percentage=15)
+        # No rules and no amounts: every claim is SIMPLE and scored on damage confidence alone
+        for i, description in enumerate(("", "bumper", "bumper glass"), 1):
+            FnolClaim.objects.create(
+                complaint_id=f"SIM-{i}", policy_status="Active", incident_description=description,
+                incident_date_time=datetime(2024, i, 10, tzinfo=timezone.utc),
+            )
+
+    def setUp(self):
+        invalidate_rule_snapshot()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _simulate(self, risk, **body):
+        return self.client.post("/api/masters/simulate-change", {
+            "table": "claim_type", "pk": self.simple.pk, "changes": {"risk_percentage": risk}, **body,
+        }, format="json")
+
+    def test_threshold_change_reports_flipped_claims(self):
+        # Scores 0.50 / 0.60 / 0.75 against 0.55, then 0.70
+        response = self._simulate(70)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["claims"], 3)
+        self.assertEqual(response.data["decisions"]["current"]["Auto Approve"], 2)
+        self.assertEqual(response.data["flipped"], 1)
+        self.assertEqual(response.data["flips"], {"Auto Approve -> Manual Review": 1})
+        self.assertEqual([s["claim_id"] for s in response.data["sample"]], ["SIM-2"])
+        self.assertEqual(ClaimTypeMaster.objects.get(pk=self.simple.pk).risk_percentage, 55)
+
+        response = self._simulate(45)
+        self.assertEqual(response.data["flips"], {"Manual Review -> Auto Approve": 1})
+        self.assertEqual([s["claim_id"] for s in response.data["sample"]], ["SIM-1"])
+
+    def test_book_size_is_bounded(self):
+        with override_settings(SIMULATION_MAX_CLAIMS=2):
+            response = self._simulate(70)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("incident_from", response.data["detail"])
+
+            response = self._simulate(70, incident_from="2024-02-01")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["claims"], 2)
+            self.assertEqual(response.data["flipped"], 1)
+
+        response = self._simulate(70, incident_to="not a date")
+        self.assertEqual(response.status_code, 400)
+
+
+class ListUsersQueryCountTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_group = Group.objects.create(name="Admin")
+        cls.user = User.objects.create_user(username="viewer", password="x")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _create_users(self, start: int, count: int) -> None:
+        for i in range(start, start + count):
+            user = User.objects.create(username=f"user{i:03d}")
+            if i % 2:
+                user.groups.add(self.admin_group)
+            for n in range(i % 3):
+                Claim.objects.create(
+                    claim_id=f"U{i}-{n}", policy_number="P", fraud_risk_band="Low", created_by=user.username
+                )
+
+    def test_list_users_query_count_does_not_grow_with_users(self):
+        self._create_users(0, 3)
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get("/api/users/")
+        self.assertEqual(len(response.json()), 4)
+
+        self._create_users(3, 12)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get("/api/users/")
+        users = {u["username"]: u for u in response.json()}
+        self.assertEqual(len(users), 16)
+        self.assertEqual(len(many), len(few))
+        self.assertLessEqual(len(many), 2)
+        self.assertEqual((users["user005"]["role"], users["user005"]["claims_handled"]), ("Admin", 2))
+        self.assertEqual((users["user006"]["role"], users["user006"]["claims_handled"]), ("User", 0))
+
+        with self.assertNumQueries(len(few)):
+            response = self.client.get("/api/users/", {"page_size": 5})
+        self.assertEqual(len(response.json()["results"]), 5)
+
+    def test_page_size_is_bounded_by_the_user_list_limit(self):
+        self.assertEqual(self.client.get("/api/users/", {"page_size": 201}).status_code, 400)
+        self.assertEqual(self.client.get("/api/users/", {"page_size": 200}).status_code, 200)
+
+
+class ListFraudClaimsTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="investigator", password="x")
+        ClaimStatus.objects.create(id=1, status_name="Open")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _create_claims(self, start: int, count: int) -> None:
+        for i in range(start, start + count):
+            claim = FnolClaim.objects.create(
+                complaint_id=f"FR-{i:03d}",
+                incident_date_time=datetime(2024, 3, 1 + i % 28, tzinfo=timezone.utc),
+                claim_status_id=1,
+                re_open=1,
+            )
+            # FR-000 has 1 version, FR-001 2, FR-002 3, ...
+            for version in range(1, i % 4 + 2):
+                ClaimEvaluationResponse.objects.create(
+                    complaint_id=claim.complaint_id, version=version, is_latest=version == i % 4 + 1,
+                    claim_status=f"status v{version}", reason=f"reason v{version}", decision="Reject",
+                )
+        FnolClaim.objects.get_or_create(complaint_id="FR-NOT-REOPENED", defaults={"claim_status_id": 1, "re_open": 0})
+        refresh_evaluation_summary()
+
+    def test_history_limit_keeps_the_newest_versions(self):
+        self._create_claims(0, 4)
+        response = self.client.get("/api/fraud-claims", {"history_limit": 2})
+        self.assertEqual(response.status_code, 200)
+        claims = {c["complaint_id"]: c for c in response.json()}
+        self.assertEqual(sorted(claims), ["FR-000", "FR-001", "FR-002", "FR-003"])
+        for complaint_id, versions, kept in (("FR-000", 1, [1]), ("FR-002", 3, [2, 3]), ("FR-003", 4, [3, 4])):
+            claim = claims[complaint_id]
+            self.assertEqual(claim["times_processed"], versions)
+            self.assertEqual([r["version"] for r in claim["evaluation_records"]], kept)
+            self.assertEqual(claim["latest_claim_status"], f"status v{versions}")
+
+        full = {c["complaint_id"]: c for c in self.client.get("/api/fraud-claims").json()}
+        self.assertEqual([r["version"] for r in full["FR-003"]["evaluation_records"]], [1, 2, 3, 4])
+        self.assertEqual(self.client.get("/api/fraud-claims", {"history_limit": 0}).status_code, 400)
+
+    def test_query_count_does_not_grow_with_claims(self):
+        self._create_claims(0, 3)
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get("/api/fraud-claims", {"history_limit": 2})
+        self.assertEqual(len(response.json()), 3)
+
+        self._create_claims(3, 12)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get("/api/fraud-claims", {"history_limit": 2})
+        self.assertEqual(len(response.json()), 15)
+        self.assertEqual(len(many), len(few))
+        self.assertLessEqual(len(many), 2)
+
+        with self.assertNumQueries(len(few)):
+            response = self.client.get("/api/fraud-claims", {"page_size": 5})
+        self.assertEqual(len(response.json()["results"]), 5)
+        self.assertEqual(self.client.get("/api/fraud-claims", {"page_size": 201}).status_code, 400)
+
+
+class EvaluationCacheTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="rules-admin", password="x")
+        ClaimTypeMaster.objects.create(claim_type_name="SIMPLE", risk_percentage=55)
+        cls.bumper = DamageCodeMaster.objects.create(damage_type="bumper", severity_percentage=10)
+        cls.claim = FnolClaim.objects.create(
+            complaint_id="EC-1", policy_status="Active", incident_description="bumper",
+            incident_date_time=datetime(2024, 5, 1, tzinfo=timezone.utc),
+        )
+
+    def setUp(self):
+        invalidate_rule_snapshot()
+        evaluation_cache.invalidate_evaluation_cache()
+
+    def _evaluate(self, payload):
+        with mock.patch.object(views, "_run_process_claim_logic", wraps=_run_process_claim_logic) as compute:
+            result = views._run_process_claim_logic_cached(payload)
+        return result, compute.call_count
+
+    def test_rule_edit_misses_and_identical_payload_hits(self):
+        payload = _fnol_claim_to_raw_response(self.claim)
+        first, computed = self._evaluate(payload)
+        self.assertEqual(computed, 1)
+
+        # Identical content in a fresh dict, keys in another order
+        again, computed = self._evaluate(json.loads(json.dumps(payload, sort_keys=True)))
+        self.assertEqual(computed, 0)
+        self.assertEqual(again, first)
+        again["decision"] = "mutated"
+        self.assertEqual(self._evaluate(payload)[0], first)
+
+        api = APIClient()
+        api.force_authenticate(self.user)
+        response = api.patch(f"/api/masters/damage-codes/{self.bumper.pk}", {"severity_percentage": 40}, format="json")
+        self.assertEqual(response.status_code, 200)
+        edited, computed = self._evaluate(payload)
+        self.assertEqual(computed, 1)
+        self.assertNotEqual(edited["damage_confidence"], first["damage_confidence"])
+
+        # Pricing writes leave the cache alone: the evaluation does not read PricingConfig
+        response = api.post("/api/masters/pricing-config", {
+            "config_key": "claim_base_amount", "config_name": "Base", "config_value": "1", "config_type": "decimal",
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self._evaluate(payload)[1], 0)
+
+
+class ImportFnolCommandTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ensure_search_index()
+
+    def _import(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_fnol", path, "--batch-size", "2", *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def _file(self, suffix, text):
+        handle = tempfile.NamedTemporaryFile("w", suffix=suffix, delete=False, encoding="utf-8", newline="")
+        with handle:
+            handle.write(text)
+        self.addCleanup(os.unlink, handle.name)
+        return handle.name
+
+    def test_ndjson_bad_rows_and_resume(self):
+        lines = [
+            json.dumps(fnol_payload("IMP-1")),
+            "{not json",
+            json.dumps(fnol_payload("IMP-3")),
+            json.dumps({"policy": {"policy_number": "P-X"}}),
+            json.dumps(fnol_payload("IMP-5")),
+        ]
+        path = self._file(".ndjson", "\n".join(lines[:3]) + "\n")
+        out, err = self._import(path)
+        self.assertIn("Imported 3 records through record 3: 2 saved, 0 unchanged, 1 failed", out)
+        self.assertIn("record 2 (no claim_id): Invalid JSON", err)
+
+        # The feed grew after the interruption: resume past the committed records
+        with open(path, "a", encoding="utf-8") as handle:
+            handle.write("\n".join(lines[3:]) + "\n")
+        with mock.patch("claims.fnol_ingest.json.loads", wraps=json.loads) as loads:
+            out, err = self._import(path, "--skip", "3")
+        self.assertEqual(loads.call_count, 2)
+        self.assertIn("Imported 2 records through record 5: 1 saved, 0 unchanged, 1 failed", out)
+        self.assertNotIn("record 2", err)
+        self.assertIn("record 4", err)
+        self.assertEqual(
+            sorted(FnolClaim.objects.values_list("complaint_id", flat=True)), ["IMP-1", "IMP-3", "IMP-5"]
+        )
+
+    def test_csv_bad_row_and_resume(self):
+        path = self._file(".csv", (
+            "claim_id,vehicle.year,incident.loss_description,incident.date_time_of_loss,documents.photos\n"
+            'CSV-1,2019,"front bumper,\nsecond line",2024-03-01T10:00:00Z,a.jpg|b.jpg\n'
+            "CSV-2,old,glass,2024-03-01T11:00:00Z,\n"
+            "CSV-3,2021,door,2024-03-02T10:00:00Z,\n"
+        ))
+        out, err = self._import(path)
+        self.assertIn("Imported 3 records through record 3: 2 saved, 0 unchanged, 1 failed", out)
+        self.assertIn("record 2 (CSV-2)", err)
+        self.assertIn("vehicle_year", err)
+        claim = FnolClaim.objects.get(pk="CSV-1")
+        self.assertEqual(claim.incident_description, "front bumper,\nsecond line")
+        self.assertEqual(sorted(claim.damage_photos.values_list("photo_path", flat=True)), ["a.jpg", "b.jpg"])
+
+        # Resuming after the multi-line row counts rows, not lines
+        out, err = self._import(path, "--skip", "2")
+        self.assertIn("Imported 1 records through record 3: 0 saved, 1 unchanged, 0 failed", out)
+        self.assertEqual(err, "")
+
+
+class FnolEtagTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ensure_search_index()
+        cls.user = User.objects.create_user(username="adjuster", password="x")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        response = self.client.post("/api/save-fnol", {"fnol": fnol_payload("ET-1", photos=["a.jpg"])}, format="json")
+        self.assertEqual(response.status_code, 201)
+
+    def _get(self, url, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def _etag(self, url):
+        response = self._get(url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_fnol_etag_matches_until_the_claim_or_its_photos_change(self):
+        url = "/api/fnol/ET-1/"
+        etag = self._etag(url)
+        response = self._get(url, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertNotEqual(self._etag(url + "?view=summary"), etag)
+
+        self.client.post("/api/save-fnol", {"fnol": fnol_payload("ET-1", "cracked glass", photos=["a.jpg"])}, format="json")
+        self.assertEqual(self._get(url, etag).status_code, 200)
+        etag = self._etag(url)
+
+        self.client.post("/api/save-fnol", {"fnol": fnol_payload("ET-1", "cracked glass", photos=["a.jpg", "b.jpg"])}, format="json")
+        self.assertEqual(self._get(url, etag).status_code, 200)
+        etag = self._etag(url)
+
+        # Same ids and count, different content
+        FnolDamagePhoto.objects.filter(complaint_id="ET-1", photo_path="b.jpg").update(photo_path="c.jpg")
+        self.assertEqual(self._get(url, etag).status_code, 200)
+        self.assertEqual(self._get(url, self._etag(url)).status_code, 304)
+
+    def test_evaluation_etag_follows_the_latest_evaluation(self):
+        url = "/api/fnol/ET-1/evaluation"
+        self.assertEqual(self._get(url).status_code, 404)
+        ClaimEvaluationResponse.objects.create(complaint_id="ET-1", version=1, is_latest=True, decision="Reject")
+        refresh_evaluation_summary(["ET-1"])
+        etag = self._etag(url)
+        self.assertEqual(self._get(url, etag).status_code, 304)
+
+        ClaimEvaluationResponse.objects.filter(complaint_id="ET-1").update(is_latest=False)
+        ClaimEvaluationResponse.objects.create(complaint_id="ET-1", version=2, is_latest=True, decision="Auto Approve")
+        refresh_evaluation_summary(["ET-1"])
+        response = self._get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["decision"], "Auto Approve")
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class ClaimSearchTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ensure_search_index()
+        cls.user = User.objects.create_user(username="adjuster", password="x")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _save(self, claim_id, description, **vehicle):
+        payload = fnol_payload(claim_id, description)
+        payload["vehicle"].update(vehicle)
+        response = self.client.post("/api/save-fnol", {"fnol": payload}, format="json")
+        self.assertIn(response.status_code, (200, 201))
+
+    def _search(self, q, **params):
+        response = self.client.get("/api/fnol/search", {"q": q, "view": "summary", **params})
+        self.assertEqual(response.status_code, 200)
+        return [claim["complaint_id"] for claim in response.data["results"]]
+
+    def test_saved_claims_are_indexed_and_ranked(self):
+        self._save("SRCH-1", "rear bumper dent in parking lot", registration_number="MH-12-AB-1234")
+        self._save("SRCH-2", "bumper bumper bumper scraped, bumper cracked")
+        self._save("SRCH-3", "windshield glass cracked")
+
+        # Prefix match; the claim naming the word more often ranks first
+        self.assertEqual(self._search("bump"), ["SRCH-2", "SRCH-1"])
+        self.assertEqual(self._search("cracked BUMPER"), ["SRCH-2"])
+        self.assertEqual(self._search("12 ab"), ["SRCH-1"])
+        self.assertEqual(self._search("bumper", page_size=1, page=2), ["SRCH-1"])
+        self.assertEqual(self._search("hail"), [])
+
+        # A re-save replaces the claim's index entry
+        self._save("SRCH-1", "hail damage on roof")
+        self.assertEqual(self._search("bumper"), ["SRCH-2"])
+        self.assertEqual(self._search("hail"), ["SRCH-1"])
+        self.assertEqual(self.client.get("/api/fnol/search").status_code, 400)
+
+    def test_mysql_short_terms_skip_the_fulltext_match(self):
+        score_sql, where_sql, params = _mysql_search_sql(["bumper", "12", "ab"], 3)
+        self.assertTrue(score_sql.startswith("MATCH ("))
+        self.assertEqual(where_sql.count("MATCH ("), 1)
+        self.assertEqual(where_sql.count("REGEXP %s"), 2)
+        self.assertEqual(params, ["+bumper*", "+bumper*", r"\b12", r"\bab"])
+
+        score_sql, where_sql, params = _mysql_search_sql(["12"], 3)
+        self.assertEqual(score_sql, "0")
+        self.assertNotIn("MATCH", where_sql)
+        self.assertEqual(params, [r"\b12"])
+
+
+class EvaluationSummaryTests(LegacyTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="investigator", password="x")
+        for pk, name in ((1, "Open"), (2, "Business Rule Validation-fail"), (3, "Business Rule Validation-pass")):
+            ClaimStatus.objects.create(id=pk, status_name=name)
+        FnolClaim.objects.create(
+            complaint_id="SUM-1", policy_status="Active", policy_start_date=date(2023, 1, 1),
+            incident_date_time=datetime(2024, 3, 1, tzinfo=timezone.utc), incident_description="bumper dent",
+            claim_status_id=1, re_open=1,
+        )
+
+    def setUp(self):
+        bump_master_version("claim_status")
+        invalidate_rule_snapshot()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertSummaryIsLatest(self, version):
+        latest = ClaimEvaluationResponse.objects.filter(complaint_id="SUM-1", is_latest=True).order_by("id").first()
+        self.assertEqual(latest.version, version)
+        claim = FnolClaim.objects.get(pk="SUM-1")
+        for column, field in EVALUATION_SUMMARY_FIELDS.items():
+            self.assertEqual(getattr(claim, column), getattr(latest, field), column)
+        summary = latest_evaluation(claim)
+        self.assertEqual((summary.pk, summary.version, summary.decision), (latest.pk, latest.version, latest.decision))
+        return latest
+
+    def _fraud_claim(self):
+        claims = {c["complaint_id"]: c for c in self.client.get("/api/fraud-claims").json()}
+        return claims.get("SUM-1")
+
+    def test_summary_tracks_new_evaluations_and_rescores(self):
+        self.assertIsNone(latest_evaluation(FnolClaim.objects.get(pk="SUM-1")))
+        self.assertIsNone(self._fraud_claim())
+
+        for version in (1, 2):
+            response = self.client.post("/api/fnol/SUM-1/run-fraud-detection")
+            self.assertEqual(response.status_code, 200)
+            latest = self.assertSummaryIsLatest(version)
+            claim = self._fraud_claim()
+            self.assertEqual(
+                (claim["times_processed"], claim["reason"]), (version, latest.reason or latest.decision)
+            )
+
+        # rescore_claims writes version 3 through its own bulk path
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                "rescore_claims", workers=1, checkpoint=os.path.join(directory, "rescore.json"),
+                stdout=StringIO(), stderr=StringIO(),
+            )
+        self.assertNotEqual(self.assertSummaryIsLatest(3).pk, latest.pk)
+        self.assertEqual(self._fraud_claim()["times_processed"], 3)
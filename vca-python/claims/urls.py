@@ -4,12 +4,20 @@ from .views import (
     get_fnol,
     get_claim_evaluation,
     list_fnol,
+    search_fnol,
+    export_fnol,
     list_fraud_claims,
     login,
     process_claim,
+    process_claims_batch,
+    evaluation_timings,
+    master_cache_stats,
+    dashboard_stats_view,
     recommendation_report_pdf,
     run_fraud_detection,
     save_fnol,
+    save_fnol_bulk,
+    import_fnol_file,
     create_user,
     list_users,
     edit_user,
@@ -26,6 +34,7 @@ from .views import (
     damage_code_master_detail,
     pricing_config_collection,
     pricing_config_detail,
+    simulate_master_change,
 )
 
 urlpatterns = [
@@ -39,10 +48,18 @@ urlpatterns = [
     path("users/<int:pk>/activate/", activate_user, name="activate_user"),
     path("users/<int:pk>/soft-delete/", soft_delete_user, name="soft_delete_user"),
     path("save-fnol", save_fnol, name="save_fnol"),
+    path("save-fnol/bulk", save_fnol_bulk, name="save_fnol_bulk"),
+    path("save-fnol/import", import_fnol_file, name="import_fnol_file"),
     path("process-claim", process_claim, name="process_claim"),
+    path("process-claims/batch", process_claims_batch, name="process_claims_batch"),
+    path("diagnostics/evaluation-timings", evaluation_timings, name="evaluation_timings"),
+    path("diagnostics/master-cache", master_cache_stats, name="master_cache_stats"),
+    path("dashboard/stats", dashboard_stats_view, name="dashboard_stats"),
     path("fnol/<str:complaint_id>/run-fraud-detection", run_fraud_detection, name="run_fraud_detection"),
     path("fraud-claims", list_fraud_claims, name="list_fraud_claims"),
     path("fnol", list_fnol, name="list_fnol"),
+    path("fnol/search", search_fnol, name="search_fnol"),
+    path("fnol/export", export_fnol, name="export_fnol"),
     path("fnol/<str:complaint_id>/evaluation", get_claim_evaluation, name="get_claim_evaluation"),
     path("fnol/<str:complaint_id>/recommendation-report/", recommendation_report_pdf, name="recommendation_report_pdf"),
     path("fnol/<str:pk>/", get_fnol, name="get_fnol"),
@@ -56,4 +73,5 @@ urlpatterns = [
     path("masters/damage-codes/<int:pk>", damage_code_master_detail, name="damage_code_master_detail"),
     path("masters/pricing-config", pricing_config_collection, name="pricing_config_collection"),
     path("masters/pricing-config/<int:pk>", pricing_config_detail, name="pricing_config_detail"),
+    path("masters/simulate-change", simulate_master_change, name="simulate_master_change"),
 ]
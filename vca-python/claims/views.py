@@ -1,19 +1,24 @@
+import hashlib
 import io
 import json
 import os
 import random
 import re
-from datetime import date
-from typing import Optional, Tuple
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
 
 from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User, Group
-from django.db import connection
-from django.db.models import Max, Q
-from django.http import HttpResponse
+from django.db import DatabaseError, connection
+from django.db.models import Count, F, Max, OuterRef, Prefetch, Q, Subquery, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.utils.dateparse import parse_date, parse_datetime
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import condition
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
@@ -48,6 +53,33 @@ from .serializers import (
     DamageCodeMasterSerializer,
     PricingConfigSerializer,
 )
+from .evaluation_timings import EvaluationTimer, timed, timing_histogram
+from .fnol_helpers import (
+    fnol_payload_fingerprint,
+    fnol_payload_photos,
+    fnol_payload_to_claim_data,
+    fnol_payload_unchanged,
+    sync_damage_photos,
+)
+from .fnol_ingest import (
+    FNOL_BULK_MAX_ITEMS,
+    FNOL_IMPORT_FORMATS,
+    FNOL_IMPORT_MAX_REPORTED_ERRORS,
+    fnol_import_format,
+    import_fnol_records,
+    ingest_fnol_payloads,
+    iter_csv_records,
+    iter_ndjson_records,
+)
+from .claim_export import EXPORT_FORMATS, iter_export
+from .claim_search import index_claims, search_claim_ids
+from .dashboard_rollups import DASHBOARD_DEFAULT_DAYS, dashboard_stats, track_dashboard_rollups
+from .evaluation_cache import cached_evaluation, evaluation_cache_key
+from .evaluation_summary import latest_evaluation, refresh_evaluation_summary
+from .master_cache import bump_master_version, cached_claim_status, cached_master_read, master_cache_info
+from .pagination import InvalidCursor, keyset_paginate
+from .rule_expressions import BUILTIN_RULE_TYPES, RuleContext, build_rule_context, compiled_rule_predicate
+from .rule_snapshot import ClaimTypeRow, RuleRow, RuleSnapshot, get_rule_snapshot, invalidate_rule_snapshot
 
 
 def _is_admin_user(user) -> bool:
@@ -119,35 +151,85 @@ def create_user(request):
     return Response({"user": UserSerializer(user).data, "message": "User created."}, status=status.HTTP_201_CREATED)
 
 
+USER_LIST_DEFAULT_PAGE_SIZE = 50
+USER_LIST_MAX_PAGE_SIZE = 200
+
+
+def _user_to_response(u: User) -> dict:
+    groups = u.groups.all()  # prefetched, ordered by id like groups.first()
+    return {
+        'id': u.id,
+        'username': u.username,
+        'email': u.email,
+        'first_name': u.first_name,
+        'last_name': u.last_name,
+        'role': groups[0].name if groups else 'User',
+        'status': 'Active' if u.is_active else 'Inactive',
+        'claims_handled': u.claims_handled,
+        'last_login': u.last_login,
+    }
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_users(request):
-    # Any authenticated user can view all users
-    users = User.objects.all()
-    payload = []
-    for u in users:
-        role = u.groups.first().name if u.groups.exists() else 'User'
-        status_text = 'Active' if u.is_active else 'Inactive'
-        
-        # Try to get claims count, gracefully handle if table doesn't exist
+    """
+    Any authenticated user can view all users. Role and claims_handled come from one
+    annotated query (claims counted per username in a subquery) plus one prefetch of groups.
+    ?search= matches username, email, first or last name. Passing page_size or cursor
+    switches to keyset pagination: {"results": [...], "next_cursor": ..., "previous_cursor": ...}.
+    """
+    params = request.query_params
+    users = User.objects.prefetch_related(Prefetch('groups', queryset=Group.objects.order_by('id')))
+    search = (params.get('search') or '').strip()
+    if search:
+        users = users.filter(
+            Q(username__icontains=search)
+            | Q(email__icontains=search)
+            | Q(first_name__icontains=search)
+            | Q(last_name__icontains=search)
+        )
+    claims_count = (
+        Claim.objects.filter(created_by=OuterRef('username'))
+        .order_by()
+        .values('created_by')
+        .annotate(n=Count('id'))
+        .values('n')
+    )
+    annotated = users.annotate(claims_handled=Coalesce(Subquery(claims_count), 0))
+
+    paginated = 'cursor' in params or 'page_size' in params
+    if paginated:
         try:
-            claims_handled = Claim.objects.filter(created_by=u.username).count()
-        except Exception:
-            claims_handled = 0
-            
-        payload.append({
-            'id': u.id,
-            'username': u.username,
-            'email': u.email,
-            'first_name': u.first_name,
-            'last_name': u.last_name,
-            'role': role,
-            'status': status_text,
-            'claims_handled': claims_handled,
-            'last_login': u.last_login,
-        })
+            page_size = int(params.get('page_size') or USER_LIST_DEFAULT_PAGE_SIZE)
+        except ValueError:
+            page_size = 0
+        if not 1 <= page_size <= USER_LIST_MAX_PAGE_SIZE:
+            return Response(
+                {"detail": f"page_size must be between 1 and {USER_LIST_MAX_PAGE_SIZE}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    def load(qs):
+        if paginated:
+            return keyset_paginate(qs, 'id', page_size, params.get('cursor') or None)
+        return list(qs.order_by('id'))
 
-    return Response(payload, status=status.HTTP_200_OK)
+    try:
+        loaded = load(annotated)
+    except InvalidCursor as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except DatabaseError:
+        # Legacy claim table may not exist: report 0 claims handled
+        loaded = load(users.annotate(claims_handled=Value(0)))
+
+    if paginated:
+        return Response({
+            'results': [_user_to_response(u) for u in loaded.results],
+            'next_cursor': loaded.next_cursor,
+            'previous_cursor': loaded.previous_cursor,
+        }, status=status.HTTP_200_OK)
+    return Response([_user_to_response(u) for u in loaded], status=status.HTTP_200_OK)
 
 
 @api_view(['PATCH', 'PUT'])
@@ -310,100 +392,191 @@ def product_rule(policy: dict) -> bool:
     Currently checks that policy status is Active.
     Rule definition is stored in claim_rule_master (type 'Policy Status').
     """
-    _ = (
-        ClaimRuleMaster.objects.filter(
-            rule_type__iexact="Policy Status", is_active=True
-        ).first()
-    )
     return policy.get("policy_status") == "Active"
 
 
-def _get_early_claim_window_days() -> int:
+@lru_cache(maxsize=256)
+def _parse_early_claim_window(rule_expression: str) -> int:
+    """Day threshold from a free-text Early Claim rule_expression (e.g. 'Claim < 30 days')."""
+    match = re.search(r"(\d+)", rule_expression)
+    if not match:
+        return 30
+    try:
+        return int(match.group(1))
+    except ValueError:
+        return 30
+
+
+def _get_early_claim_window_days(snapshot: Optional[RuleSnapshot] = None) -> int:
     """
     Reads the 'Early Claim' rule from claim_rule_master and extracts the
     day threshold from rule_expression (e.g. 'Claim < 30 days').
     Defaults to 30 if parsing fails.
     """
-    rule = ClaimRuleMaster.objects.filter(
-        rule_type__iexact="Early Claim", is_active=True
-    ).first()
+    snapshot = snapshot or get_rule_snapshot()
+    rule = snapshot.find_rule("Early Claim")
     if not rule or not rule.rule_expression:
         return 30
-
-    match = re.search(r"(\d+)", rule.rule_expression)
-    if not match:
-        return 30
-    try:
-        return int(match.group(1))
-    except ValueError:
-        return 30
+    return _parse_early_claim_window(rule.rule_expression)
 
 
-def _is_fraud_rule_active(rule_type: str) -> bool:
+def _is_fraud_rule_active(rule_type: str, snapshot: Optional[RuleSnapshot] = None) -> bool:
     """Check if a Fraud Check rule is active in claim_rule_master."""
-    return ClaimRuleMaster.objects.filter(
-        rule_type__iexact=rule_type,
-        rule_group__iexact="Fraud Check",
-        is_active=True,
-    ).exists()
+    snapshot = snapshot or get_rule_snapshot()
+    return snapshot.fraud_rule(rule_type) is not None
 
 
-def _get_fraud_rule_description(rule_type: str) -> str:
+def _get_fraud_rule_description(rule_type: str, snapshot: Optional[RuleSnapshot] = None) -> str:
     """Return rule_description from claim_rule_master for Fraud Check rules, else rule_type."""
-    rule = ClaimRuleMaster.objects.filter(
-        rule_type__iexact=rule_type,
-        rule_group__iexact="Fraud Check",
-        is_active=True,
-    ).first()
+    snapshot = snapshot or get_rule_snapshot()
+    rule = snapshot.fraud_rule(rule_type)
     return (rule.rule_description or rule_type).strip() if rule else rule_type
 
 
+def _early_claim_triggered(ctx: RuleContext, snapshot: RuleSnapshot) -> bool:
+    start_date = ctx["policy_start_date"]
+    loss_date = ctx["loss_date"]
+    if not (start_date and loss_date):
+        return False
+    days_diff = (loss_date - start_date).days
+    return days_diff < 0 or days_diff < _get_early_claim_window_days(snapshot)
+
+
+# Built-in Fraud Check rules: rule_type -> fn(ctx, snapshot) returning True when the rule is triggered.
+# Used when a rule's rule_expression is descriptive text rather than a compiled expression.
+_BUILTIN_FRAUD_CHECKS = {
+    "Early Claim": _early_claim_triggered,
+    "Data missing": lambda ctx, snapshot: not ctx["loss_description"].strip(),
+    "Vehicle Year Invalid": lambda ctx, snapshot: (
+        ctx["vehicle_year"] is not None and ctx["vehicle_year"] > ctx["current_year"]
+    ),
+    "Missing Damage Photos": lambda ctx, snapshot: not ctx["has_photos"],
+    # Risk when TRUE
+    "Liability Admission": lambda ctx, snapshot: ctx["liability_admission"],
+    "Dashcam CCTV Evidence": lambda ctx, snapshot: ctx["dashcam_cctv_evidence"],
+    "Injury Indicator": lambda ctx, snapshot: ctx["injury_indicator"],
+    "Commercial Vehicle": lambda ctx, snapshot: ctx["commercial_vehicle"],
+}
+
+# Order in which fraud_check() evaluates the built-in rules; the first triggered one gives the reason
+FRAUD_CHECK_ORDER = (
+    "Early Claim",
+    "Data missing",
+    "Vehicle Year Invalid",
+    "Liability Admission",
+    "Dashcam CCTV Evidence",
+    "Injury Indicator",
+    "Commercial Vehicle",
+)
+
+_BUILTIN_RULE_TYPES = frozenset(t.lower() for t in BUILTIN_RULE_TYPES)
+
+
+def _fraud_rule_triggered(
+    rule: Optional[RuleRow], rule_type: str, ctx: RuleContext, snapshot: RuleSnapshot
+) -> bool:
+    """
+    Evaluate one Fraud Check rule with a single closure call: the compiled rule_expression
+    when it is an expression, otherwise the built-in check for rule_type.
+    Unknown rule types without an expression never trigger.
+    """
+    if rule is not None:
+        predicate = compiled_rule_predicate(rule.rule_id, rule.rule_expression)
+        if predicate is not None:
+            return predicate(ctx)
+    check = _BUILTIN_FRAUD_CHECKS.get(rule_type)
+    return bool(check(ctx, snapshot)) if check else False
+
+
+def _custom_fraud_rules(snapshot: RuleSnapshot) -> list:
+    """Active Fraud Check rules added through the masters API (non built-in type, compiled expression)."""
+    return [
+        rule
+        for rule in snapshot.fraud_rules()
+        if (rule.rule_type or "").strip().lower() not in _BUILTIN_RULE_TYPES
+        and compiled_rule_predicate(rule.rule_id, rule.rule_expression) is not None
+    ]
+
+
+class FraudEvaluation(NamedTuple):
+    """Everything _run_process_claim_logic needs from the Fraud Check rules, from one pass."""
+
+    rule_results: list  # [{rule_type, rule_description, passed}] for every active Fraud Check rule
+    band: str  # "High" or "Low"
+    reason: str  # description of the first triggered rule, "" when band is Low
+    triggered_rule: Optional[str]  # rule_type that set the band (the short-circuit), None when Low
+    photos_missing: bool  # Missing Damage Photos triggered; only checked when band is Low
+    photo_reason: str
+
+
+def _evaluate_fraud_rules(
+    ctx: RuleContext, snapshot: RuleSnapshot, timer: Optional[EvaluationTimer] = None
+) -> FraudEvaluation:
+    """
+    Evaluate the Fraud Check rules once for a claim. Each (rule, rule_type) closure runs at
+    most once; the per-rule list, the band/reason walk and the photo check share the results.
+    """
+    triggered: dict = {}
+
+    def is_triggered(rule: RuleRow, rule_type: str) -> bool:
+        key = (rule.rule_id, rule_type)
+        if key not in triggered:
+            with timed(timer, f"fraud_rule:{rule_type}"):
+                triggered[key] = _fraud_rule_triggered(rule, rule_type, ctx, snapshot)
+        return triggered[key]
+
+    # Per-rule pass/fail for the UI, dispatched on the exact (stripped) rule_type
+    rule_results = []
+    for rule in snapshot.fraud_rules():
+        rule_type = (rule.rule_type or "").strip()
+        if not rule_type:
+            continue
+        rule_results.append({
+            "rule_type": rule_type,
+            "rule_description": rule.rule_description or _get_fraud_rule_description(rule_type, snapshot),
+            "passed": not is_triggered(rule, rule_type),
+        })
+
+    # Band: first triggered built-in rule in FRAUD_CHECK_ORDER, then the custom expression rules
+    band, reason, triggered_rule = "Low", "", None
+    for rule_type in FRAUD_CHECK_ORDER:
+        rule = snapshot.fraud_rule(rule_type)
+        if rule and is_triggered(rule, rule_type):
+            band, reason, triggered_rule = "High", _get_fraud_rule_description(rule_type, snapshot), rule_type
+            break
+    else:
+        for rule in _custom_fraud_rules(snapshot):
+            if is_triggered(rule, rule.rule_type):
+                band, reason = "High", (rule.rule_description or rule.rule_type).strip()
+                triggered_rule = rule.rule_type
+                break
+
+    photos_missing, photo_reason = False, ""
+    photo_rule = snapshot.fraud_rule("Missing Damage Photos")
+    if band == "Low" and photo_rule and is_triggered(photo_rule, "Missing Damage Photos"):
+        photos_missing = True
+        photo_reason = _get_fraud_rule_description("Missing Damage Photos", snapshot)
+
+    return FraudEvaluation(rule_results, band, reason, triggered_rule, photos_missing, photo_reason)
+
+
 def fraud_check(
-    history: dict, incident: dict, policy: dict, vehicle: Optional[dict] = None
+    history: dict,
+    incident: dict,
+    policy: dict,
+    vehicle: Optional[dict] = None,
+    snapshot: Optional[RuleSnapshot] = None,
+    ctx: Optional[RuleContext] = None,
 ) -> Tuple[str, str]:
     """
     Fraud check using claim_rule_master (Fraud Check rules).
     Returns (fraud_band, reason).
     """
-    vehicle = vehicle or {}
-
-    # 1) Early Claim - policy_start_date, date_time_of_loss
-    if _is_fraud_rule_active("Early Claim"):
-        early_window_days = _get_early_claim_window_days()
-        start_date = parse_date(policy.get("policy_start_date"))
-        loss_dt = parse_datetime(incident.get("date_time_of_loss"))
-        if start_date and loss_dt:
-            days_diff = (loss_dt.date() - start_date).days
-            if days_diff < 0 or days_diff < early_window_days:
-                return "High", _get_fraud_rule_description("Early Claim")
-
-    # 2) Data missing - incident_description empty
-    if _is_fraud_rule_active("Data missing"):
-        if not (incident.get("loss_description") or "").strip():
-            return "High", _get_fraud_rule_description("Data missing")
-
-    # 3) Vehicle Year Invalid - vehicle_year > current year
-    if _is_fraud_rule_active("Vehicle Year Invalid"):
-        vehicle_year = vehicle.get("year")
-        if vehicle_year is not None:
-            try:
-                year_val = int(vehicle_year)
-                if year_val > date.today().year:
-                    return "High", _get_fraud_rule_description("Vehicle Year Invalid")
-            except (TypeError, ValueError):
-                pass
-
-    # 4) Liability Admission, Dashcam CCTV Evidence, Injury Indicator, Commercial Vehicle (risk when TRUE)
-    if _is_fraud_rule_active("Liability Admission") and incident.get("liability_admission"):
-        return "High", _get_fraud_rule_description("Liability Admission")
-    if _is_fraud_rule_active("Dashcam CCTV Evidence") and incident.get("dashcam_cctv_evidence"):
-        return "High", _get_fraud_rule_description("Dashcam CCTV Evidence")
-    if _is_fraud_rule_active("Injury Indicator") and incident.get("injury_indicator"):
-        return "High", _get_fraud_rule_description("Injury Indicator")
-    if _is_fraud_rule_active("Commercial Vehicle") and incident.get("commercial_vehicle"):
-        return "High", _get_fraud_rule_description("Commercial Vehicle")
-
-    return "Low", ""
+    snapshot = snapshot or get_rule_snapshot()
+    if ctx is None:
+        ctx = build_rule_context({"policy": policy, "incident": incident, "vehicle": vehicle or {}})
+    evaluation = _evaluate_fraud_rules(ctx, snapshot)
+    return evaluation.band, evaluation.reason
 
 
 def _has_damage_photos(complaint_id: Optional[str] = None, documents: Optional[dict] = None) -> bool:
@@ -424,6 +597,22 @@ def _has_damage_photos(complaint_id: Optional[str] = None, documents: Optional[d
     return False
 
 
+def _build_claim_rule_context(
+    data: dict,
+    complaint_id: Optional[str] = None,
+    has_photos: Optional[bool] = None,
+    timer: Optional[EvaluationTimer] = None,
+) -> RuleContext:
+    """RuleContext for an FnolPayload; the photo check only queries when a rule reads has_photos."""
+    documents = data.get("documents") or {}
+
+    def load_photos() -> bool:
+        with timed(timer, "photo_check"):
+            return _has_damage_photos(complaint_id=complaint_id, documents=documents)
+
+    return build_rule_context(data, has_photos=has_photos, photo_loader=load_photos)
+
+
 def _evaluate_single_fraud_rule(
     rule_type: str,
     incident: dict,
@@ -431,62 +620,32 @@ def _evaluate_single_fraud_rule(
     vehicle: dict,
     documents: dict,
     complaint_id: Optional[str] = None,
+    snapshot: Optional[RuleSnapshot] = None,
+    has_photos: Optional[bool] = None,
+    rule: Optional[RuleRow] = None,
+    ctx: Optional[RuleContext] = None,
 ) -> Tuple[bool, str]:
     """
     Evaluate one Fraud Check rule by rule_type. Returns (passed, description).
+    has_photos / ctx, when already known, avoid another fnol_damage_photos lookup.
     """
-    desc = _get_fraud_rule_description(rule_type)
-    vehicle = vehicle or {}
-    documents = documents or {}
-
-    if rule_type == "Early Claim":
-        early_window_days = _get_early_claim_window_days()
-        start_date = parse_date(policy.get("policy_start_date"))
-        loss_dt = parse_datetime(incident.get("date_time_of_loss"))
-        passed = True
-        if start_date and loss_dt:
-            days_diff = (loss_dt.date() - start_date).days
-            if days_diff < 0 or days_diff < early_window_days:
-                passed = False
-        return passed, desc
-
-    if rule_type == "Data missing":
-        passed = bool((incident.get("loss_description") or "").strip())
-        return passed, desc
-
-    if rule_type == "Vehicle Year Invalid":
-        vehicle_year = vehicle.get("year")
-        passed = True
-        if vehicle_year is not None:
-            try:
-                year_val = int(vehicle_year)
-                if year_val > date.today().year:
-                    passed = False
-            except (TypeError, ValueError):
-                pass
-        return passed, desc
-
-    if rule_type == "Missing Damage Photos":
-        passed = _has_damage_photos(complaint_id=complaint_id, documents=documents)
-        return passed, desc
-
-    # Risk when TRUE → passed when FALSE
-    if rule_type == "Liability Admission":
-        return not bool(incident.get("liability_admission")), desc
-    if rule_type == "Dashcam CCTV Evidence":
-        return not bool(incident.get("dashcam_cctv_evidence")), desc
-    if rule_type == "Injury Indicator":
-        return not bool(incident.get("injury_indicator")), desc
-    if rule_type == "Commercial Vehicle":
-        return not bool(incident.get("commercial_vehicle")), desc
-
+    snapshot = snapshot or get_rule_snapshot()
+    desc = _get_fraud_rule_description(rule_type, snapshot)
+    if ctx is None:
+        data = {"policy": policy, "incident": incident, "vehicle": vehicle or {}, "documents": documents or {}}
+        ctx = _build_claim_rule_context(data, complaint_id=complaint_id, has_photos=has_photos)
+    if rule is None:
+        rule = snapshot.fraud_rule(rule_type)
     # Unknown rule_type: show in UI with passed=True and DB description
-    return True, desc
+    return not _fraud_rule_triggered(rule, rule_type, ctx, snapshot), desc
 
 
 def _get_fraud_evaluation_rules(
     incident: dict, policy: dict, vehicle: dict, documents: dict,
     complaint_id: Optional[str] = None,
+    snapshot: Optional[RuleSnapshot] = None,
+    has_photos: Optional[bool] = None,
+    ctx: Optional[RuleContext] = None,
 ) -> list[dict]:
     """
     Evaluate each active Fraud Check rule from claim_rule_master and return pass/fail.
@@ -494,42 +653,26 @@ def _get_fraud_evaluation_rules(
     """
     vehicle = vehicle or {}
     documents = documents or {}
-    results = []
+    snapshot = snapshot or get_rule_snapshot()
+    if ctx is None:
+        data = {"policy": policy, "incident": incident, "vehicle": vehicle, "documents": documents}
+        ctx = _build_claim_rule_context(data, complaint_id=complaint_id, has_photos=has_photos)
+    return _evaluate_fraud_rules(ctx, snapshot).rule_results
 
-    rules = ClaimRuleMaster.objects.filter(
-        rule_group__iexact="Fraud Check",
-        is_active=True,
-    ).order_by("rule_id")
 
-    for rule in rules:
-        rule_type = (rule.rule_type or "").strip()
-        if not rule_type:
-            continue
-        passed, desc = _evaluate_single_fraud_rule(
-            rule_type, incident, policy, vehicle, documents, complaint_id=complaint_id
-        )
-        results.append({
-            "rule_type": rule_type,
-            "rule_description": rule.rule_description or desc,
-            "passed": passed,
-        })
-
-    return results
-
-
-def damage_detection(incident: dict) -> int:
+def damage_detection(incident: dict, snapshot: Optional[RuleSnapshot] = None) -> int:
     """
     Damage confidence based on damage_code_master.
     Starts with a base confidence and adds severity percentages for each
     matching damage_type found in the loss description.
     """
+    snapshot = snapshot or get_rule_snapshot()
     description = (incident.get("loss_description") or "").lower()
     base_confidence = 50.0
 
-    for damage in DamageCodeMaster.objects.filter(is_active=True):
-        damage_keyword = (damage.damage_type or "").lower()
-        if damage_keyword and damage_keyword in description:
-            base_confidence += float(damage.severity_percentage or 0)
+    # One pass over the description finds every active damage keyword (in damage_id order)
+    for index in snapshot.damage_matcher().find(description):
+        base_confidence += snapshot.damage_codes[index].severity_percentage
 
     # Clamp between 0 and 100 and convert to int
     return max(0, min(int(round(base_confidence)), 100))
@@ -537,6 +680,7 @@ def damage_detection(incident: dict) -> int:
 
 def _get_claim_type_threshold(
     incident: dict,
+    snapshot: Optional[RuleSnapshot] = None,
 ) -> Tuple[float, Optional[str]]:
     """
     Determine claim type bucket (SIMPLE / MEDIUM / COMPLEX) from
@@ -552,9 +696,8 @@ def _get_claim_type_threshold(
     else:
         claim_type_name = "COMPLEX"
 
-    row = ClaimTypeMaster.objects.filter(
-        claim_type_name__iexact=claim_type_name, is_active=True
-    ).first()
+    snapshot = snapshot or get_rule_snapshot()
+    row = snapshot.claim_type(claim_type_name)
 
     if not row:
         # Fallback to previous static threshold of 0.75
@@ -600,6 +743,30 @@ def _get_claim_status_label_for_evaluation(result: dict) -> str:
     return "Business Rule Validation-pass"
 
 
+def _evaluation_response_from_result(
+    complaint_id: str, version: int, result: dict, user_id: Optional[int] = None
+) -> ClaimEvaluationResponse:
+    """Unsaved claim_evaluation_response row (is_latest=True) for a process_claim result."""
+    threshold_val = result.get("threshold")
+    threshold_int = int(round((threshold_val or 0) * 100)) if threshold_val is not None else 0
+    evaluation_claim_status = _get_claim_status_label_for_evaluation(result)
+    return ClaimEvaluationResponse(
+        complaint_id=complaint_id,
+        version=version,
+        is_latest=True,
+        damage_confidence=result.get("damage_confidence") or 0,
+        estimated_amount=result.get("estimated_amount") or 0,
+        claim_amount=result.get("claim_amount") or result.get("estimated_amount") or 0,
+        threshold_value=threshold_int,
+        claim_type=(result.get("claim_type") or "")[:20],
+        decision=(result.get("decision") or "")[:20],
+        claim_status=(evaluation_claim_status or "")[:50],
+        reason=result.get("reason"),
+        created_by=user_id,
+        updated_by=user_id,
+    )
+
+
 def _get_claim_status_for_result(result: dict) -> ClaimStatus | None:
     """
     Map run_fraud_detection result to fnol_claims.claim_status (claim_status table).
@@ -610,35 +777,43 @@ def _get_claim_status_for_result(result: dict) -> ClaimStatus | None:
     decision = (result.get("decision") or "").strip()
     if decision == "Reject":
         # Fail: policy inactive or high fraud → fnol_claims.claim_status = 2
-        status = ClaimStatus.objects.filter(pk=2).first()
-        return status or ClaimStatus.objects.filter(
-            status_name__iexact="Business Rule Validation-fail"
-        ).first()
+        return cached_claim_status(pk=2, name="Business Rule Validation-fail")
     # All rules passed → fnol_claims.claim_status = 3
-    status = ClaimStatus.objects.filter(pk=3).first()
-    return status or ClaimStatus.objects.filter(
-        status_name__iexact="Business Rule Validation-pass"
-    ).first()
+    return cached_claim_status(pk=3, name="Business Rule Validation-pass")
 
 
-def _run_process_claim_logic(data: dict) -> dict:
+def _run_process_claim_logic(
+    data: dict,
+    snapshot: Optional[RuleSnapshot] = None,
+    has_photos: Optional[bool] = None,
+    timer: Optional[EvaluationTimer] = None,
+) -> dict:
     """
     Run the process_claim validation logic. Returns a dict with evaluation results.
     May return early with decision/reason on failure paths.
+    All rule lookups go through one RuleSnapshot; the only query left is the
+    damage photo check, made once and only when a rule reads has_photos and
+    the caller has not already supplied it.
+    The Fraud Check rules are evaluated in a single pass; short_circuit records
+    which stage (and rule) ended the evaluation early, None for a full evaluation.
+    timer (diagnostics mode) records each stage; the caller adds the _timings block.
     """
+    snapshot = snapshot or get_rule_snapshot()
     policy = data.get("policy") or {}
     incident = data.get("incident") or {}
-    history = data.get("history") or {}
-    documents = data.get("documents") or {}
-    vehicle = data.get("vehicle") or {}
     complaint_id = data.get("claim_id", "")
 
     estimated_amount = incident.get("estimated_amount") or 0
-    fraud_rule_results = _get_fraud_evaluation_rules(
-        incident, policy, vehicle, documents, complaint_id=complaint_id or None
+    ctx = _build_claim_rule_context(
+        data, complaint_id=complaint_id or None, has_photos=has_photos, timer=timer
     )
+    with timed(timer, "fraud_rules"):
+        fraud = _evaluate_fraud_rules(ctx, snapshot, timer)
+    fraud_rule_results = fraud.rule_results
 
-    if not product_rule(policy):
+    with timed(timer, "product_rule"):
+        policy_ok = product_rule(policy)
+    if not policy_ok:
         return {
             "claim_id": complaint_id,
             "decision": "Reject",
@@ -651,15 +826,16 @@ def _run_process_claim_logic(data: dict) -> dict:
             "threshold": 0.75,
             "claim_type": None,
             "estimated_amount": estimated_amount,
+            "short_circuit": {"stage": "product", "rule_type": None},
         }
 
-    fraud_score, fraud_reason = fraud_check(history, incident, policy, vehicle)
+    fraud_score = fraud.band
     if fraud_score == "High":
         return {
             "claim_id": complaint_id,
             "decision": "Reject",
             "claim_status": "Rejected",
-            "reason": fraud_reason or "High fraud risk",
+            "reason": fraud.reason or "High fraud risk",
             "fraud_rule_results": fraud_rule_results,
             "damage_confidence": 0,
             "fraud_score": fraud_score,
@@ -667,28 +843,32 @@ def _run_process_claim_logic(data: dict) -> dict:
             "threshold": 0.75,
             "claim_type": None,
             "estimated_amount": estimated_amount,
+            "short_circuit": {"stage": "fraud", "rule_type": fraud.triggered_rule},
         }
 
-    if _is_fraud_rule_active("Missing Damage Photos") and not _has_damage_photos(
-        complaint_id=complaint_id or None, documents=documents
-    ):
+    if fraud.photos_missing:
+        with timed(timer, "damage_confidence"):
+            confidence = damage_detection(incident, snapshot)
         return {
             "claim_id": complaint_id,
             "decision": "Manual Review",
             "claim_status": "Open",
-            "reason": _get_fraud_rule_description("Missing Damage Photos"),
+            "reason": fraud.photo_reason,
             "fraud_rule_results": fraud_rule_results,
-            "damage_confidence": damage_detection(incident),
+            "damage_confidence": confidence,
             "fraud_score": fraud_score,
             "evaluation_score": 0,
             "threshold": 0.75,
             "claim_type": None,
             "estimated_amount": estimated_amount,
+            "short_circuit": {"stage": "photos", "rule_type": "Missing Damage Photos"},
         }
 
-    confidence = damage_detection(incident)
+    with timed(timer, "damage_confidence"):
+        confidence = damage_detection(incident, snapshot)
     score = evaluate_score(confidence, incident.get("estimated_amount") or 0)
-    threshold, claim_type_name = _get_claim_type_threshold(incident)
+    with timed(timer, "threshold_lookup"):
+        threshold, claim_type_name = _get_claim_type_threshold(incident, snapshot)
 
     if score >= threshold:
         decision = "Auto Approve"
@@ -708,9 +888,20 @@ def _run_process_claim_logic(data: dict) -> dict:
         "claim_status": status,
         "estimated_amount": estimated_amount,
         "fraud_rule_results": fraud_rule_results,
+        "short_circuit": None,
     }
 
 
+def _run_process_claim_logic_cached(data: dict, snapshot: Optional[RuleSnapshot] = None) -> dict:
+    """
+    _run_process_claim_logic through the evaluation cache: an unchanged payload evaluated
+    against unchanged rules returns the stored result (a copy) without recomputation.
+    """
+    snapshot = snapshot or get_rule_snapshot()
+    key = evaluation_cache_key(data, snapshot)
+    return cached_evaluation(key, lambda: _run_process_claim_logic(data, snapshot=snapshot))
+
+
 def _fnol_claim_to_raw_response(claim: FnolClaim) -> dict:
     """Build FnolPayload-like dict from FnolClaim for process_claim compatibility."""
     photos = [p.photo_path for p in claim.damage_photos.all() if p.photo_path]
@@ -752,59 +943,164 @@ def _fnol_claim_to_raw_response(claim: FnolClaim) -> dict:
     }
 
 
-def _fnol_claim_to_response(claim: FnolClaim) -> dict:
-    """Convert FnolClaim to API response format. Includes latest evaluation amounts when available."""
-    latest_eval = ClaimEvaluationResponse.objects.filter(
-        complaint_id=claim.complaint_id, is_latest=True
-    ).first()
+def _apply_latest_evaluation_amount(raw_response: dict, latest: Optional[ClaimEvaluationResponse]) -> dict:
+    """
+    Use the latest evaluation's claim_amount (or estimated_amount) as incident.estimated_amount
+    so the claim type threshold is not always the SIMPLE bucket.
+    """
+    if latest and (latest.claim_amount or latest.estimated_amount):
+        amount = float(latest.claim_amount or latest.estimated_amount or 0)
+        if amount > 0:
+            raw_response.setdefault("incident", {})["estimated_amount"] = amount
+    return raw_response
+
+
+# FNOL response keys read straight from one fnol_claims column (response key -> model field)
+_FNOL_COLUMN_RESPONSE_FIELDS = {
+    "id": "complaint_id",
+    "complaint_id": "complaint_id",
+    "coverage_type": "coverage_type",
+    "policy_number": "policy_number",
+    "policy_status": "policy_status",
+    "policy_start_date": "policy_start_date",
+    "policy_end_date": "policy_end_date",
+    "policy_holder_name": "policy_holder_name",
+    "vehicle_make": "vehicle_make",
+    "vehicle_year": "vehicle_year",
+    "vehicle_model": "vehicle_model",
+    "vehicle_registration_number": "vehicle_registration_number",
+    "incident_type": "incident_type",
+    "incident_description": "incident_description",
+    "incident_date_time": "incident_date_time",
+    "fir_document_copy": "fir_document_copy",
+    "insurance_document_copy": "insurance_document_copy",
+    "created_date": "created_date",
+    "created_by": "created_by",
+    "updated_date": "updated_date",
+    "updated_by": "updated_by",
+    "re_open": "re_open",
+}
+# FNOL response keys read from the latest-evaluation summary (response key -> fnol_claims column)
+_FNOL_EVALUATION_RESPONSE_FIELDS = {
+    "estimated_amount": "eval_estimated_amount",
+    "claim_amount": "eval_claim_amount",
+    "llm_damages": "eval_llm_damages",
+    "llm_severity": "eval_llm_severity",
+}
+
+# Every FNOL response key, in response order (the detail view)
+FNOL_RESPONSE_FIELDS = (
+    "id", "complaint_id", "coverage_type", "policy_number", "policy_status", "policy_start_date",
+    "policy_end_date", "policy_holder_name", "vehicle_make", "vehicle_year", "vehicle_model",
+    "vehicle_registration_number", "incident_type", "incident_description", "incident_date_time",
+    "fir_document_copy", "insurance_document_copy", "damage_photos", "raw_response", "status",
+    "estimated_amount", "claim_amount", "llm_damages", "llm_severity", "created_date", "created_by",
+    "updated_date", "updated_by", "re_open",
+)
+# ?view=summary: what a claims table row shows; no photos, evaluation or raw_response
+FNOL_SUMMARY_FIELDS = (
+    "id", "complaint_id", "policy_number", "policy_holder_name", "vehicle_make", "vehicle_year",
+    "vehicle_model", "incident_type", "incident_date_time", "status", "created_date", "re_open",
+)
+
+
+def _fnol_response_fields(params) -> Optional[tuple]:
+    """
+    Response keys requested with ?fields=a,b,c or ?view=summary|detail (fields wins).
+    None means the full detail response. Raises ValueError for an unknown field or view.
+    """
+    fields = (params.get("fields") or "").strip()
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in FNOL_RESPONSE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}.")
+        return tuple(f for f in FNOL_RESPONSE_FIELDS if f in requested)
+    view = (params.get("view") or "detail").strip().lower()
+    if view == "summary":
+        return FNOL_SUMMARY_FIELDS
+    if view != "detail":
+        raise ValueError("view must be 'summary' or 'detail'.")
+    return None
+
+
+def _fnol_claims_for_response(qs, fields: Optional[tuple] = None, extra_columns: tuple = ()):
+    """
+    FnolClaim queryset ready for _fnol_claim_to_response(claim, fields) without per-row
+    queries. For the full response: claim_status joined and photos prefetched (two
+    queries in total); the latest evaluation comes from the eval_* summary columns.
+    With fields, only what those keys need is loaded: the listed columns (.only()),
+    and the status join and photo prefetch only when a key reads them.
+    extra_columns are also loaded (e.g. the sort column read for pagination cursors).
+    """
+    wanted = set(FNOL_RESPONSE_FIELDS if fields is None else fields)
+    if fields is not None and "raw_response" not in wanted:
+        columns = {"complaint_id", *extra_columns}
+        columns.update(_FNOL_COLUMN_RESPONSE_FIELDS[f] for f in wanted if f in _FNOL_COLUMN_RESPONSE_FIELDS)
+        evaluation_columns = [_FNOL_EVALUATION_RESPONSE_FIELDS[f] for f in wanted if f in _FNOL_EVALUATION_RESPONSE_FIELDS]
+        if evaluation_columns:
+            columns.update(evaluation_columns, ["eval_id"])
+        if "status" in wanted:
+            columns.add("claim_status")
+        qs = qs.only(*columns)
+    if "status" in wanted:
+        qs = qs.select_related("claim_status")
+    if wanted & {"damage_photos", "raw_response"}:
+        qs = qs.prefetch_related("damage_photos")
+    return qs
+
+
+def _fnol_column_value(claim: FnolClaim, field: str):
+    value = getattr(claim, field, None)
+    if field == "re_open":
+        return 1 if value == 1 else 0
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _fnol_claim_to_response(claim: FnolClaim, fields: Optional[tuple] = None) -> dict:
+    """
+    Convert FnolClaim to API response format. Includes latest evaluation amounts when available,
+    read from the claim's eval_* summary columns.
+    fields limits the response to those keys (see _fnol_response_fields); None returns all.
+    """
+    fields = FNOL_RESPONSE_FIELDS if fields is None else fields
     estimated_amount = None
     claim_amount = None
     llm_damages = None
     llm_severity = None
-    if latest_eval:
-        estimated_amount = float(latest_eval.estimated_amount or 0)
-        claim_amount = float(latest_eval.claim_amount or 0)
-        llm_damages = latest_eval.llm_damages  # JSON string
-        llm_severity = latest_eval.llm_severity
+    if any(f in _FNOL_EVALUATION_RESPONSE_FIELDS for f in fields) and claim.eval_id is not None:
+        estimated_amount = float(claim.eval_estimated_amount or 0)
+        claim_amount = float(claim.eval_claim_amount or 0)
+        llm_damages = claim.eval_llm_damages  # JSON string
+        llm_severity = claim.eval_llm_severity
 
     BASE_URL = "media/vehicle_damage/"
 
-    photo_urls = [
-        f"{BASE_URL}{path}"
-        for path in claim.damage_photos.values_list("photo_path", flat=True)
-    ]
-
-    return {
-        "id": claim.complaint_id,
-        "complaint_id": claim.complaint_id,
-        "coverage_type": claim.coverage_type,
-        "policy_number": claim.policy_number,
-        "policy_status": claim.policy_status,
-        "policy_start_date": claim.policy_start_date.isoformat() if claim.policy_start_date else None,
-        "policy_end_date": claim.policy_end_date.isoformat() if claim.policy_end_date else None,
-        "policy_holder_name": claim.policy_holder_name,
-        "vehicle_make": claim.vehicle_make,
-        "vehicle_year": claim.vehicle_year,
-        "vehicle_model": claim.vehicle_model,
-        "vehicle_registration_number": claim.vehicle_registration_number,
-        "incident_type": claim.incident_type,
-        "incident_description": claim.incident_description,
-        "incident_date_time": claim.incident_date_time.isoformat() if claim.incident_date_time else None,
-        "fir_document_copy": claim.fir_document_copy,
-        "insurance_document_copy": claim.insurance_document_copy,
-        "damage_photos": photo_urls,
-        "raw_response": _fnol_claim_to_raw_response(claim),
-        "status": claim.claim_status.status_name if claim.claim_status else "Open",
-        "estimated_amount": estimated_amount,
-        "claim_amount": claim_amount,
-        "llm_damages": llm_damages,
-        "llm_severity": llm_severity,
-        "created_date": claim.created_date.isoformat() if getattr(claim, "created_date", None) else None,
-        "created_by": getattr(claim, "created_by", None),
-        "updated_date": claim.updated_date.isoformat() if getattr(claim, "updated_date", None) else None,
-        "updated_by": getattr(claim, "updated_by", None),
-        "re_open": 1 if getattr(claim, "re_open", 0) == 1 else 0,
-    }
+    data = {}
+    for field in fields:
+        if field in _FNOL_COLUMN_RESPONSE_FIELDS:
+            data[field] = _fnol_column_value(claim, _FNOL_COLUMN_RESPONSE_FIELDS[field])
+        elif field == "damage_photos":
+            data[field] = [f"{BASE_URL}{photo.photo_path}" for photo in claim.damage_photos.all()]
+        elif field == "raw_response":
+            data[field] = _fnol_claim_to_raw_response(claim)
+        elif field == "status":
+            data[field] = claim.claim_status.status_name if claim.claim_status else "Open"
+        elif field == "estimated_amount":
+            data[field] = estimated_amount
+        elif field == "claim_amount":
+            data[field] = claim_amount
+        elif field == "llm_damages":
+            data[field] = llm_damages
+        elif field == "llm_severity":
+            data[field] = llm_severity
+    return data
+
+
+FRAUD_CLAIMS_DEFAULT_PAGE_SIZE = 50
+FRAUD_CLAIMS_MAX_PAGE_SIZE = 200
 
 
 @api_view(['GET'])
@@ -813,25 +1109,52 @@ def list_fraud_claims(request):
     """
     Return re-open claims only (fnol_claims.re_open = 1) that have been through fraud detection.
     Used by Re-Open Claims page - shows only claims marked for re-open.
+
+    The whole list (or page) costs a constant number of queries: the claims (latest
+    evaluation from their eval_* summary columns), then every evaluation row for those
+    claims in one query, grouped in memory.
+    ?history_limit=N returns only the N most recent evaluation_records per claim
+    (times_processed still counts all versions). Passing page_size or cursor switches to
+    keyset pagination: {"results": [...], "next_cursor": ..., "previous_cursor": ...}.
     """
-    # Re-open claims only (re_open=1) that exist in claim_evaluation_response
-    fnol_claims = (
-        FnolClaim.objects.filter(
-            complaint_id__in=ClaimEvaluationResponse.objects.values_list(
-                "complaint_id", flat=True
-            ).distinct(),
-            re_open=1,
-        )
-        .select_related("claim_status")
-        .order_by("-incident_date_time", "-complaint_id")
-    )
+    params = request.query_params
+    history_limit = None
+    if params.get("history_limit"):
+        try:
+            history_limit = int(params["history_limit"])
+        except ValueError:
+            history_limit = 0
+        if history_limit < 1:
+            return Response(
+                {"detail": "history_limit must be a positive integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    # Re-open claims only (re_open=1) that have a latest claim_evaluation_response row
+    fnol_claims = FnolClaim.objects.filter(eval_id__isnull=False, re_open=1).select_related("claim_status")
+
+    paginated = "cursor" in params or "page_size" in params
+    if paginated:
+        try:
+            page_size = int(params.get("page_size") or FRAUD_CLAIMS_DEFAULT_PAGE_SIZE)
+        except ValueError:
+            page_size = 0
+        if not 1 <= page_size <= FRAUD_CLAIMS_MAX_PAGE_SIZE:
+            return Response(
+                {"detail": f"page_size must be between 1 and {FRAUD_CLAIMS_MAX_PAGE_SIZE}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            page = keyset_paginate(fnol_claims, "-incident_date_time", page_size, params.get("cursor") or None)
+        except InvalidCursor as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        claims = page.results
+    else:
+        claims = list(fnol_claims.order_by("-incident_date_time", "-complaint_id"))
+
+    history_by_id, counts_by_id = _load_evaluation_history([c.complaint_id for c in claims], history_limit)
     results = []
-    for claim in fnol_claims:
-        eval_row = ClaimEvaluationResponse.objects.filter(
-            complaint_id=claim.complaint_id, is_latest=True
-        ).first()
-        if not eval_row:
-            continue
+    for claim in claims:
         status_name = (claim.claim_status.status_name if claim.claim_status else "") or ""
         status_lower = status_name.lower()
         if "fraud" in status_lower or status_lower == "fraudulent":
@@ -841,7 +1164,7 @@ def list_fraud_claims(request):
         else:
             ui_status = "under_review"
 
-        decision = (eval_row.decision or "").lower()
+        decision = (claim.eval_decision or "").lower()
         if decision == "reject":
             risk_score = 90
         elif decision == "manual review":
@@ -849,7 +1172,7 @@ def list_fraud_claims(request):
         else:
             risk_score = 25
 
-        reason = eval_row.reason or eval_row.decision or "—"
+        reason = claim.eval_reason or claim.eval_decision or "—"
 
         re_open = getattr(claim, "re_open", None)
         if re_open is None:
@@ -859,11 +1182,6 @@ def list_fraud_claims(request):
         except (TypeError, ValueError):
             re_open = 0
 
-        eval_records = (
-            ClaimEvaluationResponse.objects.filter(complaint_id=claim.complaint_id)
-            .order_by("version")
-            .values("complaint_id", "version", "threshold_value", "claim_status", "reason")
-        )
         evaluation_records = [
             {
                 "complaint_id": r["complaint_id"],
@@ -872,11 +1190,11 @@ def list_fraud_claims(request):
                 "claim_status": r["claim_status"] or "—",
                 "reason": (r["reason"] or "").strip() or "—",
             }
-            for r in eval_records
+            for r in history_by_id.get(claim.complaint_id, [])
         ]
-        times_processed = len(evaluation_records)
+        times_processed = counts_by_id.get(claim.complaint_id, len(evaluation_records))
 
-        latest_claim_status = (eval_row.claim_status or "").strip() or "—"
+        latest_claim_status = (claim.eval_claim_status or "").strip() or "—"
 
         results.append({
             "complaint_id": claim.complaint_id,
@@ -884,50 +1202,315 @@ def list_fraud_claims(request):
             "customer": claim.policy_holder_name or "—",
             "riskScore": risk_score,
             "reason": reason,
-            "amount": float(eval_row.estimated_amount or eval_row.claim_amount or 0),
+            "amount": float(claim.eval_estimated_amount or claim.eval_claim_amount or 0),
             "status": ui_status,
             "latest_claim_status": latest_claim_status,
-            "detectedAt": eval_row.created_date.isoformat() if eval_row.created_date else None,
+            "detectedAt": claim.eval_created_date.isoformat() if claim.eval_created_date else None,
             "indicators": [reason] if reason and reason != "—" else [],
             "re_open": re_open,
             "times_processed": times_processed,
             "evaluation_records": evaluation_records,
         })
+    if paginated:
+        return Response({
+            "results": results,
+            "next_cursor": page.next_cursor,
+            "previous_cursor": page.previous_cursor,
+        })
     return Response(results)
 
 
+_EVALUATION_HISTORY_FIELDS = ("id", "complaint_id", "version", "threshold_value", "claim_status", "reason")
+
+
+def _load_evaluation_history(complaint_ids: list, history_limit: Optional[int] = None) -> tuple:
+    """
+    Evaluation rows for many claims in one query. Returns (version-ordered history by
+    complaint_id, total versions by complaint_id). With history_limit, a window function
+    keeps only the newest history_limit versions per claim and counts all of them.
+    """
+    history_by_id: dict = {}
+    counts_by_id: dict = {}
+    if not complaint_ids:
+        return history_by_id, counts_by_id
+
+    rows = ClaimEvaluationResponse.objects.filter(complaint_id__in=complaint_ids)
+    if history_limit is not None:
+        partition = [F("complaint_id")]
+        rows = rows.annotate(
+            version_rank=Window(RowNumber(), partition_by=partition, order_by=[F("version").desc(), F("id").desc()]),
+            version_count=Window(Count("id"), partition_by=partition),
+        ).filter(version_rank__lte=history_limit)
+        fields = _EVALUATION_HISTORY_FIELDS + ("version_count",)
+    else:
+        fields = _EVALUATION_HISTORY_FIELDS
+
+    for row in rows.order_by("complaint_id", "version", "id").values(*fields):
+        complaint_id = row["complaint_id"]
+        history_by_id.setdefault(complaint_id, []).append(row)
+        counts_by_id[complaint_id] = row.get("version_count", counts_by_id.get(complaint_id, 0) + 1)
+    return history_by_id, counts_by_id
+
+
+# Columns list_fnol may sort on (?sort=<column> or ?sort=-<column>); complaint_id breaks ties.
+# Each has a (column, complaint_id) index (migration 0005), so keyset pages never scan and sort.
+FNOL_LIST_SORT_FIELDS = (
+    "incident_date_time",
+    "complaint_id",
+    "created_date",
+    "updated_date",
+    "policy_start_date",
+    "policy_number",
+    "policy_holder_name",
+    "vehicle_year",
+)
+FNOL_LIST_DEFAULT_SORT = "-incident_date_time"
+FNOL_LIST_DEFAULT_PAGE_SIZE = 50
+FNOL_LIST_MAX_PAGE_SIZE = 200
+
+
+def _filter_fnol_claims(qs, params):
+    """
+    Apply list_fnol query filters: claim_status (ids or names, comma-separated), re_open,
+    coverage_type, policy_number, incident_from / incident_to (YYYY-MM-DD, inclusive).
+    Raises ValueError with a message for invalid values.
+    """
+    claim_status = (params.get("claim_status") or "").strip()
+    if claim_status:
+        values = [v.strip() for v in claim_status.split(",") if v.strip()]
+        status_q = Q(claim_status_id__in=[int(v) for v in values if v.isdigit()])
+        for name in (v for v in values if not v.isdigit()):
+            status_q |= Q(claim_status__status_name__iexact=name)
+        qs = qs.filter(status_q)
+    re_open = (params.get("re_open") or "").strip()
+    if re_open:
+        if not re_open.isdigit():
+            raise ValueError("re_open must be an integer.")
+        qs = qs.filter(re_open=int(re_open))
+    coverage_type = (params.get("coverage_type") or "").strip()
+    if coverage_type:
+        qs = qs.filter(coverage_type__iexact=coverage_type)
+    policy_number = (params.get("policy_number") or "").strip()
+    if policy_number:
+        qs = qs.filter(policy_number=policy_number)
+    # Day bounds as datetimes (not __date) so the incident_date_time index is used
+    for param, lookup, days in (("incident_from", "gte", 0), ("incident_to", "lt", 1)):
+        value = (params.get(param) or "").strip()
+        if not value:
+            continue
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"{param} must be a date (YYYY-MM-DD).")
+        bound = timezone.make_aware(datetime.combine(day + timedelta(days=days), datetime.min.time()))
+        qs = qs.filter(**{f"incident_date_time__{lookup}": bound})
+    return qs
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_fnol(request):
     """
-    Return a list of FNOL claims.
+    Return a list of FNOL claims, newest incident first.
+
+    Filters: claim_status, re_open, coverage_type, policy_number, incident_from, incident_to.
+    Sorting: ?sort=<column> or ?sort=-<column> for a column in FNOL_LIST_SORT_FIELDS.
+    Passing page_size or cursor switches to keyset pagination and returns
+    {"results": [...], "next_cursor": str | null, "previous_cursor": str | null};
+    without them the full (filtered) list is returned as before.
+    ?view=summary returns FNOL_SUMMARY_FIELDS only (no photos, evaluation or raw_response);
+    ?fields=a,b,c returns just those keys. Only the columns and joins they need are queried.
     """
-    qs = FnolClaim.objects.all().order_by("-incident_date_time", "-complaint_id")
-    data = [_fnol_claim_to_response(obj) for obj in qs]
-    return Response(data)
+    params = request.query_params
+    sort = (params.get("sort") or FNOL_LIST_DEFAULT_SORT).strip()
+    if sort.lstrip("-") not in FNOL_LIST_SORT_FIELDS:
+        return Response(
+            {"detail": f"sort must be one of: {', '.join(FNOL_LIST_SORT_FIELDS)} (prefix '-' for descending)."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        fields = _fnol_response_fields(params)
+        qs = _fnol_claims_for_response(
+            _filter_fnol_claims(FnolClaim.objects.all(), params),
+            fields,
+            extra_columns=(sort.lstrip("-"),),
+        )
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    cursor = params.get("cursor")
+    page_size_param = params.get("page_size")
+    if cursor is None and page_size_param is None:
+        field = sort.lstrip("-")
+        prefix = "-" if sort.startswith("-") else ""
+        ordering = [sort] if field == "complaint_id" else [sort, f"{prefix}complaint_id"]
+        return Response([_fnol_claim_to_response(obj, fields) for obj in qs.order_by(*ordering)])
+
+    try:
+        page_size = int(page_size_param) if page_size_param else FNOL_LIST_DEFAULT_PAGE_SIZE
+    except ValueError:
+        page_size = 0
+    if not 1 <= page_size <= FNOL_LIST_MAX_PAGE_SIZE:
+        return Response(
+            {"detail": f"page_size must be between 1 and {FNOL_LIST_MAX_PAGE_SIZE}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        page = keyset_paginate(qs, sort, page_size, cursor=cursor or None)
+    except InvalidCursor as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        "results": [_fnol_claim_to_response(obj, fields) for obj in page.results],
+        "next_cursor": page.next_cursor,
+        "previous_cursor": page.previous_cursor,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_fnol(request):
+    """
+    Stream every FNOL claim matching the list_fnol filters with all its evaluation
+    versions (llm_damages parsed) and photos, as ?output=csv (default) or ?output=ndjson.
+    Rows are written as they are read, in chunks, so memory does not grow with the export.
+    """
+    params = request.query_params
+    export_format = (params.get("output") or "csv").strip().lower()
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {"detail": f"output must be one of: {', '.join(EXPORT_FORMATS)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        qs = _filter_fnol_claims(FnolClaim.objects.all(), params)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    content_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    response = StreamingHttpResponse(iter_export(qs, export_format), content_type=content_type)
+    filename = f"claims-export-{timezone.localdate().isoformat()}.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+FNOL_SEARCH_DEFAULT_PAGE_SIZE = 20
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_fnol(request):
+    """
+    Full-text search over complaint_id, policy_number, policy_holder_name,
+    vehicle_registration_number, accident_location and incident_description.
+    ?q=<words> (every word must match as a prefix), ?page=N, ?page_size=M; accepts ?view=
+    and ?fields= like list_fnol. Returns {"results": [... each with "score"], "page",
+    "page_size", "has_more"}, best match first.
+    """
+    params = request.query_params
+    query = (params.get("q") or "").strip()
+    if not query:
+        return Response({"detail": "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        page = int(params.get("page") or 1)
+        page_size = int(params.get("page_size") or FNOL_SEARCH_DEFAULT_PAGE_SIZE)
+    except ValueError:
+        page = page_size = 0
+    if page < 1 or not 1 <= page_size <= FNOL_LIST_MAX_PAGE_SIZE:
+        return Response(
+            {"detail": f"page must be positive and page_size between 1 and {FNOL_LIST_MAX_PAGE_SIZE}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        fields = _fnol_response_fields(params)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # One row past the page tells whether there is a next one
+    matches = search_claim_ids(query, page_size + 1, (page - 1) * page_size)
+    has_more = len(matches) > page_size
+    matches = matches[:page_size]
+    claims_by_id = {
+        claim.complaint_id: claim
+        for claim in _fnol_claims_for_response(
+            FnolClaim.objects.filter(complaint_id__in=[complaint_id for complaint_id, _ in matches]), fields
+        )
+    }
+    results = []
+    for complaint_id, score in matches:
+        claim = claims_by_id.get(complaint_id)
+        if claim is not None:
+            results.append({**_fnol_claim_to_response(claim, fields), "score": round(score, 4)})
+    return Response({"results": results, "page": page, "page_size": page_size, "has_more": has_more})
+
+
+def _validator_etag(*parts) -> str:
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def _fnol_etag(request, pk: str) -> Optional[str]:
+    """
+    ETag for get_fnol from two small queries: fnol_claims.updated_date (plus claim_status and
+    re_open, which are updated without touching it) and the latest evaluation id / version /
+    updated_date from the summary columns, then the claim's photo rows (id and path, since
+    fnol_damage_photos has no timestamp and a path can be rewritten in place). The requested
+    view / fields are part of the tag. None (no ETag) if the claim is missing.
+    """
+    try:
+        fields = _fnol_response_fields(request.query_params)
+    except ValueError:
+        return None
+    row = (
+        FnolClaim.objects.filter(complaint_id=pk)
+        .values_list("updated_date", "claim_status_id", "re_open", "eval_id", "eval_version", "eval_updated_date")
+        .first()
+    )
+    if row is None:
+        return None
+    photos = tuple(FnolDamagePhoto.objects.filter(complaint_id=pk).order_by("id").values_list("id", "photo_path"))
+    return _validator_etag("fnol", fields, row, photos)
+
+
+def _claim_evaluation_etag(request, complaint_id: str) -> Optional[str]:
+    """ETag for get_claim_evaluation: the claim's latest evaluation id / version / updated_date and excess_amount."""
+    row = (
+        FnolClaim.objects.filter(complaint_id=complaint_id)
+        .values_list("eval_id", "eval_version", "eval_updated_date", "excess_amount")
+        .first()
+    )
+    if row is None or row[0] is None:
+        return None
+    return _validator_etag("evaluation", row)
 
 
 @api_view(['GET'])
+@condition(etag_func=_fnol_etag)
 def get_fnol(request, pk: str):
     """
-    Return a single FNOL claim by complaint_id.
+    Return a single FNOL claim by complaint_id. Accepts ?view= and ?fields= like list_fnol.
+    Sends an ETag; If-None-Match with the current tag returns 304 without building the body.
     """
-    obj = get_object_or_404(FnolClaim, complaint_id=pk)
-    data = _fnol_claim_to_response(obj)
+    try:
+        fields = _fnol_response_fields(request.query_params)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    obj = get_object_or_404(_fnol_claims_for_response(FnolClaim.objects.all(), fields), complaint_id=pk)
+    data = _fnol_claim_to_response(obj, fields)
     return Response(data)
 
 
 @api_view(['GET'])
+@condition(etag_func=_claim_evaluation_etag)
 def get_claim_evaluation(request, complaint_id: str):
     """
     Return the latest claim evaluation response for a complaint_id.
     Includes damage_confidence, estimated_amount, claim_amount, excess_amount (from fnol_claims),
     estimated_repair (claim_amount - excess_amount), decision, claim_status,
     reason, llm_damages, llm_severity (from damage assessment).
+    Sends an ETag; If-None-Match with the current tag returns 304 without building the body.
     """
-    latest = ClaimEvaluationResponse.objects.filter(
-        complaint_id=complaint_id, is_latest=True
-    ).first()
+    # The claim row gives excess_amount and, via the summary's eval_id, the latest evaluation
+    fnol = FnolClaim.objects.filter(complaint_id=complaint_id).only("excess_amount", "eval_id").first()
+    latest = None
+    if fnol and fnol.eval_id is not None:
+        latest = ClaimEvaluationResponse.objects.filter(pk=fnol.eval_id).first()
     if not latest:
         return Response(
             {"error": f"No evaluation found for complaint_id: {complaint_id}"},
@@ -941,7 +1524,6 @@ def get_claim_evaluation(request, complaint_id: str):
             damages = None
 
     # excess_amount from fnol_claims (available after Damage Detection / claim intake)
-    fnol = FnolClaim.objects.filter(complaint_id=complaint_id).first()
     excess_amount = float(fnol.excess_amount or 0) if fnol and getattr(fnol, "excess_amount", None) is not None else 0
     claim_amount = float(latest.claim_amount or 0)
     estimated_repair = max(0, claim_amount - excess_amount)
@@ -983,13 +1565,18 @@ def get_claim_evaluation(request, complaint_id: str):
 @permission_classes([IsAuthenticated])
 def claim_type_master_collection(request):
     if request.method == "GET":
-        qs = ClaimTypeMaster.objects.all().order_by("claim_type_id")
-        return Response(ClaimTypeMasterSerializer(qs, many=True).data)
+        return Response(cached_master_read(
+            "claim_type_master",
+            "list",
+            lambda: list(ClaimTypeMasterSerializer(ClaimTypeMaster.objects.all().order_by("claim_type_id"), many=True).data),
+        ))
 
     serializer = ClaimTypeMasterSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     created_by = getattr(getattr(request, "user", None), "username", None) or "api_user"
     obj = serializer.save(created_by=created_by)
+    invalidate_rule_snapshot()
+    bump_master_version("claim_type_master")
     return Response(ClaimTypeMasterSerializer(obj).data, status=status.HTTP_201_CREATED)
 
 
@@ -1008,10 +1595,14 @@ def claim_type_master_detail(request, pk: int):
         serializer.is_valid(raise_exception=True)
         updated_by = getattr(getattr(request, "user", None), "username", None) or "api_user"
         obj = serializer.save(created_by=obj.created_by or updated_by)
+        invalidate_rule_snapshot()
+        bump_master_version("claim_type_master")
         # Note: model doesn't have updated_by; keeping created_by stable
         return Response(ClaimTypeMasterSerializer(obj).data)
 
     obj.delete()
+    invalidate_rule_snapshot()
+    bump_master_version("claim_type_master")
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1019,13 +1610,18 @@ def claim_type_master_detail(request, pk: int):
 @permission_classes([IsAuthenticated])
 def claim_rule_master_collection(request):
     if request.method == "GET":
-        qs = ClaimRuleMaster.objects.all().order_by("rule_id")
-        return Response(ClaimRuleMasterSerializer(qs, many=True).data)
+        return Response(cached_master_read(
+            "claim_rule_master",
+            "list",
+            lambda: list(ClaimRuleMasterSerializer(ClaimRuleMaster.objects.all().order_by("rule_id"), many=True).data),
+        ))
 
     serializer = ClaimRuleMasterSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     created_by = getattr(getattr(request, "user", None), "username", None) or "api_user"
     obj = serializer.save(created_by=created_by)
+    invalidate_rule_snapshot()
+    bump_master_version("claim_rule_master")
     return Response(ClaimRuleMasterSerializer(obj).data, status=status.HTTP_201_CREATED)
 
 
@@ -1044,9 +1640,13 @@ def claim_rule_master_detail(request, pk: int):
         serializer.is_valid(raise_exception=True)
         updated_by = getattr(getattr(request, "user", None), "username", None) or "api_user"
         obj = serializer.save(created_by=obj.created_by or updated_by)
+        invalidate_rule_snapshot()
+        bump_master_version("claim_rule_master")
         return Response(ClaimRuleMasterSerializer(obj).data)
 
     obj.delete()
+    invalidate_rule_snapshot()
+    bump_master_version("claim_rule_master")
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1054,13 +1654,18 @@ def claim_rule_master_detail(request, pk: int):
 @permission_classes([IsAuthenticated])
 def damage_code_master_collection(request):
     if request.method == "GET":
-        qs = DamageCodeMaster.objects.all().order_by("damage_id")
-        return Response(DamageCodeMasterSerializer(qs, many=True).data)
+        return Response(cached_master_read(
+            "damage_code_master",
+            "list",
+            lambda: list(DamageCodeMasterSerializer(DamageCodeMaster.objects.all().order_by("damage_id"), many=True).data),
+        ))
 
     serializer = DamageCodeMasterSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     created_by = getattr(getattr(request, "user", None), "username", None) or "api_user"
     obj = serializer.save(created_by=created_by)
+    invalidate_rule_snapshot()
+    bump_master_version("damage_code_master")
     return Response(DamageCodeMasterSerializer(obj).data, status=status.HTTP_201_CREATED)
 
 
@@ -1079,9 +1684,13 @@ def damage_code_master_detail(request, pk: int):
         serializer.is_valid(raise_exception=True)
         updated_by = getattr(getattr(request, "user", None), "username", None) or "api_user"
         obj = serializer.save(created_by=obj.created_by or updated_by)
+        invalidate_rule_snapshot()
+        bump_master_version("damage_code_master")
         return Response(DamageCodeMasterSerializer(obj).data)
 
     obj.delete()
+    invalidate_rule_snapshot()
+    bump_master_version("damage_code_master")
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1089,13 +1698,17 @@ def damage_code_master_detail(request, pk: int):
 @permission_classes([IsAuthenticated])
 def pricing_config_collection(request):
     if request.method == "GET":
-        qs = PricingConfig.objects.all().order_by("config_key")
-        return Response(PricingConfigSerializer(qs, many=True).data)
+        return Response(cached_master_read(
+            "pricing_config",
+            "list",
+            lambda: list(PricingConfigSerializer(PricingConfig.objects.all().order_by("config_key"), many=True).data),
+        ))
 
     serializer = PricingConfigSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     created_by = getattr(getattr(request, "user", None), "username", None) or "api_user"
     obj = serializer.save(created_by=created_by, updated_by=created_by)
+    bump_master_version("pricing_config")
     return Response(PricingConfigSerializer(obj).data, status=status.HTTP_201_CREATED)
 
 
@@ -1114,48 +1727,132 @@ def pricing_config_detail(request, pk: int):
         serializer.is_valid(raise_exception=True)
         updated_by = getattr(getattr(request, "user", None), "username", None) or "api_user"
         obj = serializer.save(updated_by=updated_by)
+        bump_master_version("pricing_config")
         return Response(PricingConfigSerializer(obj).data)
 
     obj.delete()
+    bump_master_version("pricing_config")
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-def _fnol_payload_to_claim_data(data: dict) -> dict:
-    """Map FnolPayload (raw_response format) to FnolClaim fields."""
-    policy = data.get("policy") or {}
-    vehicle = data.get("vehicle") or {}
-    incident = data.get("incident") or {}
-    history = data.get("history") or {}
-    claimant = data.get("claimant") or {}
-    documents = data.get("documents") or {}
-    complaint_id = data.get("claim_id") or ""
-    incident_dt = incident.get("date_time_of_loss")
-    if incident_dt:
-        try:
-            incident_dt = parse_datetime(str(incident_dt))
-        except (TypeError, ValueError):
-            incident_dt = None
-    policy_start = parse_date(policy.get("policy_start_date")) if policy.get("policy_start_date") else None
-    policy_end = parse_date(policy.get("policy_end_date")) if policy.get("policy_end_date") else None
-    return {
-        "complaint_id": complaint_id,
-        "coverage_type": policy.get("coverage_type"),
-        "policy_number": policy.get("policy_number"),
-        "policy_status": policy.get("policy_status"),
-        "policy_start_date": policy_start,
-        "policy_end_date": policy_end,
-        "policy_holder_name": claimant.get("driver_name"),
-        "vehicle_make": vehicle.get("make"),
-        "vehicle_year": vehicle.get("year"),
-        "vehicle_model": vehicle.get("model"),
-        "vehicle_registration_number": vehicle.get("registration_number"),
-        "incident_type": incident.get("claim_type"),
-        "incident_description": incident.get("loss_description"),
-        "incident_date_time": incident_dt,
-        "fir_document_copy": documents.get("fir_path") if isinstance(documents.get("fir_path"), str) else None,
-        "insurance_document_copy": documents.get("insurance_path") if isinstance(documents.get("insurance_path"), str) else None,
-        "re_open": 0,  # New/fetched claim: set to 0 when saving via Fetch FNOL Data
-    }
+# table -> (model, serializer) accepted by simulate_master_change
+_SIMULATION_TABLES = {
+    "claim_rule": (ClaimRuleMaster, ClaimRuleMasterSerializer),
+    "claim_type": (ClaimTypeMaster, ClaimTypeMasterSerializer),
+    "pricing_config": (PricingConfig, PricingConfigSerializer),
+}
+
+
+def _proposed_master_rows(rows: tuple, pk_field: str, pk: Optional[int], row) -> list:
+    """Snapshot rows with the row for pk replaced by row (None removes it; a new row gets the next id)."""
+    kept = [r for r in rows if getattr(r, pk_field) != pk]
+    if row is not None:
+        kept.append(row)
+    return kept
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def simulate_master_change(request):
+    """
+    Evaluate a proposed edit to claim_rule_master, claim_type_master or pricing_config
+    against the fnol_claims book without saving it. Returns decision counts before and
+    after, the flips between decisions and the change in claim_amount totals.
+
+    Request body:
+    {"table": "claim_rule" | "claim_type" | "pricing_config", "pk": 12, "changes": {...},
+     "incident_from": "2024-01-01", "incident_to": "2024-06-30"}
+    Omit pk to simulate a new row; "delete": true simulates deleting row pk.
+    incident_from / incident_to (optional, inclusive) limit the claims evaluated; a book
+    larger than SIMULATION_MAX_CLAIMS is refused with 400 so a narrower window is asked for.
+
+    The book is evaluated by the columnar backtest (claims.backtest) in this process
+    rather than over a worker pool: each rule is one NumPy mask over all claims, so
+    shipping chunks to processes would cost more than it saves at this size.
+    """
+    from .backtest import evaluate_book, impact_summary, load_claim_book, load_pricing, reprice_book
+
+    table = request.data.get("table")
+    if table not in _SIMULATION_TABLES:
+        return Response(
+            {"detail": f"Field 'table' must be one of: {', '.join(_SIMULATION_TABLES)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    model, serializer_class = _SIMULATION_TABLES[table]
+    pk = request.data.get("pk")
+    delete = bool(request.data.get("delete"))
+    changes = request.data.get("changes") or {}
+    if delete and pk is None:
+        return Response({"detail": "Field 'pk' is required with 'delete'."}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(changes, dict):
+        return Response({"detail": "Field 'changes' must be an object."}, status=status.HTTP_400_BAD_REQUEST)
+
+    instance = get_object_or_404(model, pk=pk) if pk is not None else None
+    proposed = {}
+    if not delete:
+        serializer = serializer_class(instance, data=changes, partial=instance is not None)
+        serializer.is_valid(raise_exception=True)
+        if instance is not None:
+            proposed = {f.name: getattr(instance, f.name) for f in model._meta.concrete_fields}
+        proposed.update(serializer.validated_data)
+    active = not delete and proposed.get("is_active", True)
+
+    window = {param: request.data.get(param) for param in ("incident_from", "incident_to")}
+    try:
+        claims_qs = _filter_fnol_claims(FnolClaim.objects.all(), {k: str(v) for k, v in window.items() if v})
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    max_claims = int(getattr(settings, "SIMULATION_MAX_CLAIMS", 200000))
+    if claims_qs.count() > max_claims:
+        return Response(
+            {"detail": f"More than {max_claims} claims to evaluate; narrow them with incident_from / incident_to."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    snapshot = get_rule_snapshot()
+    proposed_snapshot = snapshot
+    pricing = proposed_pricing = None
+    if table == "claim_rule":
+        rule_id = instance.pk if instance else max((r.rule_id for r in snapshot.rules), default=0) + 1
+        row = RuleRow(
+            rule_id=rule_id,
+            rule_type=proposed.get("rule_type") or "",
+            rule_group=proposed.get("rule_group") or "",
+            rule_description=proposed.get("rule_description") or "",
+            rule_expression=proposed.get("rule_expression") or "",
+        ) if active else None
+        proposed_snapshot = snapshot.with_rows(
+            rules=_proposed_master_rows(snapshot.rules, "rule_id", rule_id, row)
+        )
+    elif table == "claim_type":
+        claim_type_id = instance.pk if instance else max(
+            (c.claim_type_id for c in snapshot.claim_types), default=0
+        ) + 1
+        risk = proposed.get("risk_percentage")
+        row = ClaimTypeRow(
+            claim_type_id=claim_type_id,
+            claim_type_name=proposed.get("claim_type_name") or "",
+            risk_percentage=float(risk) if risk is not None else None,
+        ) if active else None
+        proposed_snapshot = snapshot.with_rows(
+            claim_types=_proposed_master_rows(snapshot.claim_types, "claim_type_id", claim_type_id, row)
+        )
+    else:
+        pricing = load_pricing()
+        proposed_pricing = dict(pricing)
+        if instance is not None:
+            proposed_pricing.pop(instance.config_key, None)
+        if active:
+            proposed_pricing[proposed["config_key"]] = proposed.get("config_value")
+
+    book = load_claim_book(claims_qs if any(window.values()) else None)
+    before_book = reprice_book(book, pricing) if pricing is not None else book
+    after_book = reprice_book(book, proposed_pricing) if proposed_pricing is not None else book
+    summary = impact_summary(
+        evaluate_book(before_book, snapshot),
+        evaluate_book(after_book, proposed_snapshot),
+    )
+    return Response(summary)
 
 
 @api_view(['POST'])
@@ -1163,6 +1860,8 @@ def save_fnol(request):
     """
     Save FNOL to fnol_claims and fnol_damage_photos.
     Accepts FnolPayload format and maps to fnol_claims schema.
+    A payload identical to the last one saved for the claim writes nothing and
+    is answered with "unchanged": true.
     """
     data = request.data.get("fnol")
 
@@ -1179,35 +1878,139 @@ def save_fnol(request):
             status=400,
         )
 
-    claim_data = _fnol_payload_to_claim_data(data)
-    record, _ = FnolClaim.objects.update_or_create(
-        complaint_id=complaint_id,
-        defaults=claim_data,
-    )
+    claim_data = fnol_payload_to_claim_data(data)
+    photos = fnol_payload_photos(data)
+    fingerprint = fnol_payload_fingerprint(claim_data, photos)
+    stored = FnolClaim.objects.filter(complaint_id=complaint_id).values("payload_fingerprint", "re_open").first()
+    if stored and fnol_payload_unchanged(stored["payload_fingerprint"], stored["re_open"], fingerprint):
+        return Response(
+            {
+                "message": "FNOL unchanged",
+                "id": complaint_id,
+                "unchanged": True,
+            },
+            status=200,
+        )
 
-    # Handle damage photos
-    documents = data.get("documents") or {}
-    photo_paths = documents.get("photos")
-    if isinstance(photo_paths, list):
-        record.damage_photos.all().delete()
-        for path in photo_paths:
-            if isinstance(path, str) and path.strip():
-                FnolDamagePhoto.objects.create(complaint=record, photo_path=path.strip())
+    claim_data["payload_fingerprint"] = fingerprint
+    # updated_date feeds the get_fnol ETag; created_date the dashboard's daily trend
+    now = timezone.now()
+    claim_data["updated_date"] = now
+    with track_dashboard_rollups([complaint_id]):
+        record, _ = FnolClaim.objects.update_or_create(
+            complaint_id=complaint_id,
+            defaults=claim_data,
+            create_defaults={**claim_data, "created_date": now},
+        )
+
+        # Handle damage photos
+        if photos is not None:
+            sync_damage_photos({record.complaint_id: photos})
+        index_claims([complaint_id])
 
     return Response(
         {
             "message": "FNOL saved successfully",
             "id": record.complaint_id,
+            "unchanged": False,
         },
         status=201,
     )
 
 
+@api_view(['POST'])
+def save_fnol_bulk(request):
+    """
+    Save many FNOL payloads at once: {"fnol": [FnolPayload, ...]} (at most FNOL_BULK_MAX_ITEMS).
+    Items are validated individually and saved in chunked transactions; items identical
+    to what a claim already holds are not rewritten. The response reports saved /
+    unchanged / failed / skipped counts and a result per item, in request order.
+    """
+    payloads = request.data.get("fnol") if isinstance(request.data, dict) else None
+    if not isinstance(payloads, list):
+        return Response(
+            {"detail": "Field 'fnol' must be a list of FNOL payloads."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(payloads) > FNOL_BULK_MAX_ITEMS:
+        return Response(
+            {"detail": f"At most {FNOL_BULK_MAX_ITEMS} payloads per request."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    results = ingest_fnol_payloads(payloads)
+    counts = {"saved": 0, "unchanged": 0, "error": 0, "skipped": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    return Response({
+        "received": len(payloads),
+        "saved": counts["saved"],
+        "unchanged": counts["unchanged"],
+        "failed": counts["error"],
+        "skipped": counts["skipped"],
+        "results": results,
+    })
+
+
+def _uploaded_lines(upload):
+    """Decoded lines of an uploaded file, read in chunks (a large upload is spooled to disk)."""
+    for number, line in enumerate(upload):
+        yield line.decode("utf-8-sig" if number == 0 else "utf-8", errors="replace")
+
+
+@api_view(['POST'])
+def import_fnol_file(request):
+    """
+    Import an uploaded NDJSON or CSV feed of FNOL payloads (multipart field "file"),
+    saved in batches as by `manage.py import_fnol`. Optional fields: file_format
+    (ndjson / csv, default from the file name) and skip (resume after that record).
+    Returns the import totals and the first FNOL_IMPORT_MAX_REPORTED_ERRORS failures.
+    """
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response(
+            {"detail": "Field 'file' (NDJSON or CSV upload) is required."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    requested = (request.data.get("file_format") or "").strip().lower() or None
+    if requested and requested not in FNOL_IMPORT_FORMATS:
+        return Response(
+            {"detail": f"file_format must be one of: {', '.join(FNOL_IMPORT_FORMATS)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        skip = int(request.data.get("skip") or 0)
+    except (TypeError, ValueError):
+        return Response({"detail": "skip must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+    errors: list = []
+    not_saved = [0]
+
+    def on_error(record, claim_id, detail):
+        not_saved[0] += 1
+        if len(errors) < FNOL_IMPORT_MAX_REPORTED_ERRORS:
+            errors.append({"record": record, "claim_id": claim_id, "errors": detail})
+
+    lines = _uploaded_lines(upload)
+    if fnol_import_format(upload.name, requested) == "csv":
+        records = iter_csv_records(lines, skip=max(0, skip))
+    else:
+        records = iter_ndjson_records(lines, skip=max(0, skip))
+    totals = import_fnol_records(records, skip=max(0, skip), on_error=on_error)
+    return Response({**totals, "errors": errors, "errors_truncated": not_saved[0] > len(errors)})
+
+
+def _diagnostics_requested(request) -> bool:
+    """?diagnostics=1 turns on per-stage timings (_timings) for this request."""
+    return (request.query_params.get("diagnostics") or "").strip().lower() in ("1", "true", "yes")
+
+
 @api_view(['POST'])
 def process_claim(request):
     """
     Run claim validation (product rule, fraud check, damage detection, etc.).
     Does not persist to claim_evaluation_response.
+    With ?diagnostics=1 the result includes a _timings block.
     """
     data = request.data.get("fnol")
     if not data:
@@ -1215,72 +2018,209 @@ def process_claim(request):
             {"detail": "Field 'fnol' is required in request body."},
             status=status.HTTP_400_BAD_REQUEST,
         )
-    result = _run_process_claim_logic(data)
+    if not _diagnostics_requested(request):
+        return Response(_run_process_claim_logic(data))
+    with EvaluationTimer() as timer:
+        result = _run_process_claim_logic(data, timer=timer)
+    result["_timings"] = timer.as_dict()
     return Response(result)
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def evaluation_timings(request):
+    """Process-wide histogram of evaluation stage timings collected in diagnostics mode."""
+    return Response({"stages": timing_histogram()})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def master_cache_stats(request):
+    """Master-data cache backend, TTL, and per-table version and hit / miss counts (this worker)."""
+    return Response(master_cache_info())
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def dashboard_stats_view(request):
+    """
+    Dashboard figures: total claims, auto-approval rate, total / average claim amount,
+    breakdowns by status, decision, claim_type and severity, and the daily trend for
+    the last ?days=N days (default 30, max 366). Read from the dashboard_rollup table,
+    so the cost does not grow with the number of claims.
+    """
+    try:
+        days = int(request.query_params.get("days") or DASHBOARD_DEFAULT_DAYS)
+    except ValueError:
+        days = 0
+    if not 1 <= days <= 366:
+        return Response({"detail": "days must be between 1 and 366."}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(dashboard_stats(days))
+
+
+# Upper bound on items accepted by process_claims_batch in one request
+PROCESS_CLAIMS_BATCH_MAX_ITEMS = 10000
+# complaint_ids are loaded from fnol_claims in chunks of this size
+PROCESS_CLAIMS_BATCH_CHUNK_SIZE = 500
+
+
+def _ndjson_line(obj: dict) -> str:
+    return json.dumps(obj, default=str) + "\n"
+
+
+def _iter_batch_payload_results(payloads: list, snapshot: RuleSnapshot):
+    """Yield one NDJSON line per FnolPayload, evaluated against the shared snapshot."""
+    for index, data in enumerate(payloads):
+        claim_id = data.get("claim_id") if isinstance(data, dict) else None
+        if not isinstance(data, dict):
+            yield _ndjson_line({"index": index, "claim_id": None, "error": "Each item must be an FnolPayload object."})
+            continue
+        try:
+            result = _run_process_claim_logic(data, snapshot=snapshot)
+        except Exception as e:
+            yield _ndjson_line({"index": index, "claim_id": claim_id, "error": str(e)})
+            continue
+        yield _ndjson_line({"index": index, "claim_id": claim_id, "result": result})
+
+
+def _iter_batch_complaint_results(complaint_ids: list, snapshot: RuleSnapshot):
+    """
+    Yield one NDJSON line per complaint_id, in request order. Claims (with their latest
+    evaluation summary) and photos are loaded per chunk, so evaluation itself runs
+    without further queries.
+    """
+    for start in range(0, len(complaint_ids), PROCESS_CLAIMS_BATCH_CHUNK_SIZE):
+        chunk = complaint_ids[start:start + PROCESS_CLAIMS_BATCH_CHUNK_SIZE]
+        claims_by_id = {
+            c.complaint_id: c
+            for c in FnolClaim.objects.filter(complaint_id__in=chunk).prefetch_related("damage_photos")
+        }
+        for offset, complaint_id in enumerate(chunk):
+            index = start + offset
+            claim = claims_by_id.get(complaint_id)
+            if claim is None:
+                yield _ndjson_line({
+                    "index": index,
+                    "claim_id": complaint_id,
+                    "error": f"No FNOL claim found for complaint_id: {complaint_id}",
+                })
+                continue
+            try:
+                raw_response = _fnol_claim_to_raw_response(claim)
+                _apply_latest_evaluation_amount(raw_response, latest_evaluation(claim))
+                result = _run_process_claim_logic(
+                    raw_response,
+                    snapshot=snapshot,
+                    has_photos=bool(raw_response["documents"]["photos"]),
+                )
+            except Exception as e:
+                yield _ndjson_line({"index": index, "claim_id": complaint_id, "error": str(e)})
+                continue
+            yield _ndjson_line({"index": index, "claim_id": complaint_id, "result": result})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def process_claims_batch(request):
+    """
+    Run process_claim validation for many claims in one request and stream the results
+    as NDJSON (one JSON object per line, in request order). Does not persist anything.
+
+    Request body (one of):
+    {"fnols": [FnolPayload, ...]}
+    {"complaint_ids": ["CLM-001", ...]}  -- evaluated from fnol_claims like run_fraud_detection
+
+    Each line: {"index": int, "claim_id": str, "result": {...}} or {"index", "claim_id", "error"}.
+    All items are evaluated against the same rule snapshot.
+    """
+    payloads = request.data.get("fnols")
+    complaint_ids = request.data.get("complaint_ids")
+    if payloads is None and complaint_ids is None:
+        return Response(
+            {"detail": "Provide either 'fnols' or 'complaint_ids' in request body."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if payloads is not None and complaint_ids is not None:
+        return Response(
+            {"detail": "Provide only one of 'fnols' or 'complaint_ids'."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    items = payloads if payloads is not None else complaint_ids
+    if not isinstance(items, list):
+        return Response(
+            {"detail": "'fnols' / 'complaint_ids' must be a list."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(items) > PROCESS_CLAIMS_BATCH_MAX_ITEMS:
+        return Response(
+            {"detail": f"At most {PROCESS_CLAIMS_BATCH_MAX_ITEMS} items per batch."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    snapshot = get_rule_snapshot()
+    if payloads is not None:
+        lines = _iter_batch_payload_results(payloads, snapshot)
+    else:
+        ids = [str(c or "").strip() for c in complaint_ids]
+        lines = _iter_batch_complaint_results(ids, snapshot)
+    return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def run_fraud_detection(request, complaint_id: str):
     """
     Run process_claim validation for the given complaint_id and save the
     response to claim_evaluation_response. Triggered by Fraud Detection button.
+    With ?diagnostics=1 the evaluation bypasses the cache and the result includes
+    a _timings block (load, every rule stage, persistence).
     """
-    fnol_claim = get_object_or_404(FnolClaim, complaint_id=complaint_id)
-    raw_response = _fnol_claim_to_raw_response(fnol_claim)
+    if not _diagnostics_requested(request):
+        return Response(_run_fraud_detection(request, complaint_id), status=status.HTTP_200_OK)
+    with EvaluationTimer() as timer:
+        result = _run_fraud_detection(request, complaint_id, timer)
+    result["_timings"] = timer.as_dict()
+    return Response(result, status=status.HTTP_200_OK)
 
-    # Use existing evaluation's claim_amount for threshold so threshold_value is not always 25
-    existing = ClaimEvaluationResponse.objects.filter(
-        complaint_id=complaint_id, is_latest=True
-    ).first()
-    if existing and (existing.claim_amount or existing.estimated_amount):
-        amount = float(existing.claim_amount or existing.estimated_amount or 0)
-        if amount > 0:
-            raw_response.setdefault("incident", {})["estimated_amount"] = amount
 
-    result = _run_process_claim_logic(raw_response)
+def _run_fraud_detection(request, complaint_id: str, timer: Optional[EvaluationTimer] = None) -> dict:
+    with timed(timer, "load_claim"):
+        fnol_claim = get_object_or_404(FnolClaim, complaint_id=complaint_id)
+        raw_response = _fnol_claim_to_raw_response(fnol_claim)
+
+        # Use existing evaluation's claim_amount for threshold so threshold_value is not always 25
+        _apply_latest_evaluation_amount(raw_response, latest_evaluation(fnol_claim))
+
+    if timer is None:
+        result = _run_process_claim_logic_cached(raw_response)
+    else:
+        result = _run_process_claim_logic(raw_response, timer=timer)
 
     user_id = None
     if request.user and request.user.pk:
         user_id = request.user.pk
 
-    threshold_val = result.get("threshold")
-    threshold_int = int(round((threshold_val or 0) * 100)) if threshold_val is not None else 0
-
-    # Versioning: next version per complaint_id, and clear is_latest on previous rows
-    next_version = (
-        ClaimEvaluationResponse.objects.filter(complaint_id=complaint_id).aggregate(
-            v=Max("version")
-        )["v"]
-        or 0
-    ) + 1
-    ClaimEvaluationResponse.objects.filter(complaint_id=complaint_id).update(
-        is_latest=False
-    )
-    evaluation_claim_status = _get_claim_status_label_for_evaluation(result)
-    ClaimEvaluationResponse.objects.create(
-        complaint_id=complaint_id,
-        version=next_version,
-        is_latest=True,
-        damage_confidence=result.get("damage_confidence") or 0,
-        estimated_amount=result.get("estimated_amount") or 0,
-        claim_amount=result.get("claim_amount") or result.get("estimated_amount") or 0,
-        threshold_value=threshold_int,
-        claim_type=(result.get("claim_type") or "")[:20],
-        decision=(result.get("decision") or "")[:20],
-        claim_status=(evaluation_claim_status or "")[:50],
-        reason=result.get("reason"),
-        created_by=user_id,
-        updated_by=user_id,
-    )
+    with timed(timer, "persistence"), track_dashboard_rollups([complaint_id]):
+        # Versioning: next version per complaint_id, and clear is_latest on previous rows
+        next_version = (
+            ClaimEvaluationResponse.objects.filter(complaint_id=complaint_id).aggregate(
+                v=Max("version")
+            )["v"]
+            or 0
+        ) + 1
+        ClaimEvaluationResponse.objects.filter(complaint_id=complaint_id).update(
+            is_latest=False
+        )
+        _evaluation_response_from_result(complaint_id, next_version, result, user_id).save()
 
-    # Update fnol_claims.claim_status based on evaluation result
-    new_status = _get_claim_status_for_result(result)
-    if new_status:
-        fnol_claim.claim_status = new_status
-        fnol_claim.save(update_fields=["claim_status"])
+        # Update fnol_claims.claim_status based on evaluation result
+        new_status = _get_claim_status_for_result(result)
+        if new_status:
+            fnol_claim.claim_status = new_status
+            fnol_claim.save(update_fields=["claim_status"])
+        refresh_evaluation_summary([complaint_id])
 
-    return Response(result, status=status.HTTP_200_OK)
+    return result
 
 
 # Report brand colors (blue and orange)
@@ -1489,7 +2429,7 @@ def recommendation_report_pdf(request, complaint_id: str):
             status=status.HTTP_404_NOT_FOUND,
         )
     raw_response = _fnol_claim_to_raw_response(claim)
-    fraud_result = _run_process_claim_logic(raw_response)
+    fraud_result = _run_process_claim_logic_cached(raw_response)
     pdf_bytes = _build_recommendation_report_pdf(claim, evaluation, fraud_result)
     filename = f"Motor_Claim_Recommendation_Report_{complaint_id}.pdf"
     response = HttpResponse(pdf_bytes, content_type="application/pdf")
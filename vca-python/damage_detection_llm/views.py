@@ -211,63 +211,67 @@ def damage_assessment(request):
         if claim_id and isinstance(claim_id, str) and claim_id.strip():
             complaint_id = claim_id.strip()
             try:
+                from claims.dashboard_rollups import track_dashboard_rollups
+                from claims.evaluation_summary import refresh_evaluation_summary
                 from claims.models import ClaimEvaluationResponse, FnolClaim
 
-                latest = ClaimEvaluationResponse.objects.filter(
-                    complaint_id=complaint_id, is_latest=True
-                ).first()
-                if latest:
-                    damages_json = json.dumps(damages) if damages else None
-                    latest.llm_damages = damages_json
-                    latest.llm_severity = severity_str
-                    latest.claim_amount = claim_amount
+                with track_dashboard_rollups([complaint_id]):
+                    latest = ClaimEvaluationResponse.objects.filter(
+                        complaint_id=complaint_id, is_latest=True
+                    ).first()
+                    if latest:
+                        damages_json = json.dumps(damages) if damages else None
+                        latest.llm_damages = damages_json
+                        latest.llm_severity = severity_str
+                        latest.claim_amount = claim_amount
+
+                        # Update threshold_value from claim_type_master based on claim_amount (so it's not static 25)
+                        try:
+                            from claims.views import _get_claim_type_threshold
+
+                            thr, claim_type_name = _get_claim_type_threshold(
+                                {"estimated_amount": claim_amount}
+                            )
+                            latest.threshold_value = int(round((thr or 0) * 100))
+                            if claim_type_name:
+                                latest.claim_type = claim_type_name[:20]
+                        except Exception:
+                            pass
+
+                        # Determine decision and claim_status from LLM; both map to Recommendation shared (id 4)
+                        severity_lower = (severity_str or "").strip().lower()
+                        if severity_lower in ("minor", "moderate") and damages and str(damages[0]).lower() != "none":
+                            decision = "Auto Approve"
+                        else:
+                            decision = "Manual Review"
+
+                        latest.decision = decision[:20]
+                        latest.claim_status = "Recommendation shared"
+                        latest.save(
+                            update_fields=[
+                                "llm_damages",
+                                "llm_severity",
+                                "claim_amount",
+                                "threshold_value",
+                                "claim_type",
+                                "decision",
+                                "claim_status",
+                                "updated_date",
+                            ]
+                        )
 
-                    # Update threshold_value from claim_type_master based on claim_amount (so it's not static 25)
-                    try:
-                        from claims.views import _get_claim_type_threshold
+                        # Update fnol_claims.claim_status to Recommendation shared
+                        fnol_claim = FnolClaim.objects.filter(complaint_id=complaint_id).first()
+                        if fnol_claim:
+                            from claims.master_cache import cached_claim_status
 
-                        thr, claim_type_name = _get_claim_type_threshold(
-                            {"estimated_amount": claim_amount}
-                        )
-                        latest.threshold_value = int(round((thr or 0) * 100))
-                        if claim_type_name:
-                            latest.claim_type = claim_type_name[:20]
-                    except Exception:
-                        pass
-
-                    # Determine decision and claim_status from LLM; both map to Recommendation shared (id 4)
-                    severity_lower = (severity_str or "").strip().lower()
-                    if severity_lower in ("minor", "moderate") and damages and str(damages[0]).lower() != "none":
-                        decision = "Auto Approve"
-                    else:
-                        decision = "Manual Review"
-
-                    latest.decision = decision[:20]
-                    latest.claim_status = "Recommendation shared"
-                    latest.save(
-                        update_fields=[
-                            "llm_damages",
-                            "llm_severity",
-                            "claim_amount",
-                            "threshold_value",
-                            "claim_type",
-                            "decision",
-                            "claim_status",
-                            "updated_date",
-                        ]
-                    )
-
-                    # Update fnol_claims.claim_status to Recommendation shared
-                    fnol_claim = FnolClaim.objects.filter(complaint_id=complaint_id).first()
-                    if fnol_claim:
-                        from claims.models import ClaimStatus
-
-                        new_status = ClaimStatus.objects.filter(
-                            status_name__iexact="Recommendation shared"
-                        ).first()
-                        if new_status:
-                            fnol_claim.claim_status = new_status
-                            fnol_claim.save(update_fields=["claim_status"])
+                            new_status = cached_claim_status(name="Recommendation shared")
+                            if new_status:
+                                fnol_claim.claim_status = new_status
+                                fnol_claim.save(update_fields=["claim_status"])
+
+                        # Keep the fnol_claims latest-evaluation summary in step
+                        refresh_evaluation_summary([complaint_id])
             except Exception as persist_err:
                 # Log but don't fail the request; LLM result still returned
                 traceback.print_exc()
@@ -33,11 +33,11 @@ export async function getFnolById(id: string): Promise<FnolResponse> {
   return fetchApi<FnolResponse>(`/fnol/${encodeURIComponent(id)}`);
 }
 
-/** POST /api/save-fnol/ - Save FNOL payload to fnol_claims + fnol_damage_photos */
+/** POST /api/save-fnol/ - Save FNOL payload to fnol_claims + fnol_damage_photos (unchanged: identical resend, nothing written) */
 export async function saveFnol(
   fnol: FnolPayload
-): Promise<{ message: string; id: string }> {
-  return fetchApi<{ message: string; id: string }>("/save-fnol", {
+): Promise<{ message: string; id: string; unchanged: boolean }> {
+  return fetchApi<{ message: string; id: string; unchanged: boolean }>("/save-fnol", {
     method: "POST",
     data: { fnol },
   });